@@ -0,0 +1,5 @@
+"""
+Offline benchmarks for Managlynx-Agent.
+Run from the repository root, e.g. `python -m benchmarks.suite` for the full
+suite (JSON report) or `python -m benchmarks.bench_transaction_analyzer`.
+"""
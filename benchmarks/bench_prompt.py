@@ -0,0 +1,111 @@
+"""
+Measure the token count of each assembled system prompt variant.
+
+Builds the instruction the agent would send for typical routed queries and
+counts tokens with the model's tokenizer (via LiteLLM, falling back to a
+4-characters-per-token estimate), so prompt growth shows up in review. The
+shared prefix is reported on its own: it is the part provider-side prompt
+caching can reuse across requests.
+
+Only the instruction is counted; OmniAgent appends its own suffix and the
+tool schemas after it.
+
+Usage:
+    python -m benchmarks.bench_prompt [--model gpt-4.1] [--output prompt_tokens.json]
+"""
+
+import argparse
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from core.system_prompt import PROMPT_MODULES, PROMPT_PREFIX, build_system_instruction, select_prompt_modules
+from utils.chains import ALL_CHAINS, CHAIN_EVM, CHAIN_SOLANA
+
+EVM_WALLET = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+SOLANA_WALLET = "7xKXtg2CW87d97TXJSDpbD5jBkheTqA83TZRuJosgAsU"
+
+# (label, routed chains, query); chains are what ManaglynxAgent._route would pick
+VARIANTS: List[Tuple[str, Tuple[str, ...], Optional[str]]] = [
+    ("full (SYSTEM_INSTRUCTION)", ALL_CHAINS, None),
+    ("evm report", (CHAIN_EVM,), f"Show the full portfolio for {EVM_WALLET}"),
+    ("evm follow-up", (CHAIN_EVM,), "What is gas like right now?"),
+    ("solana report", (CHAIN_SOLANA,), f"What happened recently on {SOLANA_WALLET}"),
+    ("solana follow-up", (CHAIN_SOLANA,), "Thanks, anything else I should know?"),
+    ("multi-chain report", ALL_CHAINS, f"Compare {EVM_WALLET} and {SOLANA_WALLET}"),
+    ("unknown chain", (), "What can you do?"),
+]
+
+
+def count_tokens(text: str, model: str) -> Tuple[int, bool]:
+    """
+    Count tokens for a model.
+
+    Returns:
+        (token count, whether it was measured rather than estimated)
+    """
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    try:
+        import litellm
+        return litellm.token_counter(model=model, text=text), True
+    except Exception:
+        return len(text) // 4, False
+
+
+def run(model: str) -> Dict:
+    """Count the prefix, every module and every variant."""
+    prefix_tokens, measured = count_tokens(PROMPT_PREFIX, model)
+    modules = {name: count_tokens(text, model)[0] for name, text in PROMPT_MODULES.items()}
+
+    variants = []
+    for label, chains, query in VARIANTS:
+        instruction = build_system_instruction(chains, query)
+        if not instruction.startswith(PROMPT_PREFIX):
+            raise AssertionError(f"'{label}' does not start with the shared prefix")
+        tokens, _ = count_tokens(instruction, model)
+        variants.append({
+            "variant": label,
+            "modules": select_prompt_modules(chains, query),
+            "chars": len(instruction),
+            "tokens": tokens,
+            "prefix_share": prefix_tokens / tokens if tokens else 0.0,
+        })
+
+    return {
+        "model": model,
+        "measured": measured,
+        "prefix": {"chars": len(PROMPT_PREFIX), "tokens": prefix_tokens},
+        "modules": modules,
+        "variants": variants,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="gpt-4.1", help="Model whose tokenizer to use")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.model)
+    unit = "tokens" if report["measured"] else "tokens (estimated)"
+    print(f"\nShared prefix: {report['prefix']['tokens']:,} {unit}, {report['prefix']['chars']:,} chars")
+
+    print("\nModules:")
+    for name, tokens in report["modules"].items():
+        print(f"  {tokens:>7,}  {name}")
+
+    print(f"\nVariants ({args.model}):")
+    for variant in report["variants"]:
+        print(
+            f"  {variant['tokens']:>7,}  {variant['variant']:<26} "
+            f"prefix {variant['prefix_share']:.0%}  [{', '.join(variant['modules'])}]"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
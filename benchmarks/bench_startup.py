@@ -0,0 +1,106 @@
+"""
+Measure import time of the CLI entry point and the agent runtime.
+
+Runs `python -X importtime` in fresh interpreters and reports the total and
+the slowest modules, so startup regressions show up in review.
+
+Usage:
+    python -m benchmarks.bench_startup [--top 15] [--repeat 3] [--output startup.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+# What the prompt waits for, and what is deferred to the background
+TARGETS = {
+    "cli (before prompt)": "import cli",
+    "core (background)": "import core",
+}
+
+# The targets themselves; their own time is already the total
+TARGETS_ROOTS = {"cli", "core"}
+
+
+def measure(statement: str) -> List[Dict]:
+    """
+    Import in a fresh interpreter and parse -X importtime output.
+
+    Args:
+        statement: Python statement to run, e.g. 'import cli'
+
+    Returns:
+        One dict per module with self and cumulative time in ms, in import order
+    """
+    env = {**os.environ, "LITELLM_LOCAL_MODEL_COST_MAP": os.environ.get("LITELLM_LOCAL_MODEL_COST_MAP", "True")}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, env=env, check=True,
+    )
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        modules.append({
+            "module": name,
+            "depth": (len(line.rsplit("|", 1)[1]) - len(name) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return modules
+
+
+def run(top: int, repeat: int) -> Dict[str, Dict]:
+    """Measure every target; totals are the best of `repeat` runs."""
+    report = {}
+    for label, statement in TARGETS.items():
+        best_total = float("inf")
+        best_modules: List[Dict] = []
+        for _ in range(repeat):
+            modules = measure(statement)
+            total = sum(m["cumulative_ms"] for m in modules if m["depth"] == 0)
+            if total < best_total:
+                best_total, best_modules = total, modules
+
+        # Top-level packages only (wherever they were first imported), so
+        # submodules don't crowd the list
+        heaviest = sorted(
+            (m for m in best_modules if "." not in m["module"] and m["module"] not in TARGETS_ROOTS),
+            key=lambda m: m["cumulative_ms"],
+            reverse=True,
+        )[:top]
+        report[label] = {
+            "statement": statement,
+            "total_ms": best_total,
+            "modules": len(best_modules),
+            "slowest": heaviest,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list per target")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.top, args.repeat)
+    for label, result in report.items():
+        print(f"\n{label}: {result['total_ms']:,.0f} ms, {result['modules']} modules ({result['statement']})")
+        for module in result["slowest"]:
+            print(f"  {module['cumulative_ms']:>9,.1f} ms  {module['module']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
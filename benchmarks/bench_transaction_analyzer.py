@@ -0,0 +1,93 @@
+"""
+Benchmark the row-by-row and columnar (NumPy) transaction summary paths.
+
+Usage:
+    python -m benchmarks.bench_transaction_analyzer [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.synthetic import DEFAULT_ADDRESS, generate_transactions
+from utils.transaction_analyzer import TransactionAnalyzer
+
+
+def _empty_summary(count: int) -> Dict:
+    return {
+        "total_count": count,
+        "swaps": 0,
+        "transfers_in": 0,
+        "transfers_out": 0,
+        "approvals": 0,
+        "interactions": 0,
+        "volume_eth_in": 0.0,
+        "volume_eth_out": 0.0,
+        "gas_spent": 0.0,
+    }
+
+
+def _best_of(func: Callable[[], Dict], repeat: int) -> tuple[Dict, float]:
+    """Run func `repeat` times and return its result and fastest wall time."""
+    best = float("inf")
+    result = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def run(sizes: List[int], repeat: int = 5) -> List[Dict]:
+    """
+    Time both summary paths on synthetic histories.
+    
+    Returns:
+        One result dict per size with timings, speedup and an equality check
+    """
+    addr_lower = DEFAULT_ADDRESS.lower()
+    results = []
+    
+    for size in sizes:
+        transactions = generate_transactions(size)
+        
+        def rows() -> Dict:
+            summary = _empty_summary(size)
+            TransactionAnalyzer._accumulate_rows(summary, transactions, addr_lower)
+            return summary
+        
+        def columnar() -> Dict:
+            summary = _empty_summary(size)
+            TransactionAnalyzer._accumulate_columnar(summary, transactions, addr_lower)
+            return summary
+        
+        row_summary, row_time = _best_of(rows, repeat)
+        col_summary, col_time = _best_of(columnar, repeat)
+        
+        results.append({
+            "transactions": size,
+            "rows_ms": row_time * 1000,
+            "columnar_ms": col_time * 1000,
+            "speedup": row_time / col_time,
+            "identical": row_summary == col_summary,
+        })
+    
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    print(f"{'transactions':>12} {'rows (ms)':>10} {'columnar (ms)':>14} {'speedup':>8} {'identical':>10}")
+    for result in run(args.sizes, args.repeat):
+        print(
+            f"{result['transactions']:>12,} {result['rows_ms']:>10.1f} "
+            f"{result['columnar_ms']:>14.1f} {result['speedup']:>7.2f}x {str(result['identical']):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
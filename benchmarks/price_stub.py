@@ -0,0 +1,119 @@
+"""
+Local stand-in for the DeFiLlama `/prices/current` and `/batchHistorical` endpoints.
+
+Usage:
+    async with PriceStub(latency=0.05) as stub:
+        service = PriceService()
+        service.BASE_URL = stub.url
+        service.HISTORICAL_URL = stub.historical_url
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import Dict, Optional
+
+from aiohttp import web
+
+
+class PriceStub:
+    """aiohttp server answering DeFiLlama price requests with deterministic prices."""
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize stub.
+
+        Args:
+            latency: Seconds to wait before answering each request
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+        """
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.coins_requested = 0
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use in place of PriceService.BASE_URL."""
+        return f"http://{self.host}:{self.port}/prices/current"
+
+    @property
+    def historical_url(self) -> str:
+        """URL to use in place of PriceService.HISTORICAL_URL."""
+        return f"http://{self.host}:{self.port}/batchHistorical"
+
+    @staticmethod
+    def quote(coin_id: str) -> Dict:
+        """Deterministic price entry for a coin ID, shaped like DeFiLlama's."""
+        digest = hashlib.sha256(coin_id.encode()).digest()
+        price = int.from_bytes(digest[:4], "big") / 1_000_000
+        return {
+            "decimals": 18,
+            "symbol": coin_id.rsplit(":", 1)[-1][:6].upper(),
+            "price": price,
+            "timestamp": int(time.time()),
+            "confidence": 0.99,
+        }
+
+    async def _handle_prices(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        coin_ids = [c for c in request.match_info["coins"].split(",") if c]
+        self.coins_requested += len(coin_ids)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response({"coins": {coin_id: self.quote(coin_id) for coin_id in coin_ids}})
+
+    async def _handle_historical(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        coins = json.loads(request.query["coins"])
+        self.coins_requested += sum(len(timestamps) for timestamps in coins.values())
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return web.json_response({"coins": {
+            coin_id: {
+                "symbol": self.quote(coin_id)["symbol"],
+                # Same price within an hour, like DeFiLlama's hourly data points
+                "prices": [
+                    {
+                        "timestamp": timestamp,
+                        "price": self.quote(f"{coin_id}@{timestamp // 3600}")["price"],
+                        "confidence": 0.99,
+                    }
+                    for timestamp in timestamps
+                ],
+            }
+            for coin_id, timestamps in coins.items()
+        }})
+
+    async def start(self) -> "PriceStub":
+        """Start serving; binds a free port unless one was given."""
+        app = web.Application()
+        app.router.add_get("/prices/current/{coins}", self._handle_prices)
+        app.router.add_get("/batchHistorical", self._handle_historical)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def reset_counters(self) -> None:
+        """Zero the request counters between scenarios."""
+        self.requests = 0
+        self.coins_requested = 0
+
+    async def __aenter__(self) -> "PriceStub":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
@@ -0,0 +1,306 @@
+"""
+Offline benchmark suite: TransactionAnalyzer, SimpleCache and PriceService.
+
+Runs against synthetic Etherscan data and a local DeFiLlama stub, so no
+network or API keys are needed. With --output, results are saved as JSON to
+compare later runs against.
+
+Usage:
+    python -m benchmarks.suite [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.price_stub import PriceStub
+from benchmarks.synthetic import DEFAULT_ADDRESS, generate_token_addresses, generate_transactions
+from tools.price_tools import PriceService
+from utils.cache import SimpleCache
+from utils.transaction_analyzer import TransactionAnalyzer
+
+
+def _report(name: str, samples: List[float], ops: int, elapsed: float, unit: str, **extra) -> Dict:
+    """
+    Build a result entry from per-operation latencies.
+
+    Args:
+        name: Benchmark name, stable across runs so results can be compared
+        samples: Latency of each timed operation, in seconds
+        ops: Units of work done (transactions, cache ops, requests)
+        elapsed: Total wall time in seconds
+        unit: What one op is, for the throughput label
+        **extra: Additional fields to record
+
+    Returns:
+        Dict with throughput and p50/p95/p99/mean/max latency in milliseconds
+    """
+    latencies = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "name": name,
+        "ops": ops,
+        "unit": unit,
+        "elapsed_s": elapsed,
+        "throughput_per_s": ops / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "mean": float(latencies.mean()),
+            "max": float(latencies.max()),
+        },
+        **extra,
+    }
+
+
+def bench_transaction_analyzer(sizes: List[int], repeat: int) -> List[Dict]:
+    """Time summarize_activity on synthetic histories of each size."""
+    results = []
+    for size in sizes:
+        transactions = generate_transactions(size)
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            TransactionAnalyzer.summarize_activity(transactions, DEFAULT_ADDRESS)
+            samples.append(time.perf_counter() - start)
+        results.append(_report(
+            f"transaction_analyzer.summarize[{size}]",
+            samples, size * repeat, sum(samples), "transactions",
+        ))
+    return results
+
+
+def bench_cache(entries: int, lookups: int, hit_ratio: float = 0.9) -> List[Dict]:
+    """Time SimpleCache writes and a mixed hit/miss read workload."""
+    rnd = random.Random(3)
+    cache = SimpleCache(ttl_seconds=300, max_entries=entries)
+    keys = [f"price:0x{rnd.getrandbits(160):040x}" for _ in range(entries)]
+    value = {"usd": 1.0, "symbol": "TKN", "decimals": 18, "usd_market_cap": None}
+    perf_counter = time.perf_counter
+
+    samples = []
+    begin = perf_counter()
+    for key in keys:
+        start = perf_counter()
+        cache.set(key, value)
+        samples.append(perf_counter() - start)
+    results = [_report("simple_cache.set", samples, entries, perf_counter() - begin, "ops")]
+
+    reads = [
+        rnd.choice(keys) if rnd.random() < hit_ratio else f"price:miss-{i}"
+        for i in range(lookups)
+    ]
+    samples = []
+    begin = perf_counter()
+    for key in reads:
+        start = perf_counter()
+        cache.get(key)
+        samples.append(perf_counter() - start)
+    results.append(_report(
+        "simple_cache.get", samples, lookups, perf_counter() - begin, "ops",
+        hit_rate=cache.stats()["hit_rate"],
+    ))
+    return results
+
+
+async def _timed_price_requests(
+    service: PriceService,
+    addresses: List[str],
+    concurrency: int,
+) -> tuple[List[float], float]:
+    """Issue get_token_price for each address with bounded concurrency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+
+    async def one(address: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await service.get_token_price(address)
+            samples.append(time.perf_counter() - start)
+
+    begin = time.perf_counter()
+    await asyncio.gather(*(one(address) for address in addresses))
+    return samples, time.perf_counter() - begin
+
+
+async def bench_price_service(
+    tokens: int,
+    requests: int,
+    concurrency: int,
+    latency: float,
+) -> List[Dict]:
+    """
+    Time PriceService against the local stub: cold and warm single lookups,
+    one bulk get_token_prices call, and cold and warm historical lookups.
+    """
+    rnd = random.Random(5)
+    token_addresses = generate_token_addresses(tokens)
+    workload = [rnd.choice(token_addresses) for _ in range(requests)]
+    results = []
+
+    async with PriceStub(latency=latency) as stub:
+        service = PriceService()
+        service.BASE_URL = stub.url
+        await service.start()
+        try:
+            samples, elapsed = await _timed_price_requests(service, workload, concurrency)
+            results.append(_report(
+                "price_service.get_token_price.cold", samples, requests, elapsed, "requests",
+                http_requests=stub.requests,
+            ))
+
+            stub.reset_counters()
+            samples, elapsed = await _timed_price_requests(service, workload, concurrency)
+            results.append(_report(
+                "price_service.get_token_price.warm", samples, requests, elapsed, "requests",
+                http_requests=stub.requests,
+            ))
+        finally:
+            await service.close()
+
+        stub.reset_counters()
+        service = PriceService()
+        service.BASE_URL = stub.url
+        await service.start()
+        try:
+            start = time.perf_counter()
+            await service.get_token_prices(token_addresses)
+            elapsed = time.perf_counter() - start
+            results.append(_report(
+                "price_service.get_token_prices.cold", [elapsed], tokens, elapsed, "tokens",
+                http_requests=stub.requests,
+            ))
+        finally:
+            await service.close()
+
+        # Value-at-time for a history: random tokens over 90 days, as
+        # value_transaction_history would price them
+        history = [
+            (rnd.choice(token_addresses[:20]), 1_700_000_000 + rnd.randint(0, 90 * 24 * 3600))
+            for _ in range(requests // 2)
+        ]
+        service = PriceService()
+        service.BASE_URL = stub.url
+        service.HISTORICAL_URL = stub.historical_url
+        await service.start()
+        try:
+            for phase in ("cold", "warm"):
+                stub.reset_counters()
+                start = time.perf_counter()
+                await service.get_historical_prices(history)
+                elapsed = time.perf_counter() - start
+                results.append(_report(
+                    f"price_service.get_historical_prices.{phase}", [elapsed], len(history), elapsed, "lookups",
+                    http_requests=stub.requests,
+                ))
+        finally:
+            await service.close()
+
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    """Current commit, if run from a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> Dict:
+    """Run every benchmark and return the full report."""
+    results: List[Dict] = []
+    results += bench_transaction_analyzer(args.sizes, args.repeat)
+    results += bench_cache(args.cache_entries, args.cache_lookups)
+    results += asyncio.run(bench_price_service(
+        args.tokens, args.requests, args.concurrency, args.stub_latency,
+    ))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "config": {
+            "sizes": args.sizes,
+            "repeat": args.repeat,
+            "cache_entries": args.cache_entries,
+            "cache_lookups": args.cache_lookups,
+            "tokens": args.tokens,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "stub_latency": args.stub_latency,
+        },
+        "results": results,
+    }
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None) -> None:
+    """Print results as a table, with p50 and throughput change vs a baseline."""
+    previous = {r["name"]: r for r in (baseline or {}).get("results", [])}
+
+    header = f"{'benchmark':<42} {'throughput/s':>14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    if previous:
+        header += f" {'Δ thrpt':>9} {'Δ p50':>8}"
+    print(header)
+
+    for result in report["results"]:
+        latency = result["latency_ms"]
+        line = (
+            f"{result['name']:<42} {result['throughput_per_s']:>14,.0f} "
+            f"{latency['p50']:>9.3f} {latency['p95']:>9.3f} {latency['p99']:>9.3f}"
+        )
+        before = previous.get(result["name"])
+        if before:
+            thrpt = result["throughput_per_s"] / before["throughput_per_s"] - 1
+            p50 = latency["p50"] / before["latency_ms"]["p50"] - 1 if before["latency_ms"]["p50"] else 0.0
+            line += f" {thrpt:>+8.1%} {p50:>+7.1%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Transaction history sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per history size")
+    parser.add_argument("--cache-entries", type=int, default=10_000)
+    parser.add_argument("--cache-lookups", type=int, default=100_000)
+    parser.add_argument("--tokens", type=int, default=200, help="Distinct tokens priced")
+    parser.add_argument("--requests", type=int, default=2_000, help="Price lookups per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--stub-latency", type=float, default=0.05,
+                        help="Simulated DeFiLlama response time in seconds")
+    parser.add_argument("--output", help="Where to write the JSON report (default: not written)")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+    if args.output:
+        print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
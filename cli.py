@@ -1,37 +1,128 @@
 """
 Managlynx-Agent Portfolio CLI
+
+Heavy modules (the agent runtime, rich.markdown) are imported lazily, so the
+prompt appears while the agent is still starting up in the background.
 """
 
-from typing import Optional
+import asyncio
+import importlib
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Optional
 from rich.console import Console
-from rich.markdown import Markdown
 from rich.panel import Panel
 from rich.text import Text
-from core import ManaglynxAgent
+from utils.tracing import (
+    KIND_HTTP, KIND_LLM, KIND_MCP, KIND_TOOL, SUGGESTED_TRACE_PATH, get_tracer, read_spans, summarize_traces,
+)
+
+if TYPE_CHECKING:
+    from core import ManaglynxAgent
+
+
+def _format_ms(ms: float) -> str:
+    """Format a duration as ms below one second, seconds above."""
+    return f"{ms:.0f}ms" if ms < 1000 else f"{ms / 1000:.1f}s"
 
 
 class CLI:
     """Clean CLI for Managlynx-Agent portfolio manager."""
     
-    def __init__(self):
-        """Initialize CLI."""
-        self.agent: Optional[ManaglynxAgent] = None
+    def __init__(self, process_start: Optional[float] = None, stream: bool = True):
+        """
+        Initialize CLI.
+        
+        Args:
+            process_start: time.perf_counter() taken first thing in main.py,
+                for the startup report
+            stream: Show tool progress and the answer live while a query
+                runs, instead of a spinner until it is done
+        """
+        self.agent: Optional["ManaglynxAgent"] = None
         self.console = Console()
+        self._init_task: Optional[asyncio.Task] = None
+        self._process_start = process_start if process_start is not None else time.perf_counter()
+        self.stream = stream
+        # One conversation per CLI process; other CLIs and service clients
+        # sharing the agent's memory keep their own
+        self.session_id = f"cli-{uuid.uuid4().hex[:12]}"
+        # Startup phases in ms, shown by the 'startup' command
+        self.startup_timings: Dict[str, float] = {}
     
     async def initialize(self):
-        """Initialize the agent."""
-        with self.console.status("[bold green]🚀 Initializing Managlynx-Agent...[/bold green]", spinner="dots"):
-            self.agent = ManaglynxAgent()
-            await self.agent.initialize()
-        self.console.print("[bold green]✅ Agent Ready![/bold green]")
+        """Start initializing the agent in the background and return immediately."""
+        self._init_task = asyncio.create_task(self._initialize_agent())
+    
+    async def _initialize_agent(self):
+        """Import the agent runtime off the event loop, then initialize the agent."""
+        start = time.perf_counter()
+        # Importing omnicoreagent/litellm takes seconds; keep the loop free meanwhile
+        core = await asyncio.to_thread(importlib.import_module, "core")
+        imported = time.perf_counter()
+        self.startup_timings["agent_import_ms"] = (imported - start) * 1000
+        
+        agent = core.ManaglynxAgent()
+        await agent.initialize()
+        self.agent = agent
+        self.startup_timings["agent_init_ms"] = (time.perf_counter() - imported) * 1000
+        self.startup_timings["agent_ready_ms"] = (time.perf_counter() - self._process_start) * 1000
+    
+    async def _wait_until_ready(self):
+        """Block until background initialization has finished (re-raising its error)."""
+        if self._init_task is None:
+            await self.initialize()
+        if not self._init_task.done():
+            with self.console.status("[bold green]🚀 Finishing Managlynx-Agent startup...[/bold green]", spinner="dots"):
+                await asyncio.shield(self._init_task)
+        self._init_task.result()
+    
+    async def _input(self, prompt: str) -> str:
+        """
+        Read a line without blocking the event loop.
+        
+        Runs input() on a daemon thread, so background initialization keeps
+        going while the user types and an abandoned read never blocks exit.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def resolve(value=None, error=None):
+            if future.done():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+        
+        def read():
+            try:
+                line = self.console.input(prompt)
+            except BaseException as e:
+                loop.call_soon_threadsafe(resolve, None, e)
+            else:
+                loop.call_soon_threadsafe(resolve, line)
+        
+        threading.Thread(target=read, name="cli-input", daemon=True).start()
+        return await future
+    
+    async def _shutdown(self):
+        """Shut the agent down, including one that is still starting."""
+        if self._init_task and not self._init_task.done():
+            self._init_task.cancel()
+            await asyncio.gather(self._init_task, return_exceptions=True)
+        if self.agent:
+            await self.agent.shutdown()
     
     async def run(self):
         """Run the portfolio agent."""
         self._print_welcome()
+        self.startup_timings["prompt_ready_ms"] = (time.perf_counter() - self._process_start) * 1000
         
         while True:
             try:
-                query = self.console.input("\n[bold cyan]💬 You:[/bold cyan] ").strip()
+                query = (await self._input("\n[bold cyan]💬 You:[/bold cyan] ")).strip()
                 
                 if not query:
                     continue
@@ -39,7 +130,7 @@ class CLI:
                 # Exit commands
                 if query.lower() in ["exit", "quit", "q", "bye"]:
                     self.console.print("\n[bold yellow]👋 Thanks for using Managlynx-Agent![/bold yellow]\n")
-                    await self.agent.shutdown()
+                    await self._shutdown()
                     break
                 
                 # Help command
@@ -47,11 +138,34 @@ class CLI:
                     self._print_help()
                     continue
                 
+                # Trace breakdown of recent queries
+                if query.lower() == "stats":
+                    self._print_stats()
+                    continue
+                
+                # Startup timing report
+                if query.lower() == "startup":
+                    self._print_startup()
+                    continue
+                
+                # Toggle live output
+                if query.lower() == "stream":
+                    self.stream = not self.stream
+                    self.console.print(f"[dim]Live output {'on' if self.stream else 'off'}.[/dim]")
+                    continue
+                
+                # First query waits for background init if it is still running
+                await self._wait_until_ready()
+                
                 # Process portfolio query
                 self.console.print("\n[bold purple]🔍 Analyzing...[/bold purple]")
                 
-                with self.console.status("[bold blue]Thinking...[/bold blue]", spinner="earth"):
-                     result = await self.agent.analyze(query, session_id="session_id")
+                if self.stream:
+                    # The answer is rendered live as it streams in
+                    result = await self._analyze_live(query)
+                else:
+                    with self.console.status("[bold blue]Thinking...[/bold blue]", spinner="earth"):
+                        result = await self.agent.analyze(query, session_id=self.session_id)
                 
                 self.console.print()
                 if result:
@@ -59,20 +173,87 @@ class CLI:
                     if not response:
                         self.console.print("[bold red]❌ No response generated.[/bold red]")
                         continue
-                    self.console.print(Markdown(response))
+                    if not self.stream:
+                        from rich.markdown import Markdown
+                        self.console.print(Markdown(response))
                     self.console.print("\n[dim]" + "─" * 70 + "[/dim]")
                 else:
                     self.console.print("[bold red]❌ No results found.[/bold red]") 
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
                 self.console.print("\n\n[bold yellow]👋 Thanks for using Managlynx-Agent![/bold yellow]\n")
-                await self.agent.shutdown()
+                await self._shutdown()
                 break
             except Exception as e:
                 self.console.print(f"\n[bold red]❌ Error:[/bold red] {str(e)}\n")
                 continue
                
     
+    async def _analyze_live(self, query: str) -> Optional[dict]:
+        """
+        Run a query with Rich Live: tool steps as they happen, then the answer
+        as it is generated. Ends with the final response rendered as Markdown.
+        
+        Returns:
+            The result dict from ManaglynxAgent.analyze
+        """
+        from rich.console import Group
+        from rich.live import Live
+        from rich.markdown import Markdown
+        from rich.spinner import Spinner
+        from core.streaming import (
+            STREAM_ANSWER_DELTA, STREAM_RESULT, STREAM_THOUGHT,
+            STREAM_TOOL_ERROR, STREAM_TOOL_RESULT, STREAM_TOOL_STARTED,
+        )
+        
+        steps: List[Text] = []
+        running: Dict[str, tuple] = {}
+        answer = ""
+        result = None
+        started = time.perf_counter()
+        
+        def render(final: bool = False):
+            parts = list(steps[-8:])
+            if answer:
+                parts.append(Markdown(answer))
+            elif not final:
+                label = "Thinking..." if not running else f"Running {len(running)} tool(s)..."
+                parts.append(Spinner("earth", text=Text(label, style="bold blue")))
+            return Group(*parts)
+        
+        with Live(render(), console=self.console, refresh_per_second=12, vertical_overflow="visible") as live:
+            async for update in self.agent.analyze_stream(query, session_id=self.session_id):
+                kind = update["type"]
+                if kind == STREAM_THOUGHT:
+                    thought = " ".join(update["message"].split())
+                    steps.append(Text(f"💭 {thought[:117] + '…' if len(thought) > 120 else thought}", style="dim italic"))
+                elif kind == STREAM_TOOL_STARTED:
+                    line = Text(f"🔧 {update['tool']} {update['args']}", style="dim cyan")
+                    running[update.get("tool_call_id") or update["tool"]] = (line, time.perf_counter())
+                    steps.append(line)
+                elif kind in (STREAM_TOOL_RESULT, STREAM_TOOL_ERROR):
+                    key = update.get("tool_call_id") or update["tool"]
+                    line, tool_started = running.pop(key, (None, time.perf_counter()))
+                    elapsed = _format_ms((time.perf_counter() - tool_started) * 1000)
+                    if kind == STREAM_TOOL_RESULT:
+                        done = Text(f"✅ {update['tool']} ({elapsed})", style="dim green")
+                    else:
+                        done = Text(f"❌ {update['tool']}: {update['message']}", style="dim red")
+                    if line in steps:
+                        steps[steps.index(line)] = done
+                    else:
+                        steps.append(done)
+                elif kind == STREAM_ANSWER_DELTA:
+                    answer += update["text"]
+                elif kind == STREAM_RESULT:
+                    result = update["result"]
+                    # The stored answer is authoritative (the stream may be partial)
+                    answer = (result or {}).get("response") or ""
+                live.update(render(final=kind == STREAM_RESULT))
+        
+        self.console.print(f"[dim]⏱️ {_format_ms((time.perf_counter() - started) * 1000)}[/dim]")
+        return result
+    
     def _print_welcome(self):
         """Print welcome message."""
         welcome_text = Text()
@@ -86,7 +267,9 @@ class CLI:
         self.console.print("   • Show portfolio for [cyan]0xd8dA...[/cyan] (Vitalik)")
         self.console.print("   • Check Solana wallet [cyan]HN7c...[/cyan]")
         self.console.print("   • [yellow]What happened recently?[/yellow]")
-        self.console.print("\n[dim]💭 Type 'help' for more examples | 'exit' to quit[/dim]")
+        self.console.print("\n[dim]💭 Type 'help' for more examples | 'stats' for timings | 'exit' to quit[/dim]")
+        if self._init_task and not self._init_task.done():
+            self.console.print("[dim]⏳ Agent is starting in the background; your first answer may take a moment longer.[/dim]")
         
     def _print_help(self):
         """Print help information."""
@@ -112,6 +295,97 @@ class CLI:
 * "Is this contract safe?"
 * "Where did my funds come from?"
 
+### ⏱️ Diagnostics
+* `stats` - where the time went for recent queries
+* `startup` - how long each startup phase took
+* `stream` - turn live output on or off
+
 [dim]Tip: Use full addresses for best results![/dim]
 """
+        from rich.markdown import Markdown
         self.console.print(Panel(Markdown(help_md), title="Help", border_style="blue"))
+
+    def _print_stats(self, limit: int = 10):
+        """Print a per-query timing breakdown from the trace file."""
+        tracer = get_tracer()
+        if not tracer.enabled:
+            self.console.print(
+                f"[yellow]Tracing is off. Set MANAGLYNX_TRACE_PATH (e.g. {SUGGESTED_TRACE_PATH}) to record queries.[/yellow]"
+            )
+            return
+        
+        spans = read_spans(tracer.path)
+        summaries = summarize_traces(spans, limit=limit)
+        if not summaries:
+            self.console.print("[yellow]No traced queries yet.[/yellow]")
+            return
+        
+        from rich.table import Table
+        
+        def cell(summary: dict, kind: str) -> str:
+            entry = summary["breakdown"].get(kind)
+            if not entry:
+                return "[dim]-[/dim]"
+            text = f"{entry['count']}× {_format_ms(entry['ms'])}"
+            return f"{text} [red]({entry['errors']} err)[/red]" if entry["errors"] else text
+        
+        table = Table(title=f"⏱️ Last {len(summaries)} queries", border_style="blue")
+        table.add_column("Query", overflow="fold", max_width=40)
+        table.add_column("Total", justify="right")
+        table.add_column("LLM steps", justify="right")
+        table.add_column("Local tools", justify="right")
+        table.add_column("MCP calls", justify="right")
+        table.add_column("Price API", justify="right")
+        for summary in summaries:
+            status = "" if summary["status"] == "ok" else " [red]✗[/red]"
+            table.add_row(
+                summary["query"] + status,
+                _format_ms(summary["total_ms"]),
+                cell(summary, KIND_LLM),
+                cell(summary, KIND_TOOL),
+                cell(summary, KIND_MCP),
+                cell(summary, KIND_HTTP),
+            )
+        self.console.print(table)
+        
+        # Slowest steps of the latest query
+        latest = summaries[-1]["trace_id"]
+        steps = sorted(
+            (span for span in spans if span["trace_id"] == latest and span.get("parent_id")),
+            key=lambda span: span["duration_ms"],
+            reverse=True,
+        )[:10]
+        if steps:
+            detail = Table(title="🐢 Slowest steps (latest query)", border_style="dim")
+            detail.add_column("Step")
+            detail.add_column("Time", justify="right")
+            detail.add_column("In / out (chars)", justify="right")
+            for span in steps:
+                attrs = span.get("attributes", {})
+                detail.add_row(
+                    span["name"] + ("" if span["status"] == "ok" else " [red]✗[/red]"),
+                    _format_ms(span["duration_ms"]),
+                    f"{attrs.get('request_bytes', 0):,} / {attrs.get('response_bytes', 0):,}",
+                )
+            self.console.print(detail)
+
+    def _print_startup(self):
+        """Print how long each startup phase took."""
+        from rich.table import Table
+        
+        phases = [
+            ("CLI imports", "cli_import_ms"),
+            ("Prompt shown", "prompt_ready_ms"),
+            ("Agent runtime import (background)", "agent_import_ms"),
+            ("Agent initialize (background)", "agent_init_ms"),
+            ("Agent ready", "agent_ready_ms"),
+        ]
+        table = Table(title="🚀 Startup", border_style="green")
+        table.add_column("Phase")
+        table.add_column("Time", justify="right")
+        pending = "[dim]running…[/dim]" if self._init_task and not self._init_task.done() else "[dim]-[/dim]"
+        for label, key in phases:
+            value = self.startup_timings.get(key)
+            table.add_row(label, _format_ms(value) if value is not None else pending)
+        self.console.print(table)
+        self.console.print("[dim]Per-module import times: python -m benchmarks.bench_startup[/dim]")
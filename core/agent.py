@@ -3,24 +3,67 @@ Managlynx-Agent Portfolio Manager.
 AI-powered portfolio management.
 """
 
+import asyncio
 import os
-from typing import Optional, Dict
-from omnicoreagent import OmniAgent, MemoryRouter, EventRouter, ToolRegistry, logger
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Optional, Dict, Iterable, Set
+from omnicoreagent import MemoryRouter, EventRouter, ToolRegistry, logger
 
-from .system_prompt import SYSTEM_INSTRUCTION
-from tools import register_analysis_tools, register_price_tools
-from tools.mcp_tools import MCP_SERVERS
+from .intents import answer_intent, match_intent
+from .instrumentation import instrument_llm, instrument_local_tools, instrument_mcp_sessions
+from .mcp_connections import DEFAULT_CONNECT_TIMEOUT, MCPConnectionManager
+from .routed_agent import RoutedOmniAgent
+from .streaming import STREAM_ANSWER_DELTA, STREAM_RESULT, enable_answer_streaming, event_to_update, stream_answer_to
+from .system_prompt import SYSTEM_INSTRUCTION, build_system_instruction
+from tools import register_analysis_tools, register_price_tools, register_snapshot_tools
+from tools.price_tools import get_price_service
+from tools.mcp_tools import MCP_SERVERS, MCP_SERVER_CHAINS
+from tools.mcp_cache import get_mcp_cache
+from tools.snapshot_tools import get_snapshot_store, snapshot_session
+from utils.cache import LRUCache
+from utils.chains import ALL_CHAINS, detect_chains, is_evm_address, is_solana_address
+from utils.offload import get_offload_pool
+from utils.tracing import KIND_QUERY, get_tracer
+
+# error_type of a failed analyze() result: the query was invalid, or analysis broke
+ERROR_INPUT = "input"
+ERROR_INTERNAL = "internal"
+
+# Bare wallet addresses passed to analyze_many() are expanded into this query
+PORTFOLIO_QUERY_TEMPLATE = "Show the full portfolio for {address}"
 
 
 class ManaglynxAgent:
     """AI-powered portfolio management"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        price_connection_limit: int = 20,
+        lazy_mcp: bool = True,
+        mcp_connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        fast_path: bool = True,
+    ):
         """
         Initialize the Managlynx-Agent.
+        
+        Args:
+            price_connection_limit: Max simultaneous connections to the price API
+            lazy_mcp: Connect MCP servers when a query first needs their chain
+                instead of all of them during initialize()
+            mcp_connect_timeout: Max seconds to wait for any one MCP server
+            fast_path: Answer simple price questions directly from the price
+                service instead of running the agent loop
         """
+        self.price_connection_limit = price_connection_limit
+        self.lazy_mcp = lazy_mcp
+        self.mcp_connect_timeout = mcp_connect_timeout
+        self.fast_path = fast_path
+        self.mcp_connections: Optional[MCPConnectionManager] = None
+        # Chains seen per session, so follow-ups without an address keep them
+        self._session_chains = LRUCache(max_entries=1_000, ttl_seconds=24 * 3600)
         self.tools: Optional[ToolRegistry] = None
-        self.agent: Optional[OmniAgent] = None
+        self.agent: Optional[RoutedOmniAgent] = None
         self.memory_router: Optional[MemoryRouter] = None
         self.event_router: Optional[EventRouter] = None
         self.mcp_servers_connected = False
@@ -40,8 +83,11 @@ class ManaglynxAgent:
         # Register price tools
         register_price_tools(tools)
         
+        # Register session snapshot tools
+        register_snapshot_tools(tools)
+        
         local_tool_count = len(tools.list_tools())
-        logger.info(f"🔧 Registered {local_tool_count} local tools (analysis, prices)")
+        logger.info(f"🔧 Registered {local_tool_count} local tools (analysis, prices, snapshots)")
         
         return tools
 
@@ -56,8 +102,11 @@ class ManaglynxAgent:
         # Create and register tools
         self.tools = self._create_tools()
         
-        # Initialize OmniAgent
-        self.agent = OmniAgent(
+        # Open the shared price API connection pool
+        await get_price_service().start(connection_limit=self.price_connection_limit)
+        
+        # Initialize OmniAgent (narrowed per query by the chain router)
+        self.agent = RoutedOmniAgent(
             name="managlynx_portfolio",
             system_instruction=SYSTEM_INSTRUCTION,
             local_tools=self.tools,
@@ -79,41 +128,307 @@ class ManaglynxAgent:
             # event_router=self.event_router,
             # debug=True
         )
-        await self.agent.connect_mcp_servers()
-        self.mcp_servers_connected = True
+        # analyze_stream() gets the final answer as it is generated
+        enable_answer_streaming(self.agent.llm_connection)
+        
+        # Trace LLM steps and local tools per query (MCP sessions are
+        # instrumented as they connect)
+        tracer = get_tracer()
+        if tracer.enabled:
+            instrument_llm(self.agent.llm_connection, tracer)
+            instrument_local_tools(self.tools, tracer)
+        
+        # MCP servers connect in parallel, each with its own timeout
+        if self.agent.mcp_client:
+            self.mcp_connections = MCPConnectionManager(
+                self.agent.mcp_client,
+                MCP_SERVER_CHAINS,
+                connect_timeout=self.mcp_connect_timeout,
+                on_connect=self._prepare_mcp_sessions,
+            )
+            if not self.lazy_mcp:
+                await self.mcp_connections.ensure_all()
         
         logger.info("✅ Managlynx-Agent initialized successfully")
        
     
-    async def analyze(self, query: str, session_id: str = None) -> str:
+    async def analyze(self, query: str, session_id: str = None) -> Dict[str, Any]:
         """
         Analyze a smart contract based on user query.
         
         Args:
             query: User query (e.g., "Analyze 0x... on ethereum")
+            session_id: Conversation to continue (default: a new session)
+            
+        Returns:
+            Dict with response (the answer as formatted text), session_id and
+            agent_name; on failure a dict with error (message) and error_type,
+            which is "input" for invalid queries and "internal" otherwise
+            
+        Raises:
+            RuntimeError: If agent not initialized
+        """
+        if not self.agent:
+            raise RuntimeError("Agent not initialized. Call initialize() first.")
+        
+        # Resolved up front so tools can file snapshots under the session
+        session_id = session_id or self.agent.generate_session_id()
+        with snapshot_session(session_id), get_tracer().span(
+            "analyze",
+            KIND_QUERY,
+            query=query[:200],
+            session_id=session_id,
+            request_bytes=len(query),
+        ) as span:
+            try:
+                if self.fast_path:
+                    result = await self._answer_fast_path(query, session_id)
+                    if result is not None:
+                        span.set(fast_path=True, response_bytes=len(result["response"]))
+                        return result
+                
+                chains = self._route(query, session_id)
+                span.set(chains=sorted(chains))
+                await self._activate_mcp_servers(chains)
+                result = await self._run_routed(query, session_id, chains)
+                span.set(response_bytes=len(result.get("response") or ""))
+                return result
+            except ValueError as e:
+                span.status, span.error = "error", str(e)
+                # Handle specific validation errors
+                return {
+                    "error": f"❌ Input Error: {str(e)}\nInput should be a valid Ethereum address (0x...).",
+                    "error_type": ERROR_INPUT,
+                }
+            except Exception as e:
+                span.status, span.error = "error", str(e)
+                # Generic catch-all with user-friendly message
+                logger.error(f"❌ Analysis failed: {str(e)}")
+                return {
+                    "error": f"❌ Something went wrong: {str(e)}\n\n💡 Tip: Try checking the address or rephrasing your query.",
+                    "error_type": ERROR_INTERNAL,
+                }
+
+    async def analyze_stream(self, query: str, session_id: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze a query, yielding progress and answer text as they happen.
+        
+        Args:
+            query: User query
+            session_id: Session to run in (a new one if omitted)
+            
+        Yields:
+            Dicts with a 'type' (core.streaming.STREAM_*):
+            thought (message), tool_started (tool, args), tool_result (tool),
+            tool_error (tool, message), answer_delta (text of the final answer
+            as the model writes it) and finally result (the dict analyze()
+            returns, whose response supersedes the streamed text)
+            
+        Raises:
+            RuntimeError: If agent not initialized
+        """
+        if not self.agent:
+            raise RuntimeError("Agent not initialized. Call initialize() first.")
+        
+        session_id = session_id or self.agent.generate_session_id()
+        updates: asyncio.Queue = asyncio.Queue()
+        # Events are naive UTC; earlier runs in the session may have left some queued
+        started = datetime.now(timezone.utc).replace(tzinfo=None)
+        
+        async def relay_events():
+            async for event in self.agent.stream_events(session_id):
+                if event.timestamp < started:
+                    continue
+                update = event_to_update(event)
+                if update:
+                    updates.put_nowait(update)
+        
+        async def run():
+            def on_answer(text: str):
+                updates.put_nowait({"type": STREAM_ANSWER_DELTA, "text": text})
+            
+            with stream_answer_to(on_answer):
+                return await self.analyze(query, session_id=session_id)
+        
+        relay = asyncio.create_task(relay_events())
+        analysis = asyncio.create_task(run())
+        try:
+            while True:
+                next_update = asyncio.ensure_future(updates.get())
+                await asyncio.wait({next_update, analysis}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_update.done():
+                    next_update.cancel()
+                    break
+                yield next_update.result()
             
+            while not updates.empty():
+                yield updates.get_nowait()
+            yield {"type": STREAM_RESULT, "result": analysis.result()}
+        finally:
+            relay.cancel()
+            analysis.cancel()
+            await asyncio.gather(relay, analysis, return_exceptions=True)
+
+    async def _answer_fast_path(self, query: str, session_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Answer simple price questions without the agent loop.
+        
+        Returns:
+            Same shape as OmniAgent.run(), or None if the query needs the agent
+        """
+        intent = match_intent(query)
+        if intent is None:
+            return None
+        
+        with get_tracer().span("fast_path", intent=intent["intent"], token=intent["token"]["symbol"]):
+            response = await answer_intent(intent)
+        if response is None:
+            return None
+        
+        # Record the exchange so follow-ups in the session still have it
+        agent = self.agent
+        session_id = session_id or agent.generate_session_id()
+        metadata = {"agent_name": agent.name}
+        await agent.memory_router.store_message(role="user", content=query, metadata=metadata, session_id=session_id)
+        await agent.memory_router.store_message(role="assistant", content=response, metadata=metadata, session_id=session_id)
+        return {"response": response, "session_id": session_id, "agent_name": agent.name}
+
+    def _prepare_mcp_sessions(self):
+        """Wrap newly connected MCP sessions with the response cache and tracing."""
+        sessions = self.agent.mcp_client.sessions
+        # Cache first, so cache hits still show up as MCP spans and are
+        # captured into session snapshots
+        get_mcp_cache().wrap_sessions(sessions)
+        get_snapshot_store().wrap_sessions(sessions)
+        tracer = get_tracer()
+        if tracer.enabled:
+            instrument_mcp_sessions(sessions, tracer)
+        self.mcp_servers_connected = True
+
+    def _route(self, query: str, session_id: Optional[str]) -> Set[str]:
+        """
+        Work out which chains a query is about, before the LLM sees it.
+        
+        Addresses are classified by format (0x hex vs base58 public keys). A
+        query without any chain signal reuses the chains of the session's last
+        query that had one, so follow-ups still reach the right tools.
+        
+        Returns:
+            Chains to expose tools and prompt sections for; every chain when
+            nothing chain-specific was found
+        """
+        chains: Set[str] = detect_chains(query)
+        if session_id:
+            if chains:
+                self._session_chains.set(session_id, chains)
+            else:
+                chains = self._session_chains.get(session_id) or set()
+        return chains or set(ALL_CHAINS)
+
+    async def _activate_mcp_servers(self, chains: Set[str]) -> None:
+        """Connect the MCP servers serving the routed chains."""
+        if not self.mcp_connections:
+            return
+        
+        with get_tracer().span("mcp_connect", chains=sorted(chains)):
+            await self.mcp_connections.ensure_chains(chains)
+
+    async def _run_routed(self, query: str, session_id: Optional[str], chains: Set[str]) -> Dict[str, Any]:
+        """
+        Run the agent with only the routed chains' MCP tools and prompt modules.
+        
+        Plain OmniAgent.run always sends every connected server's tool
+        schemas and the full multi-chain instruction.
+        
         Returns:
-            Analysis result as formatted text
+            Dict with response, session_id and agent_name
+        """
+        agent = self.agent
+        if self.mcp_connections:
+            mcp_tools = self.mcp_connections.tools_for(chains)
+        else:
+            mcp_tools = agent.mcp_client.available_tools if agent.mcp_client else {}
+        
+        return await agent.run_routed(
+            query,
+            session_id,
+            system_instruction=build_system_instruction(chains, query),
+            mcp_tools=mcp_tools,
+        )
+
+    async def analyze_many(
+        self,
+        queries_or_addresses: Iterable[str],
+        concurrency: int = 5,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze several wallets or queries concurrently.
+        
+        Each item runs in its own session so histories never mix. Results are
+        yielded as soon as each analysis finishes, not in input order.
+        
+        Args:
+            queries_or_addresses: Free-form queries, or bare EVM/Solana
+                addresses that are expanded into a portfolio query
+            concurrency: Max analyses running at the same time
+            
+        Yields:
+            Dict with index (position in the input), input, query,
+            session_id and result (as returned by analyze())
             
         Raises:
             RuntimeError: If agent not initialized
+            ValueError: If concurrency is not positive
         """
         if not self.agent:
             raise RuntimeError("Agent not initialized. Call initialize() first.")
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        batch_id = uuid.uuid4().hex[:8]
         
+        async def run_one(index: int, item: str) -> Dict[str, Any]:
+            query = self._expand_query(item)
+            session_id = f"batch-{batch_id}-{index}"
+            async with semaphore:
+                result = await self.analyze(query, session_id=session_id)
+            return {
+                "index": index,
+                "input": item,
+                "query": query,
+                "session_id": session_id,
+                "result": result,
+            }
+        
+        tasks = [
+            asyncio.create_task(run_one(index, item))
+            for index, item in enumerate(queries_or_addresses)
+        ]
         try:
-            result = await self.agent.run(query=query, session_id=session_id)
-            return result
-        except ValueError as e:
-            # Handle specific validation errors
-            return {"error": f"❌ Input Error: {str(e)}\nInput should be a valid Ethereum address (0x...)."}
-        except Exception as e:
-            # Generic catch-all with user-friendly message
-            logger.error(f"❌ Analysis failed: {str(e)}")
-            return {"error": f"❌ Something went wrong: {str(e)}\n\n💡 Tip: Try checking the address or rephrasing your query."}
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Caller stopped iterating early: don't leave analyses running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _expand_query(item: str) -> str:
+        """Turn a bare wallet address into a portfolio query; leave queries as is."""
+        item = item.strip()
+        if is_evm_address(item) or is_solana_address(item):
+            return PORTFOLIO_QUERY_TEMPLATE.format(address=item)
+        return item
 
     async def shutdown(self):
         """Shutdown the agent and all components."""
+        if self.mcp_connections:
+            await self.mcp_connections.close()
         if self.agent:
             print("Shutting down Managlynx-Agent...")
-            await self.agent.cleanup()
\ No newline at end of file
+            await self.agent.cleanup()
+        await get_price_service().close()
+        get_offload_pool().shutdown(wait=False)
+        get_tracer().close()
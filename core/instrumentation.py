@@ -0,0 +1,132 @@
+"""
+Tracing hooks for the OmniAgent runtime.
+Wraps the LLM connection, the local tool registry and MCP sessions in place,
+so every step of a query shows up as a span under ManaglynxAgent.analyze.
+"""
+
+import functools
+from typing import TYPE_CHECKING, Any, Dict
+
+from utils.tracing import KIND_LLM, KIND_MCP, KIND_TOOL, Tracer, payload_size
+
+if TYPE_CHECKING:
+    from omnicoreagent import ToolRegistry
+
+# Marker set on wrapped objects so instrumenting twice is a no-op
+_INSTRUMENTED = "_managlynx_traced"
+
+
+def _llm_response_stats(response: Any) -> Dict[str, Any]:
+    """Pull token usage and response size from a LiteLLM response."""
+    stats: Dict[str, Any] = {}
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        stats["prompt_tokens"] = getattr(usage, "prompt_tokens", None)
+        stats["completion_tokens"] = getattr(usage, "completion_tokens", None)
+    try:
+        stats["response_bytes"] = len(response.choices[0].message.content or "")
+    except (AttributeError, IndexError, TypeError):
+        stats["response_bytes"] = payload_size(str(response)) if response is not None else 0
+    return stats
+
+
+def instrument_llm(llm_connection: Any, tracer: Tracer) -> None:
+    """Trace every llm_call made through this connection (one span per agent step)."""
+    if llm_connection is None or getattr(llm_connection, _INSTRUMENTED, False):
+        return
+
+    llm_call = llm_connection.llm_call
+    model = (getattr(llm_connection, "llm_config", None) or {}).get("model")
+
+    @functools.wraps(llm_call)
+    async def traced_llm_call(messages, *args, **kwargs):
+        with tracer.span(
+            "llm_step",
+            KIND_LLM,
+            model=model,
+            messages=len(messages),
+            request_bytes=payload_size([getattr(m, "content", m) for m in messages]),
+        ) as span:
+            response = await llm_call(messages, *args, **kwargs)
+            span.set(**_llm_response_stats(response))
+            return response
+
+    llm_connection.llm_call = traced_llm_call
+    setattr(llm_connection, _INSTRUMENTED, True)
+
+
+def instrument_local_tools(tools: "ToolRegistry", tracer: Tracer) -> None:
+    """Trace every local tool execution."""
+    if tools is None or getattr(tools, _INSTRUMENTED, False):
+        return
+
+    execute_tool = tools.execute_tool
+
+    @functools.wraps(execute_tool)
+    async def traced_execute_tool(tool_name: str, parameters: Dict[str, Any]) -> Any:
+        with tracer.span(
+            f"tool:{tool_name}",
+            KIND_TOOL,
+            tool=tool_name,
+            request_bytes=payload_size(parameters),
+        ) as span:
+            result = await execute_tool(tool_name, parameters)
+            span.set(response_bytes=payload_size(result))
+            if isinstance(result, dict) and result.get("status") == "error":
+                span.status = "error"
+                span.error = result.get("message")
+            return result
+
+    tools.execute_tool = traced_execute_tool
+    setattr(tools, _INSTRUMENTED, True)
+
+
+def _mcp_result_size(result: Any) -> int:
+    """Size of the text and structured content in an MCP CallToolResult."""
+    size = 0
+    for item in getattr(result, "content", None) or []:
+        size += len(getattr(item, "text", "") or "")
+    structured = getattr(result, "structuredContent", None)
+    if structured:
+        size += payload_size(structured)
+    return size
+
+
+def instrument_mcp_sessions(sessions: Dict[str, Dict[str, Any]], tracer: Tracer) -> None:
+    """
+    Trace call_tool on every connected MCP session.
+
+    Safe to call again after new servers connect; sessions already wrapped
+    are skipped.
+
+    Args:
+        sessions: MCPClient.sessions (server name -> {"session": ClientSession, ...})
+        tracer: Tracer to record spans with
+    """
+    for server_name, info in (sessions or {}).items():
+        session = info.get("session") if isinstance(info, dict) else None
+        if session is None or getattr(session, _INSTRUMENTED, False):
+            continue
+        _wrap_call_tool(session, server_name, tracer)
+
+
+def _wrap_call_tool(session: Any, server_name: str, tracer: Tracer) -> None:
+    call_tool = session.call_tool
+
+    @functools.wraps(call_tool)
+    async def traced_call_tool(name: str, arguments: Dict[str, Any] = None, *args, **kwargs):
+        with tracer.span(
+            f"mcp:{server_name}/{name}",
+            KIND_MCP,
+            server=server_name,
+            tool=name,
+            request_bytes=payload_size(arguments),
+        ) as span:
+            result = await call_tool(name, arguments, *args, **kwargs)
+            span.set(response_bytes=_mcp_result_size(result))
+            if getattr(result, "isError", False):
+                span.status = "error"
+            return result
+
+    session.call_tool = traced_call_tool
+    setattr(session, _INSTRUMENTED, True)
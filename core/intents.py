@@ -0,0 +1,126 @@
+"""
+Fast-path intents.
+Recognizes simple price questions ("What is the current price of WETH?",
+"How much is 5,000 USDC worth?") and answers them straight from the price
+service, without the agent loop. Anything not recognized goes to the agent.
+"""
+
+import math
+import re
+from typing import Any, Dict, Optional
+
+from tools.price_tools import PriceService, get_price_service
+from utils.formatting import format_token_amount, format_usd
+from utils.tokens import get_token_registry
+
+INTENT_PRICE = "price"
+INTENT_VALUE = "value"
+
+_TOKEN = r"(?P<token>0x[a-fA-F0-9]{40}|[1-9A-HJ-NP-Za-km-z]{32,44}|\$?[A-Za-z0-9]{1,12})"
+_AMOUNT = r"(?P<amount>\d[\d,]*(?:\.\d+)?|\.\d+)\s?(?P<scale>[kmb])?"
+_USD = r"(?: in (?:usd|dollars))?"
+_END = r"(?: right now| now| today| currently)?\s*[?.!]*$"
+
+# (intent, pattern), tried in order against the whole query
+INTENT_PATTERNS = [
+    # "How much is 5,000 USDC worth?", "What's the value of 2.5 ETH?"
+    (INTENT_VALUE, rf"^(?:how much (?:is|are|would be)|what(?:'s| is| are) (?:the )?(?:usd |dollar )?(?:value|worth) of) {_AMOUNT} {_TOKEN}(?: worth)?{_USD}{_END}"),
+    # "5k USDC in USD", "convert 3 ETH to dollars"
+    (INTENT_VALUE, rf"^(?:convert )?{_AMOUNT} {_TOKEN} (?:in|to) (?:usd|dollars){_END}"),
+    # "What is the current price of WETH?", "price of 0x..."
+    (INTENT_PRICE, rf"^(?:what(?:'s| is) |get |show(?: me)? |check |tell me )?(?:the )?(?:current |latest |live )?(?:usd |dollar )?price (?:of|for) {_TOKEN}(?: token)?{_USD}{_END}"),
+    # "How much is ETH worth?", "What's LINK trading at?"
+    (INTENT_PRICE, rf"^(?:how much is|what(?:'s| is)) (?:one |1 |a )?{_TOKEN}(?: token)? (?:worth|trading at|going for){_USD}{_END}"),
+    # "WETH price?"
+    (INTENT_PRICE, rf"^{_TOKEN} price{_END}"),
+]
+
+_COMPILED = [(intent, re.compile(pattern, re.IGNORECASE)) for intent, pattern in INTENT_PATTERNS]
+
+_SCALES = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+
+def _parse_amount(amount: str, scale: Optional[str]) -> Dict[str, Any]:
+    """Parse '5,000' or '1.5' (+ k/m/b); keeps the decimals the user typed."""
+    digits = amount.replace(",", "")
+    decimals = len(digits.split(".", 1)[1]) if "." in digits and not scale else 0
+    value = float(digits) * _SCALES.get((scale or "").lower(), 1)
+    return {"amount": value, "decimals": min(decimals, 8)}
+
+
+def match_intent(query: str) -> Optional[Dict[str, Any]]:
+    """
+    Recognize a simple price question.
+
+    Args:
+        query: User query
+
+    Returns:
+        Dict with intent, token (symbol, address, name) and, for value
+        questions, amount and decimals; None if the query needs the agent
+        or names a token the registry doesn't know
+    """
+    text = " ".join(query.split())
+    for intent, pattern in _COMPILED:
+        match = pattern.match(text)
+        if not match:
+            continue
+        token = get_token_registry().resolve(match.group("token"))
+        if token is None:
+            return None
+
+        result: Dict[str, Any] = {"intent": intent, "token": token}
+        if intent == INTENT_VALUE:
+            result.update(_parse_amount(match.group("amount"), match.group("scale")))
+        return result
+    return None
+
+
+def _price_decimals(price: float) -> int:
+    """Enough decimals to show sub-dollar prices with 4 significant digits."""
+    if price <= 0 or price >= 1:
+        return 2
+    return min(10, max(2, 3 - math.floor(math.log10(price))))
+
+
+async def answer_intent(intent: Dict[str, Any], price_service: Optional[PriceService] = None) -> Optional[str]:
+    """
+    Answer a recognized intent from the price service.
+
+    Args:
+        intent: Result of match_intent()
+        price_service: Price service to use (default: the global one)
+
+    Returns:
+        Markdown answer, or None if no price is available (the agent can
+        then try other sources)
+    """
+    price_service = price_service or get_price_service()
+    token = intent["token"]
+    price_data = await price_service.get_token_price(token["address"])
+    if not price_data or price_data.get("usd") is None:
+        return None
+
+    price = float(price_data["usd"])
+    # Unknown contracts only have a shortened address; prefer the API's symbol
+    symbol = token["symbol"] if token["name"] else (price_data.get("symbol") or token["symbol"])
+    formatted_price = format_usd(price, _price_decimals(price))
+    name = f" ({token['name']})" if token["name"] else ""
+
+    if intent["intent"] == INTENT_VALUE:
+        amount = format_token_amount(intent["amount"], symbol, intent["decimals"])
+        lines = [
+            f"💰 **{amount}** is worth **{format_usd(intent['amount'] * price)}**",
+            f"1 {symbol}{name} = {formatted_price}",
+        ]
+    else:
+        lines = [f"💰 **{symbol}**{name} is trading at **{formatted_price}**"]
+
+    source = "📡 DeFiLlama"
+    age = price_data.get("age_seconds")
+    if age:
+        source += f" · price from {age:.0f}s ago"
+    if price_data.get("stale"):
+        source += " · ⚠️ refreshing"
+    lines.append(source)
+    return "\n\n".join(lines)
@@ -0,0 +1,287 @@
+"""
+Lazy, parallel MCP server connections.
+Servers are connected concurrently, each with its own timeout, and only when
+a query first needs the chain they serve.
+
+MCPClient's public API connects every configured server at once
+(connect_to_servers) or from a config file inside a task group (add_servers),
+and won't remove the last server. Neither lets one task own one server's
+transport, so this module uses MCPClient's per-server connect and close
+helpers and keeps its bookkeeping the way remove_server does. omnicoreagent
+is pinned in pyproject.toml for that reason.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from omnicoreagent import logger
+from omnicoreagent.mcp_omni_connect.notifications import handle_notifications
+from omnicoreagent.mcp_omni_connect.refresh_server_capabilities import refresh_capabilities
+
+from utils.chains import ALL_CHAINS
+
+# How long a query waits for a server before going ahead without it
+DEFAULT_CONNECT_TIMEOUT = 20.0
+
+# Failed servers are not retried for this long, so every query doesn't pay the timeout
+RETRY_AFTER = 60.0
+
+
+class MCPConnectionManager:
+    """
+    Connect MCP servers on demand through an OmniAgent MCPClient.
+
+    Each server gets an owner task that connects it, keeps it open and closes
+    it on shutdown. The MCP transports are anyio-based and must be opened and
+    closed from the same task, so they can't be closed from whichever query
+    happened to trigger the connection.
+    """
+
+    def __init__(
+        self,
+        mcp_client: Any,
+        server_chains: Dict[str, str],
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        on_connect: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Initialize manager.
+
+        Args:
+            mcp_client: OmniAgent's MCPClient (holds sessions and available tools)
+            server_chains: Server config name -> chain it serves; servers not
+                listed are treated as serving every chain
+            connect_timeout: Max seconds a caller waits for one server. A slow
+                server keeps connecting in the background and is used once ready.
+            on_connect: Called after each server connects (e.g. to wrap sessions)
+        """
+        self.mcp_client = mcp_client
+        self.server_chains = server_chains
+        self.connect_timeout = connect_timeout
+        self.on_connect = on_connect
+
+        self._configs: Optional[Dict[str, Dict]] = None
+        self._ready: Dict[str, asyncio.Future] = {}
+        # Per connection attempt: when callers stop waiting, and the signal
+        # that tells its owner task to disconnect
+        self._deadlines: Dict[str, float] = {}
+        self._release: Dict[str, asyncio.Event] = {}
+        self._owners: Dict[str, asyncio.Task] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._stop = asyncio.Event()
+
+    @property
+    def server_configs(self) -> Dict[str, Dict]:
+        """Server configs from the MCPClient's config file, keyed by name."""
+        if self._configs is None:
+            config = self.mcp_client.config.load_config(self.mcp_client.config_filename)
+            self._configs = config.get("mcpServers", {})
+        return self._configs
+
+    def servers_for(self, chains: Iterable[str]) -> List[str]:
+        """Names of the servers needed for the given chains."""
+        chains = set(chains)
+        return [
+            name for name in self.server_configs
+            if self.server_chains.get(name) is None or self.server_chains[name] in chains
+        ]
+
+    def tools_for(self, chains: Iterable[str]) -> Dict[str, List[Any]]:
+        """
+        Tools of the connected servers that serve the given chains.
+
+        Args:
+            chains: Chain names (utils.chains.CHAIN_*)
+
+        Returns:
+            Subset of MCPClient.available_tools (server name -> tools)
+        """
+        available = self.mcp_client.available_tools
+        tools = {}
+        for name in self.servers_for(chains):
+            server_name = self.mcp_client.added_servers_names.get(name)
+            if server_name in available:
+                tools[server_name] = available[server_name]
+        return tools
+
+    def is_connected(self, name: str) -> bool:
+        """Whether a server has an open session."""
+        server_name = self.mcp_client.added_servers_names.get(name)
+        return server_name is not None and server_name in self.mcp_client.sessions
+
+    async def ensure_chains(self, chains: Iterable[str]) -> Dict[str, bool]:
+        """
+        Connect every server serving one of the chains, concurrently.
+
+        Args:
+            chains: Chain names (utils.chains.CHAIN_*)
+
+        Returns:
+            Dict mapping server name to whether it is connected
+        """
+        return await self.ensure_servers(self.servers_for(chains))
+
+    async def ensure_all(self) -> Dict[str, bool]:
+        """Connect every configured server, concurrently."""
+        return await self.ensure_chains(ALL_CHAINS)
+
+    async def ensure_servers(self, names: Iterable[str]) -> Dict[str, bool]:
+        """
+        Connect the named servers, waiting at most connect_timeout for each.
+
+        Args:
+            names: Server config names
+
+        Returns:
+            Dict mapping server name to whether it is connected
+        """
+        names = list(names)
+        results = await asyncio.gather(*(self._ensure(name) for name in names))
+        return dict(zip(names, results))
+
+    async def _ensure(self, name: str) -> bool:
+        if self.is_connected(name):
+            return True
+        if self._stop.is_set():
+            return False
+
+        failed_at = self._failed_at.get(name)
+        if failed_at is not None and time.monotonic() - failed_at < RETRY_AFTER:
+            return False
+
+        loop = asyncio.get_running_loop()
+        ready = self._ready.get(name)
+        if ready is None or ready.done():
+            # Never tried, failed, or connected once and the session has since dropped
+            if ready is not None and ready.result():
+                logger.warning(f"🔌 MCP server '{name}' lost its session, reconnecting")
+                self._release[name].set()
+            ready = loop.create_future()
+            self._ready[name] = ready
+            self._deadlines[name] = loop.time() + self.connect_timeout
+            self._release[name] = asyncio.Event()
+            self._owners[name] = asyncio.create_task(
+                self._own_connection(name, ready, self._release[name], self._owners.get(name)),
+                name=f"mcp-connection:{name}",
+            )
+
+        # Callers joining an attempt in progress share its deadline
+        remaining = max(self._deadlines[name] - loop.time(), 0)
+        try:
+            # Shielded: timing out here must not cancel the connection itself
+            await asyncio.wait_for(asyncio.shield(ready), remaining)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏳ MCP server '{name}' not ready after {self.connect_timeout:.0f}s, continuing without it")
+            return False
+        return self.is_connected(name)
+
+    async def _own_connection(
+        self,
+        name: str,
+        ready: asyncio.Future,
+        release: asyncio.Event,
+        previous: Optional[asyncio.Task] = None,
+    ) -> None:
+        """
+        Connect one server, hold it open until released, then disconnect it.
+
+        Args:
+            name: Server config name
+            ready: Resolved with whether the server connected
+            release: Set by close(), or when the session drops and a new attempt starts
+            previous: Owner task of the last attempt, which must finish
+                disconnecting before this one connects
+        """
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+
+        started = time.perf_counter()
+        server = {"name": name, "srv_config": self.server_configs[name]}
+        try:
+            result = await self.mcp_client._connect_to_single_server(server, name)
+        except Exception as e:
+            result = str(e)
+
+        connected = self.is_connected(name)
+        if not connected:
+            self._failed_at[name] = time.monotonic()
+            logger.error(f"❌ MCP server '{name}' failed to connect: {result}")
+            ready.set_result(False)
+            return
+
+        self._failed_at.pop(name, None)
+        logger.info(f"🔌 MCP server '{name}' connected in {time.perf_counter() - started:.1f}s")
+        if self.on_connect:
+            self.on_connect()
+        ready.set_result(True)
+
+        listener = asyncio.create_task(self._listen(name), name=f"mcp-notifications:{name}")
+        await release.wait()
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+        await self._disconnect(name)
+
+    async def _listen(self, name: str) -> None:
+        """
+        Handle a server's notifications, as connect_to_servers does for eager connections.
+
+        Tool, resource and prompt list changes refresh the server's entries in
+        MCPClient.available_tools (and resources/prompts).
+        """
+        client = self.mcp_client
+        server_name = client.added_servers_names[name]
+        await handle_notifications(
+            sessions={server_name: client.sessions[server_name]},
+            debug=client.debug,
+            server_names=[server_name],
+            available_tools=client.available_tools,
+            available_resources=client.available_resources,
+            available_prompts=client.available_prompts,
+            refresh_capabilities=refresh_capabilities,
+        )
+
+    async def _disconnect(self, name: str) -> None:
+        """Close a server's session and forget its tools."""
+        client = self.mcp_client
+        server_name = client.added_servers_names.pop(name, None)
+        if server_name is None:
+            return
+        session_info = client.sessions.pop(server_name, None)
+        if session_info:
+            await client._close_session_resources(server_name, session_info)
+        if server_name in client.server_names:
+            client.server_names.remove(server_name)
+        client.available_tools.pop(server_name, None)
+        client.available_resources.pop(server_name, None)
+        client.available_prompts.pop(server_name, None)
+
+    def status(self) -> Dict[str, str]:
+        """Connection state per server: connected, connecting, failed or idle."""
+        states = {}
+        for name in self.server_configs:
+            ready = self._ready.get(name)
+            if self.is_connected(name):
+                states[name] = "connected"
+            elif ready is not None and not ready.done():
+                states[name] = "connecting"
+            elif name in self._failed_at:
+                states[name] = "failed"
+            else:
+                states[name] = "idle"
+        return states
+
+    async def close(self) -> None:
+        """Disconnect every server; connections still being set up get connect_timeout to finish."""
+        self._stop.set()
+        for release in self._release.values():
+            release.set()
+        if self._owners:
+            _, pending = await asyncio.wait(self._owners.values(), timeout=self.connect_timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._owners.clear()
+        self._ready.clear()
+        self._deadlines.clear()
+        self._release.clear()
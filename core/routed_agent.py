@@ -0,0 +1,81 @@
+"""
+OmniAgent that can narrow one run to some chains' tools and prompt.
+
+OmniAgent.run() always sends the agent's full system instruction and every
+connected server's tools. RoutedOmniAgent.run_routed() swaps both for the
+duration of one call and then goes through the public run(), so the agent
+loop's wiring stays omnicoreagent's own.
+"""
+
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from omnicoreagent import OmniAgent
+
+# (system instruction, MCP tools) for the run_routed() call in progress.
+# A context variable, so concurrent queries in different sessions each see
+# their own routing.
+_routing: ContextVar[Optional[Tuple[str, Dict[str, List[Any]]]]] = ContextVar(
+    "managlynx_routing", default=None
+)
+
+
+class _RoutedMCPClient:
+    """An MCPClient that only exposes some servers' tools; everything else is the client's."""
+
+    def __init__(self, client: Any, available_tools: Dict[str, List[Any]]):
+        self._client = client
+        self.available_tools = available_tools
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+class RoutedOmniAgent(OmniAgent):
+    """OmniAgent whose run() can be narrowed per call with run_routed()."""
+
+    @property
+    def system_instruction(self) -> str:
+        routing = _routing.get()
+        return routing[0] if routing else self._system_instruction
+
+    @system_instruction.setter
+    def system_instruction(self, value: str) -> None:
+        self._system_instruction = value
+
+    @property
+    def mcp_client(self) -> Any:
+        routing = _routing.get()
+        if routing is None or self._mcp_client is None:
+            return self._mcp_client
+        return _RoutedMCPClient(self._mcp_client, routing[1])
+
+    @mcp_client.setter
+    def mcp_client(self, value: Any) -> None:
+        self._mcp_client = value
+
+    async def run_routed(
+        self,
+        query: str,
+        session_id: Optional[str],
+        system_instruction: str,
+        mcp_tools: Dict[str, List[Any]],
+    ) -> Dict[str, Any]:
+        """
+        Run the agent with a given instruction and subset of MCP tools.
+
+        Args:
+            query: The user query
+            session_id: Optional session ID for session continuity
+            system_instruction: Instruction to use instead of the agent's own
+            mcp_tools: Server name -> tools to offer (a subset of
+                MCPClient.available_tools)
+
+        Returns:
+            Same as run(): dict with response, session_id and agent_name
+        """
+        token = _routing.set((system_instruction, mcp_tools))
+        try:
+            return await self.run(query, session_id)
+        finally:
+            _routing.reset(token)
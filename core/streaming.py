@@ -0,0 +1,192 @@
+"""
+Incremental output for a running query.
+Streams the model's final answer while it is being generated and turns the
+agent's events (thoughts, tool calls) into progress updates, so a UI can show
+something long before the query finishes.
+"""
+
+import contextvars
+import functools
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import litellm
+from omnicoreagent import logger
+
+# Update types yielded by ManaglynxAgent.analyze_stream()
+STREAM_THOUGHT = "thought"
+STREAM_TOOL_STARTED = "tool_started"
+STREAM_TOOL_RESULT = "tool_result"
+STREAM_TOOL_ERROR = "tool_error"
+STREAM_ANSWER_DELTA = "answer_delta"
+STREAM_RESULT = "result"
+
+# Receives final-answer text for the query running in this context
+_answer_sink: contextvars.ContextVar[Optional[Callable[[str], None]]] = contextvars.ContextVar(
+    "managlynx_answer_sink", default=None
+)
+
+# Marker set on the LLM connection once its llm_call streams
+_STREAMING = "_managlynx_streaming"
+
+
+@contextmanager
+def stream_answer_to(sink: Callable[[str], None]) -> Iterator[None]:
+    """Send final-answer text generated inside this block to sink, chunk by chunk."""
+    token = _answer_sink.set(sink)
+    try:
+        yield
+    finally:
+        _answer_sink.reset(token)
+
+
+class FinalAnswerFilter:
+    """
+    Extract the text between <final_answer> tags from a streamed response.
+
+    The agent's responses are XML (<thought>, <tool_call>, <final_answer>);
+    only the answer is for the user. Tags may be split across chunks, so a
+    tail that could be the start of a tag is held back until the next chunk.
+    """
+
+    OPEN = "<final_answer>"
+    CLOSE = "</final_answer>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._inside = False
+        self._done = False
+        self._started = False
+
+    def feed(self, text: str) -> str:
+        """
+        Add a chunk of the response.
+
+        Returns:
+            Answer text that is now known to be complete, possibly empty
+        """
+        if self._done:
+            return ""
+        self._buffer += text
+
+        if not self._inside:
+            start = self._buffer.find(self.OPEN)
+            if start < 0:
+                self._buffer = self._buffer[-(len(self.OPEN) - 1):]
+                return ""
+            self._inside = True
+            self._buffer = self._buffer[start + len(self.OPEN):]
+
+        end = self._buffer.find(self.CLOSE)
+        if end >= 0:
+            output, self._buffer, self._done = self._buffer[:end], "", True
+        else:
+            keep = len(self.CLOSE) - 1
+            output, self._buffer = self._buffer[:-keep], self._buffer[-keep:]
+
+        # The agent strips the answer; match it for the leading whitespace
+        if not self._started:
+            output = output.lstrip()
+            self._started = bool(output)
+        return output
+
+
+async def _stream_completion(llm_connection: Any, messages: List[Any], sink: Callable[[str], None]) -> Any:
+    """
+    Same request as LLMConnection.llm_call, streamed.
+
+    Returns:
+        The response rebuilt from the chunks, as llm_call would return it
+    """
+    config = llm_connection.llm_config
+    params: Dict[str, Any] = {
+        "model": config["model"],
+        "messages": [llm_connection.to_dict(m) for m in messages],
+        "stream": True,
+        "stream_options": {"include_usage": True},
+        # Per call rather than litellm.drop_params, which is process-wide
+        "drop_params": True,
+    }
+    for key in ("temperature", "max_tokens", "top_p"):
+        if config.get(key) is not None:
+            params[key] = config[key]
+    if config["provider"].lower() == "openrouter":
+        params["stop"] = ["\n\nObservation:"]
+
+    answer = FinalAnswerFilter()
+    chunks = []
+    async for chunk in await litellm.acompletion(**params):
+        chunks.append(chunk)
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            text = answer.feed(delta)
+            if text:
+                sink(text)
+    return litellm.stream_chunk_builder(chunks, messages=params["messages"])
+
+
+def enable_answer_streaming(llm_connection: Any) -> None:
+    """
+    Stream LLM calls made while a stream_answer_to() sink is set.
+
+    Calls outside such a block (and tool-calling requests) go through the
+    original llm_call unchanged. Apply before instrument_llm, so tracing
+    still wraps the streamed call.
+    """
+    if llm_connection is None or getattr(llm_connection, _STREAMING, False):
+        return
+
+    llm_call = llm_connection.llm_call
+
+    @functools.wraps(llm_call)
+    async def streaming_llm_call(messages, tools=None):
+        sink = _answer_sink.get()
+        if sink is None or tools:
+            return await llm_call(messages, tools)
+        try:
+            return await _stream_completion(llm_connection, messages, sink)
+        except Exception as e:
+            # The caller renders the final result anyway, so text already
+            # streamed from the failed attempt is replaced, not duplicated
+            logger.warning(f"Streaming LLM call failed, retrying without streaming: {e}")
+            return await llm_call(messages, tools)
+
+    llm_connection.llm_call = streaming_llm_call
+    setattr(llm_connection, _STREAMING, True)
+
+
+def _tool_args(args: Any, limit: int = 80) -> str:
+    text = args if isinstance(args, str) else str(args)
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def event_to_update(event: Any) -> Optional[Dict[str, Any]]:
+    """
+    Convert an OmniAgent event into a stream update.
+
+    Args:
+        event: omnicoreagent Event
+
+    Returns:
+        Update dict with a 'type', or None for events the stream doesn't relay
+    """
+    payload = event.payload
+    if event.type == "agent_thought":
+        return {"type": STREAM_THOUGHT, "message": payload.message}
+    if event.type == "tool_call_started":
+        return {
+            "type": STREAM_TOOL_STARTED,
+            "tool": payload.tool_name,
+            "args": _tool_args(payload.tool_args),
+            "tool_call_id": payload.tool_call_id,
+        }
+    if event.type == "tool_call_result":
+        return {
+            "type": STREAM_TOOL_RESULT,
+            "tool": payload.tool_name,
+            "tool_call_id": payload.tool_call_id,
+            "response_bytes": len(payload.result or ""),
+        }
+    if event.type == "tool_call_error":
+        return {"type": STREAM_TOOL_ERROR, "tool": payload.tool_name, "message": payload.error_message}
+    return None
@@ -2,16 +2,59 @@
 CryptoLens - AI-Powered Ethereum Portfolio Agent
 """
 
+import time
+
+# Taken before any other import, for the CLI's startup report
+PROCESS_START = time.perf_counter()
+
+import argparse
 import asyncio
+import os
+from dotenv import load_dotenv
 from cli import CLI
 
+CLI_IMPORTED = time.perf_counter()
+
 
 async def main():
     """Run CryptoLens Portfolio Agent."""
-    cli = CLI()
+    cli = CLI(process_start=PROCESS_START)
+    cli.startup_timings["cli_import_ms"] = (CLI_IMPORTED - PROCESS_START) * 1000
     await cli.initialize()
     await cli.run()
 
 
+def parse_args() -> argparse.Namespace:
+    """Command-line options; without --serve the interactive CLI runs."""
+    parser = argparse.ArgumentParser(description="Managlynx-Agent portfolio manager")
+    parser.add_argument("--serve", action="store_true", help="run the HTTP service instead of the CLI")
+    parser.add_argument("--host", default=os.getenv("MANAGLYNX_HOST", "127.0.0.1"), help="service bind address")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MANAGLYNX_PORT", "8080")), help="service port")
+    parser.add_argument(
+        "--concurrency", type=int, default=int(os.getenv("MANAGLYNX_SERVICE_CONCURRENCY", "8")),
+        help="queries analyzed at the same time",
+    )
+    parser.add_argument(
+        "--max-queue", type=int, default=int(os.getenv("MANAGLYNX_SERVICE_QUEUE", "32")),
+        help="queries allowed to wait before clients get 429",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    load_dotenv()
+    args = parse_args()
+    if args.serve:
+        # Imported here so the CLI doesn't pay for the agent runtime up front
+        from service import serve
+
+        try:
+            asyncio.run(serve(args.host, args.port, args.concurrency, args.max_queue))
+        except KeyboardInterrupt:
+            pass
+    else:
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            # The CLI already said goodbye and shut down when the run was cancelled
+            pass
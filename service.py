@@ -0,0 +1,248 @@
+"""
+Managlynx-Agent HTTP service.
+
+Serves many clients from one process: a single ManaglynxAgent (and with it the
+MCP connections, price pool and caches) is shared, while each client talks in
+its own session.
+
+Endpoints:
+    POST /analyze         {"query", "session_id"?} -> analyze() result as JSON
+    POST /analyze/stream  same body -> analyze_stream() updates as JSON lines
+    GET  /health          load and MCP connection state
+
+Session IDs are issued and signed by the server, so a client can only
+continue sessions it was given. There is no other authentication: the service
+is single-tenant and meant for localhost, not the open network.
+
+Run with: python main.py --serve [--host 127.0.0.1] [--port 8080]
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import secrets
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from aiohttp import web
+from omnicoreagent import logger
+
+from core import ManaglynxAgent
+from core.agent import ERROR_INPUT
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# Queries longer than this are rejected with 413
+MAX_QUERY_CHARS = 4_000
+
+
+def _error(status: type, message: str, **headers: str) -> web.HTTPException:
+    """An aiohttp HTTP error with a JSON body."""
+    return status(
+        text=json.dumps({"error": message}),
+        content_type="application/json",
+        headers=headers or None,
+    )
+
+
+class ManaglynxService:
+    """HTTP front end for a shared ManaglynxAgent with bounded concurrency."""
+
+    def __init__(
+        self,
+        agent: Optional[ManaglynxAgent] = None,
+        max_concurrency: int = 8,
+        max_queue: int = 32,
+        session_secret: Optional[bytes] = None,
+    ):
+        """
+        Initialize service.
+
+        Args:
+            agent: Agent to serve (default: a new ManaglynxAgent, initialized
+                by start())
+            max_concurrency: Queries analyzed at the same time
+            max_queue: Queries allowed to wait for a slot; beyond that,
+                requests get 429 Too Many Requests
+            session_secret: Key that signs issued session IDs (default: random
+                per process, so sessions end when the service restarts)
+        """
+        if max_concurrency <= 0 or max_queue < 0:
+            raise ValueError("max_concurrency must be positive and max_queue non-negative")
+
+        self.agent = agent or ManaglynxAgent()
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._session_secret = session_secret or secrets.token_bytes(32)
+
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._running = 0
+        self._waiting = 0
+        self._rejected = 0
+        # One query at a time per session, so its history stays in order
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+        self._session_users: Dict[str, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    def create_app(self) -> web.Application:
+        """Build the aiohttp application."""
+        app = web.Application(client_max_size=64 * 1024)
+        app.router.add_post("/analyze", self._handle_analyze)
+        app.router.add_post("/analyze/stream", self._handle_analyze_stream)
+        app.router.add_get("/health", self._handle_health)
+        return app
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        """Initialize the agent (if needed) and start listening."""
+        if not self.agent.agent:
+            await self.agent.initialize()
+
+        self._runner = web.AppRunner(self.create_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"🌐 Managlynx service listening on http://{host}:{port}")
+
+    async def stop(self) -> None:
+        """Stop accepting requests and shut the agent down."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        await self.agent.shutdown()
+
+    @asynccontextmanager
+    async def _admit(self, session_id: str) -> AsyncIterator[None]:
+        """
+        Hold a concurrency slot (and the session's lock) for one query.
+
+        Raises:
+            web.HTTPTooManyRequests: If max_queue queries are already waiting
+        """
+        if self._waiting >= self.max_queue and (self._slots.locked() or session_id in self._session_locks):
+            self._rejected += 1
+            raise _error(web.HTTPTooManyRequests, "Server busy, retry shortly", **{"Retry-After": "1"})
+
+        self._waiting += 1
+        waiting = True
+        lock = self._session_locks.setdefault(session_id, asyncio.Lock())
+        self._session_users[session_id] = self._session_users.get(session_id, 0) + 1
+        try:
+            async with lock:
+                async with self._slots:
+                    self._waiting -= 1
+                    waiting = False
+                    self._running += 1
+                    try:
+                        yield
+                    finally:
+                        self._running -= 1
+        finally:
+            if waiting:
+                self._waiting -= 1
+            self._session_users[session_id] -= 1
+            if not self._session_users[session_id]:
+                del self._session_users[session_id]
+                del self._session_locks[session_id]
+
+    def _sign(self, session_key: str) -> str:
+        return hmac.new(self._session_secret, session_key.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def issue_session_id(self) -> str:
+        """A new session ID, signed so the server can recognize it later."""
+        session_key = f"svc-{uuid.uuid4().hex}"
+        return f"{session_key}.{self._sign(session_key)}"
+
+    def verify_session_id(self, session_id: str) -> bool:
+        """Whether a session ID was issued by this service."""
+        session_key, _, signature = session_id.rpartition(".")
+        return bool(session_key) and hmac.compare_digest(signature, self._sign(session_key))
+
+    async def _parse(self, request: web.Request) -> Tuple[str, str]:
+        """
+        Read query and session ID from a request body.
+
+        A session ID is issued when the client doesn't send one; clients keep
+        their conversation by sending it back. IDs the service didn't issue
+        are refused, so clients can't pick (or guess) another client's session.
+
+        Raises:
+            web.HTTPForbidden: If the session ID wasn't issued by this service
+        """
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise _error(web.HTTPBadRequest, "Body must be JSON")
+        if not isinstance(body, dict):
+            raise _error(web.HTTPBadRequest, "Body must be a JSON object")
+
+        query = body.get("query")
+        if not isinstance(query, str) or not query.strip():
+            raise _error(web.HTTPBadRequest, "'query' is required")
+        if len(query) > MAX_QUERY_CHARS:
+            raise _error(web.HTTPRequestEntityTooLarge, f"'query' is limited to {MAX_QUERY_CHARS} characters")
+
+        session_id = body.get("session_id") or request.headers.get("X-Session-Id")
+        if session_id is None:
+            return query.strip(), self.issue_session_id()
+        if not isinstance(session_id, str) or not self.verify_session_id(session_id):
+            raise _error(web.HTTPForbidden, "Unknown 'session_id'; omit it to start a new session")
+        return query.strip(), session_id
+
+    async def _handle_analyze(self, request: web.Request) -> web.Response:
+        query, session_id = await self._parse(request)
+        async with self._admit(session_id):
+            result = await self.agent.analyze(query, session_id=session_id)
+
+        if "error" not in result:
+            status = 200
+        else:
+            # Bad queries are the client's to fix; anything else is on us
+            status = 400 if result.get("error_type") == ERROR_INPUT else 500
+        return web.json_response({"session_id": session_id, **result}, status=status)
+
+    async def _handle_analyze_stream(self, request: web.Request) -> web.StreamResponse:
+        query, session_id = await self._parse(request)
+        async with self._admit(session_id):
+            response = web.StreamResponse(headers={
+                "Content-Type": "application/x-ndjson",
+                "X-Session-Id": session_id,
+            })
+            await response.prepare(request)
+            async for update in self.agent.analyze_stream(query, session_id=session_id):
+                await response.write((json.dumps(update, default=str) + "\n").encode())
+            await response.write_eof()
+        return response
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.status())
+
+    def status(self) -> Dict:
+        """Current load and MCP connection state."""
+        connections = self.agent.mcp_connections
+        return {
+            "status": "ok" if self.agent.agent else "starting",
+            "running": self._running,
+            "waiting": self._waiting,
+            "rejected": self._rejected,
+            "active_sessions": len(self._session_locks),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "mcp_servers": connections.status() if connections else {},
+        }
+
+
+async def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    max_concurrency: int = 8,
+    max_queue: int = 32,
+) -> None:
+    """Run the service until cancelled (Ctrl+C)."""
+    service = ManaglynxService(max_concurrency=max_concurrency, max_queue=max_queue)
+    await service.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
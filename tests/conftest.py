@@ -0,0 +1,51 @@
+"""
+Shared fixtures.
+
+Async scenarios run under asyncio.run(); price lookups go to a local
+benchmarks.price_stub.PriceStub instead of DeFiLlama.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+import pytest
+
+from benchmarks.price_stub import PriceStub
+from tools.price_tools import PriceService
+
+Scenario = Callable[[PriceService, PriceStub], Awaitable[Any]]
+
+
+def run_with_price_stub(
+    scenario: Scenario,
+    latency: float = 0.0,
+    service: Optional[PriceService] = None,
+) -> Any:
+    """
+    Run a scenario against a price service pointed at a fresh PriceStub.
+
+    Args:
+        scenario: Coroutine function taking (service, stub)
+        latency: Seconds the stub waits before answering each request
+        service: Service to use (default: a new PriceService)
+
+    Returns:
+        Whatever the scenario returns
+    """
+    async def main() -> Any:
+        async with PriceStub(latency=latency) as stub:
+            price_service = service or PriceService()
+            price_service.BASE_URL = stub.url
+            price_service.HISTORICAL_URL = stub.historical_url
+            try:
+                return await scenario(price_service, stub)
+            finally:
+                await price_service.close()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def with_price_stub() -> Callable[..., Any]:
+    """run_with_price_stub, for tests that exercise PriceService."""
+    return run_with_price_stub
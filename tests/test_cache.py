@@ -0,0 +1,149 @@
+"""
+LRUCache expiry heap, eviction and stale window; SQLiteCache persistence,
+write-behind and table isolation.
+"""
+
+import threading
+
+import pytest
+
+from utils import cache as cache_module
+from utils.cache import NEVER_EXPIRE, LRUCache, SQLiteCache
+
+
+class Clock:
+    """Stand-in for time.time() that only moves when told to."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, "time", clock)
+    return clock
+
+
+def test_expired_entries_are_purged_on_write(clock):
+    cache = LRUCache(max_entries=100)
+    cache.set("short", 1, ttl=10)
+    cache.set("long", 2, ttl=100)
+
+    clock.advance(50)
+    cache.set("new", 3)
+
+    # Purged without ever being looked up
+    assert "short" not in cache._cache
+    assert cache.stats()["expirations"] == 1
+    assert cache.get("long") == 2
+
+
+def test_rewritten_key_outlives_its_old_heap_entry(clock):
+    cache = LRUCache(max_entries=100)
+    cache.set("key", "old", ttl=10)
+    cache.set("key", "new", ttl=100)
+
+    clock.advance(50)
+    cache.set("other", 1)
+
+    assert cache.get("key") == "new"
+    assert cache.stats()["expirations"] == 0
+
+
+def test_expiry_heap_stays_bounded(clock):
+    cache = LRUCache(max_entries=3)
+    for i in range(50):
+        cache.set("key", i)
+
+    assert len(cache._expiry_heap) <= 2 * cache.max_entries
+    assert cache.get("key") == 49
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_stale_entry_is_kept_for_the_grace_window(clock):
+    cache = LRUCache(max_entries=100, ttl_seconds=10, stale_seconds=30)
+    cache.set("key", "value")
+
+    clock.advance(20)
+    assert cache.get("key") is None
+    assert cache.get_stale("key") == ("value", 20, True)
+
+    # Past the grace window the write-time purge drops it
+    clock.advance(25)
+    cache.set("other", 1)
+    assert "key" not in cache._cache
+    assert cache.get_stale("key") is None
+
+
+def test_sqlite_tables_expire_independently(tmp_path, clock):
+    path = tmp_path / "cache.db"
+    prices = SQLiteCache(path, stale_seconds=120)
+    responses = SQLiteCache(path, table="mcp")
+    prices.set("price:eth", {"usd": 1.0}, ttl=10)
+    responses.set("mcp:server:tool:abc", {"content": []}, ttl=10)
+
+    clock.advance(60)
+    responses.clear_expired()
+
+    # The price is expired but still inside its own grace window, on disk too
+    assert len(responses) == 0
+    prices.flush()
+    reopened = SQLiteCache(path, stale_seconds=120)
+    assert reopened.get_stale("price:eth") == ({"usd": 1.0}, 60, True)
+
+
+def test_sqlite_entries_survive_a_restart(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = SQLiteCache(path, namespace_ttls={"token": NEVER_EXPIRE})
+    cache.set("token:eth", {"symbol": "ETH", "decimals": 18})
+    cache.set("price:eth", {"usd": 1.0})
+    # Readable at once, before the writer thread has stored it
+    assert cache.get("price:eth") == {"usd": 1.0}
+    cache.close()
+
+    reopened = SQLiteCache(path)
+    assert reopened.get("token:eth") == {"symbol": "ETH", "decimals": 18}
+    assert reopened.get("price:eth") == {"usd": 1.0}
+    assert reopened.stats()["memory_size"] == 2
+
+
+def test_sqlite_writes_happen_off_the_calling_thread(tmp_path, monkeypatch):
+    cache = SQLiteCache(tmp_path / "cache.db")
+    writers = set()
+    apply = cache._apply
+
+    def record_thread(op):
+        writers.add(threading.current_thread())
+        apply(op)
+
+    monkeypatch.setattr(cache, "_apply", record_thread)
+    for i in range(SQLiteCache.PURGE_INTERVAL):
+        cache.set(f"price:{i}", i)
+    cache.delete("price:0")
+    cache.flush()
+
+    assert writers == {cache._writer}
+    assert len(cache) == SQLiteCache.PURGE_INTERVAL - 1
+
+
+def test_sqlite_rejects_invalid_table_name(tmp_path):
+    with pytest.raises(ValueError):
+        SQLiteCache(tmp_path / "cache.db", table="cache; DROP TABLE cache")
@@ -0,0 +1,31 @@
+"""
+MCP response cache TTL policies.
+"""
+
+import pytest
+
+from tools.mcp_cache import HEAD_TTL, MCPResponseCache
+from utils.cache import NEVER_EXPIRE
+
+
+@pytest.mark.parametrize("tool_name", [
+    "getsourcecode", "get_contract_abi", "getabi", "eth_getCode", "get_bytecode", "get_contract_source_code",
+])
+def test_contract_code_is_cached_forever(tool_name):
+    assert MCPResponseCache().ttl_for(tool_name, {}) == NEVER_EXPIRE
+
+
+@pytest.mark.parametrize("tool_name", ["get_stability_fee", "get_liabilities", "capabilities", "decode_input"])
+def test_names_merely_containing_immutable_words_are_not(tool_name):
+    assert MCPResponseCache().ttl_for(tool_name, {}) != NEVER_EXPIRE
+
+
+def test_state_changing_tools_are_never_cached():
+    assert MCPResponseCache().ttl_for("transfer_tokens", {}) == 0
+
+
+def test_chain_head_arguments_cap_the_ttl():
+    cache = MCPResponseCache()
+
+    assert cache.ttl_for("get_block_by_number", {"block": "latest"}) == HEAD_TTL
+    assert cache.ttl_for("get_block_by_number", {"block": "0x10"}) == 3600
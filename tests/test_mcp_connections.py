@@ -0,0 +1,133 @@
+"""
+MCPConnectionManager: lazy connections, shared deadlines and notifications.
+"""
+
+import asyncio
+from typing import Dict, List
+
+from mcp.types import ListToolsResult, ServerNotification, Tool, ToolListChangedNotification
+
+from core.mcp_connections import MCPConnectionManager
+
+
+class FakeSession:
+    """ClientSession stand-in whose notifications are pushed by the test."""
+
+    def __init__(self, tools: List[str]):
+        self.tools = tools
+        self.notifications: asyncio.Queue = asyncio.Queue()
+
+    @property
+    async def incoming_messages(self):
+        while True:
+            yield await self.notifications.get()
+
+    async def list_tools(self) -> ListToolsResult:
+        return ListToolsResult(tools=[Tool(name=name, inputSchema={"type": "object"}) for name in self.tools])
+
+    async def list_resources(self):
+        raise NotImplementedError
+
+    async def list_prompts(self):
+        raise NotImplementedError
+
+
+class FakeConfig:
+    def __init__(self, servers: Dict[str, Dict]):
+        self.servers = servers
+
+    def load_config(self, filename: str) -> Dict:
+        return {"mcpServers": self.servers}
+
+
+class FakeMCPClient:
+    """Just enough of MCPClient for the manager; 'slow' takes a while to connect."""
+
+    config_filename = "servers_config.json"
+    debug = False
+
+    def __init__(self, *names: str):
+        self.config = FakeConfig({name: {} for name in names})
+        self.sessions: Dict[str, Dict] = {}
+        self.added_servers_names: Dict[str, str] = {}
+        self.server_names: List[str] = []
+        self.available_tools: Dict[str, List] = {}
+        self.available_resources: Dict[str, List] = {}
+        self.available_prompts: Dict[str, List] = {}
+        self.connects = 0
+
+    async def _connect_to_single_server(self, server: Dict, name: str) -> str:
+        self.connects += 1
+        await asyncio.sleep(0.3 if name == "slow" else 0)
+        session = FakeSession([f"{name}_tool"])
+        self.server_names.append(name)
+        self.added_servers_names[name] = name
+        self.sessions[name] = {"session": session, "connected": True}
+        self.available_tools[name] = (await session.list_tools()).tools
+        return f"{name} connected"
+
+    async def _close_session_resources(self, server_name: str, session_info: Dict) -> None:
+        pass
+
+
+def test_dropped_session_is_reconnected():
+    async def scenario():
+        client = FakeMCPClient("etherscan")
+        manager = MCPConnectionManager(client, {})
+        first = await manager.ensure_servers(["etherscan"])
+        # The server went away behind the manager's back
+        client.sessions.pop("etherscan")
+        client.server_names.remove("etherscan")
+
+        second = await manager.ensure_servers(["etherscan"])
+        await manager.close()
+        return first, second, client.connects
+
+    assert asyncio.run(scenario()) == ({"etherscan": True}, {"etherscan": True}, 2)
+
+
+def test_callers_share_one_deadline_per_attempt():
+    async def scenario():
+        manager = MCPConnectionManager(FakeMCPClient("slow"), {}, connect_timeout=0.2)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        async def join_late():
+            await asyncio.sleep(0.15)
+            return await manager.ensure_servers(["slow"])
+
+        results = await asyncio.gather(manager.ensure_servers(["slow"]), join_late())
+        waited = loop.time() - started
+        await manager.close()
+        return results, waited
+
+    results, waited = asyncio.run(scenario())
+
+    assert results == [{"slow": False}, {"slow": False}]
+    assert waited < 0.3
+
+
+def test_tool_list_changes_are_picked_up():
+    async def scenario():
+        client = FakeMCPClient("etherscan")
+        manager = MCPConnectionManager(client, {})
+        await manager.ensure_servers(["etherscan"])
+
+        session = client.sessions["etherscan"]["session"]
+        session.tools = ["etherscan_tool", "new_tool"]
+        await session.notifications.put(
+            ServerNotification(ToolListChangedNotification(method="notifications/tools/list_changed"))
+        )
+        for _ in range(50):
+            if len(client.available_tools["etherscan"]) == 2:
+                break
+            await asyncio.sleep(0.01)
+
+        tools = [tool.name for tool in manager.tools_for(["ethereum"])["etherscan"]]
+        await manager.close()
+        return tools, client.sessions
+
+    tools, sessions = asyncio.run(scenario())
+
+    assert tools == ["etherscan_tool", "new_tool"]
+    assert sessions == {}
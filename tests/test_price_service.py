@@ -0,0 +1,203 @@
+"""
+PriceService request coalescing and stale-while-revalidate.
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.price_stub import PriceStub
+from benchmarks.synthetic import generate_token_addresses
+from tools.price_tools import PriceService
+from utils.cache import NEVER_EXPIRE
+
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+
+def test_concurrent_lookups_of_one_token_share_a_fetch(with_price_stub):
+    async def scenario(service, stub):
+        results = await asyncio.gather(*(service.get_token_price(WETH) for _ in range(10)))
+        return results, stub.requests, stub.coins_requested
+
+    results, requests, coins = with_price_stub(scenario, latency=0.05)
+
+    assert (requests, coins) == (1, 1)
+    expected = PriceStub.quote(f"ethereum:{WETH.lower()}")["price"]
+    assert all(result["usd"] == expected for result in results)
+
+
+def test_lookup_joins_fetch_already_in_flight(with_price_stub):
+    async def scenario(service, stub):
+        first = asyncio.create_task(service.get_token_price(WETH))
+        # Let the first lookup's window flush so its fetch is in flight
+        await asyncio.sleep(service.batch_window * 3)
+        assert f"ethereum:{WETH.lower()}" in service._inflight
+        second = await service.get_token_price(WETH)
+        return await first, second, stub.requests
+
+    first, second, requests = with_price_stub(scenario, latency=0.1)
+
+    assert requests == 1
+    assert first["usd"] == second["usd"]
+
+
+def test_distinct_tokens_in_one_window_are_batched(with_price_stub):
+    tokens = generate_token_addresses(20)
+
+    async def scenario(service, stub):
+        results = await asyncio.gather(*(service.get_token_price(token) for token in tokens))
+        return results, stub.requests, stub.coins_requested
+
+    results, requests, coins = with_price_stub(scenario)
+
+    assert requests == 1
+    assert coins == 20
+    assert [result["usd"] for result in results] == [
+        PriceStub.quote(f"ethereum:{token}")["price"] for token in tokens
+    ]
+
+
+def test_full_batch_flushes_before_window_ends(with_price_stub):
+    tokens = generate_token_addresses(12)
+    service = PriceService(batch_window=60)
+    service.MAX_BATCH_SIZE = 5
+
+    async def scenario(service, stub):
+        lookups = [asyncio.create_task(service.get_token_price(token)) for token in tokens]
+        await asyncio.sleep(0.2)
+        # Two full batches went out at once; the remaining two wait for the window
+        sent = stub.requests, len(service._pending)
+        service._flush_pending()
+        await asyncio.gather(*lookups)
+        return sent, stub.requests
+
+    sent, requests = with_price_stub(scenario, service=service)
+
+    assert sent == (2, 2)
+    assert requests == 3
+
+
+def test_close_releases_callers_waiting_for_a_window(with_price_stub):
+    service = PriceService(batch_window=60)
+
+    async def scenario(service, stub):
+        lookup = asyncio.create_task(service.get_token_price(WETH))
+        await asyncio.sleep(0)
+        await service.close()
+        return await lookup, stub.requests
+
+    # get_token_price logs the RuntimeError and reports the price as unknown
+    assert with_price_stub(scenario, service=service) == (None, 0)
+
+
+def test_stale_price_is_served_while_it_refreshes(with_price_stub):
+    query_id = f"ethereum:{WETH.lower()}"
+
+    async def scenario(service, stub):
+        # Expired a second ago, well inside the grace window
+        service.cache.set(f"price:{query_id}", {"usd": 1.0, "symbol": "WETH"}, ttl=-1)
+
+        stale = await service.get_token_price(WETH)
+        requests_before_refresh = stub.requests
+        await asyncio.gather(*service._background_tasks)
+        fresh = await service.get_token_price(WETH)
+        return stale, requests_before_refresh, fresh, stub.requests
+
+    stale, requests_before_refresh, fresh, requests = with_price_stub(scenario, latency=0.05)
+
+    assert stale["usd"] == 1.0 and stale["stale"] is True
+    assert requests_before_refresh == 0
+    assert fresh["stale"] is False
+    assert fresh["usd"] == PriceStub.quote(f"ethereum:{WETH.lower()}")["price"]
+    assert requests == 1
+
+
+def test_concurrent_stale_reads_trigger_one_refresh(with_price_stub):
+    query_id = f"ethereum:{WETH.lower()}"
+
+    async def scenario(service, stub):
+        service.cache.set(f"price:{query_id}", {"usd": 1.0}, ttl=-1)
+        results = await asyncio.gather(*(service.get_token_price(WETH) for _ in range(5)))
+        await asyncio.gather(*service._background_tasks)
+        return results, stub.requests
+
+    results, requests = with_price_stub(scenario, latency=0.05)
+
+    assert all(result["stale"] for result in results)
+    assert requests == 1
+
+
+def test_price_past_grace_window_is_fetched_before_answering(with_price_stub):
+    query_id = f"ethereum:{WETH.lower()}"
+
+    async def scenario(service, stub):
+        service.cache.set(f"price:{query_id}", {"usd": 1.0}, ttl=-(service.STALE_GRACE_SECONDS + 1))
+        return await service.get_token_price(WETH), stub.requests
+
+    price, requests = with_price_stub(scenario)
+
+    assert requests == 1
+    assert price["usd"] == PriceStub.quote(query_id)["price"]
+    assert "stale" not in price
+
+
+def test_stale_serving_can_be_disabled(with_price_stub):
+    query_id = f"ethereum:{WETH.lower()}"
+    service = PriceService(stale_grace_seconds=0)
+
+    async def scenario(service, stub):
+        service.cache.set(f"price:{query_id}", {"usd": 1.0}, ttl=-1)
+        return await service.get_token_price(WETH), stub.requests
+
+    price, requests = with_price_stub(scenario, service=service)
+
+    assert requests == 1
+    assert price["usd"] != 1.0
+
+
+def test_close_cancels_fetches_in_flight(with_price_stub):
+    async def scenario(service, stub):
+        lookup = asyncio.create_task(service.get_token_price(WETH))
+        await asyncio.sleep(0.1)
+        assert service._background_tasks
+        await service.close()
+        # Nothing is left running against the closed session
+        left_running = set(service._background_tasks), dict(service._inflight)
+        closed = await lookup, *left_running
+
+        # A later lookup starts a fresh fetch instead of joining the dead one
+        stub.latency = 0
+        return closed, await service.get_token_price(WETH)
+
+    closed, after = with_price_stub(scenario, latency=0.5)
+
+    assert closed == (None, set(), {})
+    assert after["usd"] == PriceStub.quote(f"ethereum:{WETH.lower()}")["price"]
+
+
+def test_only_nearby_historical_points_are_cached_forever():
+    service = PriceService()
+    bucket = service._history_bucket(1_700_000_000)
+    # DeFiLlama answered one point from within the hour and one from 5 hours later
+    points = {
+        ("coingecko:ethereum", bucket): {"usd": 2000.0, "timestamp": bucket + 1_800},
+        ("coingecko:solana", bucket): {"usd": 50.0, "timestamp": bucket + 5 * 3600},
+    }
+
+    async def fetch(wanted):
+        return points
+
+    service._fetch_historical = fetch
+    asyncio.run(service.get_historical_prices([("eth", bucket), ("sol", bucket)]))
+
+    expires = {key: entry[2] for key, entry in service.history_cache._cache.items()}
+    assert expires[f"hist:coingecko:ethereum:{bucket}"] == NEVER_EXPIRE
+    assert expires[f"hist:coingecko:solana:{bucket}"] < NEVER_EXPIRE
+
+
+def test_resolve_coin_id_validates_the_chain():
+    service = PriceService()
+
+    assert service.resolve_coin_id(f"base:{WETH}") == f"base:{WETH.lower()}"
+    with pytest.raises(ValueError):
+        service.resolve_coin_id(WETH, chain="moonchain")
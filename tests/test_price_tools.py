@@ -0,0 +1,93 @@
+"""
+Price tools: historical valuation of transaction histories.
+"""
+
+import pytest
+from omnicoreagent import ToolRegistry
+
+from benchmarks.price_stub import PriceStub
+from tools import price_tools
+from tools.price_tools import _transaction_transfer, get_price_service, register_price_tools
+from tools.snapshot_tools import SnapshotStore, snapshot_session
+
+WALLET = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+COUNTERPARTY = "0x1111111111111111111111111111111111111111"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+TIMESTAMP = 1_700_000_000
+
+
+def usdc_transfer(value: str) -> dict:
+    return {
+        "hash": f"0x{value}",
+        "timeStamp": str(TIMESTAMP),
+        "from": COUNTERPARTY,
+        "to": WALLET,
+        "value": value,
+        "contractAddress": USDC,
+        "tokenDecimal": "6",
+        "tokenSymbol": "USDC",
+    }
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    """Price tools bound to a fresh in-memory price service."""
+    monkeypatch.delenv("MANAGLYNX_CACHE_PATH", raising=False)
+    monkeypatch.setattr(price_tools, "_price_service", None)
+    registry = ToolRegistry()
+    register_price_tools(registry)
+    return registry
+
+
+def test_zero_value_transfers_are_skipped():
+    assert _transaction_transfer(usdc_transfer("0")) is None
+    assert _transaction_transfer({"value": "0", "from": COUNTERPARTY, "to": WALLET}) is None
+    assert _transaction_transfer(usdc_transfer("5000000")) == (USDC, "USDC", 5.0)
+
+
+def test_history_with_zero_value_token_transfer_is_valued(tools, with_price_stub):
+    transactions = [usdc_transfer("0"), usdc_transfer("5000000")]
+
+    async def scenario(service, stub):
+        return await tools.execute_tool(
+            "value_transaction_history", {"transactions": transactions, "address": WALLET}
+        )
+
+    result = with_price_stub(scenario, service=get_price_service())
+
+    assert result["status"] == "success"
+    assert result["message"].startswith("Valued 1 of 1 transfers")
+    expected = 5.0 * PriceStub.quote(f"ethereum:{USDC.lower()}@{TIMESTAMP // 3600}")["price"]
+    assert result["data"]["usd_in"] == pytest.approx(expected)
+
+
+def test_invalid_lookups_are_reported_not_raised(tools, with_price_stub):
+    lookups = [
+        {"contract_address": "eth", "timestamp": TIMESTAMP, "amount": "abc"},
+        {"contract_address": "eth", "timestamp": TIMESTAMP, "amount": "2"},
+        {"contract_address": USDC, "chain": "moonchain", "timestamp": TIMESTAMP},
+    ]
+
+    async def scenario(service, stub):
+        return await tools.execute_tool("get_historical_prices", {"lookups": lookups})
+
+    result = with_price_stub(scenario, service=get_price_service())
+
+    assert result["status"] == "success"
+    assert [entry["index"] for entry in result["data"]["invalid"]] == [0, 2]
+    assert len(result["data"]["prices"]) == 1
+
+
+def test_snapshot_prices_are_keyed_by_coin_id(tools, with_price_stub, monkeypatch):
+    store = SnapshotStore()
+    monkeypatch.setattr(price_tools, "get_snapshot_store", lambda: store)
+
+    async def scenario(service, stub):
+        with snapshot_session("s1"):
+            await tools.execute_tool("get_token_prices", {"contract_addresses": [USDC]})
+            await tools.execute_tool("value_portfolio", {"holdings": [{"contract_address": USDC, "balance": 2}]})
+            await tools.execute_tool("get_token_price", {"contract_address": f"ethereum:{USDC}"})
+
+    with_price_stub(scenario, service=get_price_service())
+
+    assert list(store.get("s1", WALLET)["prices"]) == [f"ethereum:{USDC.lower()}"]
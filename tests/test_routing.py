@@ -0,0 +1,89 @@
+"""
+Chain routing: per-session chain memory and narrowed agent runs.
+"""
+
+import asyncio
+
+import pytest
+
+from core import ManaglynxAgent
+from core.routed_agent import RoutedOmniAgent
+from utils.chains import ALL_CHAINS
+
+EVM_WALLET = "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045"
+SOLANA_WALLET = "7xKXtg2CW87d97TXJSDpbD5jBkheTqA83TZRuJosgAsU"
+
+
+def test_follow_up_without_chain_signal_keeps_last_chains():
+    agent = ManaglynxAgent()
+
+    assert agent._route(f"Portfolio of {EVM_WALLET}", "s1") == {"evm"}
+    assert agent._route("And its recent transactions?", "s1") == {"evm"}
+
+
+def test_new_chain_replaces_earlier_ones():
+    agent = ManaglynxAgent()
+    agent._route(f"Portfolio of {EVM_WALLET}", "s1")
+
+    assert agent._route(f"What about {SOLANA_WALLET}?", "s1") == {"solana"}
+    assert agent._route("Any swaps?", "s1") == {"solana"}
+
+
+def test_sessions_route_independently():
+    agent = ManaglynxAgent()
+    agent._route(f"Portfolio of {EVM_WALLET}", "s1")
+
+    assert agent._route("Any swaps?", "s2") == set(ALL_CHAINS)
+
+
+@pytest.fixture
+def omni_agent(tmp_path, monkeypatch):
+    """RoutedOmniAgent with an unconnected MCP client and a recording agent loop."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LLM_API_KEY", "test")
+    agent = RoutedOmniAgent(
+        name="test",
+        system_instruction="FULL INSTRUCTION",
+        model_config={"provider": "openai", "model": "gpt-4.1"},
+        mcp_tools=[{"name": "explorer", "transport_type": "stdio", "command": "true", "args": []}],
+    )
+    agent.mcp_client.available_tools.update({"etherscan": ["evm_tool"], "solscan": ["solana_tool"]})
+    agent.calls = []
+
+    async def record_run(**kwargs):
+        agent.calls.append(kwargs)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    agent.agent._run = record_run
+    yield agent
+    agent._cleanup_config()
+
+
+def test_run_routed_narrows_instruction_and_tools(omni_agent):
+    result = asyncio.run(omni_agent.run_routed(
+        "query", "s1", system_instruction="EVM INSTRUCTION", mcp_tools={"etherscan": ["evm_tool"]}
+    ))
+
+    call = omni_agent.calls[0]
+    assert result["response"] == "answer" and result["session_id"] == "s1"
+    assert "EVM INSTRUCTION" in call["system_prompt"]
+    assert "FULL INSTRUCTION" not in call["system_prompt"]
+    assert call["mcp_tools"] == {"etherscan": ["evm_tool"]}
+    # The agent itself is unchanged afterwards
+    assert omni_agent.system_instruction == "FULL INSTRUCTION"
+    assert set(omni_agent.mcp_client.available_tools) == {"etherscan", "solscan"}
+
+
+def test_concurrent_routed_runs_keep_their_own_tools(omni_agent):
+    async def scenario():
+        await asyncio.gather(
+            omni_agent.run_routed("q", "evm", "EVM", {"etherscan": ["evm_tool"]}),
+            omni_agent.run_routed("q", "sol", "SOLANA", {"solscan": ["solana_tool"]}),
+            omni_agent.run("q", "all"),
+        )
+
+    asyncio.run(scenario())
+
+    tools = {call["session_id"]: set(call["mcp_tools"]) for call in omni_agent.calls}
+    assert tools == {"evm": {"etherscan"}, "sol": {"solscan"}, "all": {"etherscan", "solscan"}}
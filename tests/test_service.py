@@ -0,0 +1,127 @@
+"""
+ManaglynxService: backpressure, error status codes and session IDs.
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from core.agent import ERROR_INPUT, ERROR_INTERNAL
+from service import ManaglynxService
+
+
+class FakeAgent:
+    """Stands in for ManaglynxAgent; queries block until the gate opens."""
+
+    mcp_connections = None
+
+    def __init__(self):
+        self.agent = object()
+        self.gate = asyncio.Event()
+        self.sessions: List[str] = []
+
+    async def analyze(self, query: str, session_id: Optional[str] = None) -> Dict:
+        self.sessions.append(session_id)
+        await self.gate.wait()
+        if query == "invalid":
+            return {"error": "❌ Input Error: bad address", "error_type": ERROR_INPUT}
+        if query == "broken":
+            return {"error": "❌ Something went wrong: boom", "error_type": ERROR_INTERNAL}
+        return {"response": f"answer to {query}"}
+
+
+def run_service(scenario, **service_kwargs):
+    """Run scenario(client, service, agent) against a service on a test server."""
+    async def main():
+        agent = FakeAgent()
+        service = ManaglynxService(agent=agent, **service_kwargs)
+        async with TestClient(TestServer(service.create_app())) as client:
+            return await scenario(client, service, agent)
+
+    return asyncio.run(main())
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_full_queue_gets_429():
+    async def scenario(client, service, agent):
+        running = asyncio.create_task(client.post("/analyze", json={"query": "first"}))
+        await wait_for(lambda: service._running == 1)
+        waiting = asyncio.create_task(client.post("/analyze", json={"query": "second"}))
+        await wait_for(lambda: service._waiting == 1)
+
+        rejected = await client.post("/analyze", json={"query": "third"})
+        health = await (await client.get("/health")).json()
+
+        agent.gate.set()
+        accepted = [await running, await waiting]
+        return rejected, health, accepted
+
+    rejected, health, accepted = run_service(scenario, max_concurrency=1, max_queue=1)
+
+    assert rejected.status == 429
+    assert rejected.headers["Retry-After"] == "1"
+    assert health["running"] == 1 and health["waiting"] == 1 and health["rejected"] == 1
+    assert [response.status for response in accepted] == [200, 200]
+
+
+def test_queued_requests_run_once_a_slot_frees():
+    async def scenario(client, service, agent):
+        requests = [
+            asyncio.create_task(client.post("/analyze", json={"query": f"q{i}"}))
+            for i in range(4)
+        ]
+        await wait_for(lambda: service._running == 2 and service._waiting == 2)
+        agent.gate.set()
+        responses = await asyncio.gather(*requests)
+        return [response.status for response in responses], service.status()
+
+    statuses, status = run_service(scenario, max_concurrency=2, max_queue=2)
+
+    assert statuses == [200] * 4
+    assert status["running"] == status["waiting"] == status["active_sessions"] == 0
+
+
+def test_input_errors_get_400_and_failures_500():
+    async def scenario(client, service, agent):
+        agent.gate.set()
+        statuses = {}
+        for query in ("fine", "invalid", "broken"):
+            response = await client.post("/analyze", json={"query": query})
+            statuses[query] = response.status
+        return statuses
+
+    assert run_service(scenario) == {"fine": 200, "invalid": 400, "broken": 500}
+
+
+def test_session_ids_are_issued_and_verified():
+    async def scenario(client, service, agent):
+        agent.gate.set()
+        first = await (await client.post("/analyze", json={"query": "hi"})).json()
+        session_id = first["session_id"]
+
+        again = await client.post("/analyze", json={"query": "more", "session_id": session_id})
+        by_header = await client.post("/analyze", json={"query": "more"}, headers={"X-Session-Id": session_id})
+        forged = await client.post("/analyze", json={"query": "hi", "session_id": "cli-0123456789ab"})
+        tampered = await client.post("/analyze", json={"query": "hi", "session_id": session_id[:-1] + "x"})
+        return session_id, [again.status, by_header.status, forged.status, tampered.status], agent.sessions
+
+    session_id, statuses, sessions = run_service(scenario)
+
+    assert statuses == [200, 200, 403, 403]
+    assert sessions == [session_id] * 3
+
+
+def test_session_ids_are_not_shared_between_services():
+    issued = ManaglynxService(agent=FakeAgent()).issue_session_id()
+
+    assert not ManaglynxService(agent=FakeAgent()).verify_session_id(issued)
+    assert ManaglynxService(agent=FakeAgent(), session_secret=b"k").verify_session_id(
+        ManaglynxService(agent=FakeAgent(), session_secret=b"k").issue_session_id()
+    )
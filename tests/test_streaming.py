@@ -0,0 +1,49 @@
+"""
+Answer streaming: the streamed request made in place of llm_call.
+"""
+
+import asyncio
+
+import litellm
+
+from core import streaming
+from core.streaming import enable_answer_streaming, stream_answer_to
+
+
+class FakeLLMConnection:
+    llm_config = {"provider": "openai", "model": "gpt-4.1", "temperature": 0.1}
+
+    @staticmethod
+    def to_dict(message):
+        return message
+
+    async def llm_call(self, messages, tools=None):
+        return "not streamed"
+
+
+def test_streamed_call_drops_unsupported_params_per_request(monkeypatch):
+    requests = []
+
+    async def acompletion(**params):
+        requests.append(params)
+
+        async def chunks():
+            return
+            yield
+
+        return chunks()
+
+    monkeypatch.setattr(streaming.litellm, "acompletion", acompletion)
+    monkeypatch.setattr(streaming.litellm, "stream_chunk_builder", lambda chunks, messages: "streamed")
+    monkeypatch.setattr(litellm, "drop_params", False)
+    connection = FakeLLMConnection()
+    enable_answer_streaming(connection)
+
+    async def scenario():
+        with stream_answer_to(lambda text: None):
+            return await connection.llm_call([{"role": "user", "content": "hi"}])
+
+    assert asyncio.run(scenario()) == "streamed"
+    assert requests[0]["drop_params"] is True
+    assert requests[0]["temperature"] == 0.1
+    assert litellm.drop_params is False
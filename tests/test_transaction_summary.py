@@ -0,0 +1,64 @@
+"""
+TransactionSummary: partial summaries merge into the whole.
+"""
+
+import pytest
+
+from benchmarks.synthetic import DEFAULT_ADDRESS, generate_transactions
+from utils.transaction_analyzer import COLUMNAR_THRESHOLD, TransactionSummary
+
+
+def assert_same_summary(actual: TransactionSummary, expected: TransactionSummary) -> None:
+    assert actual.to_dict()["data"] == pytest.approx(expected.to_dict()["data"])
+
+
+def test_merged_halves_match_whole_history():
+    transactions = generate_transactions(2 * COLUMNAR_THRESHOLD + 100)
+    # One half below the columnar threshold, one above, so both paths feed the merge
+    split = COLUMNAR_THRESHOLD // 2
+    first = TransactionSummary(DEFAULT_ADDRESS).add_page(transactions[:split])
+    second = TransactionSummary(DEFAULT_ADDRESS).add_page(transactions[split:])
+
+    merged = first.merge(second)
+
+    assert_same_summary(merged, TransactionSummary(DEFAULT_ADDRESS).add_page(transactions))
+    assert merged.to_dict()["data"]["total_count"] == len(transactions)
+
+
+def test_merge_leaves_inputs_unchanged():
+    first = TransactionSummary(DEFAULT_ADDRESS).add_page(generate_transactions(10, seed=1))
+    second = TransactionSummary(DEFAULT_ADDRESS).add_page(generate_transactions(10, seed=2))
+    before = first.to_dict()
+
+    first.merge(second)
+
+    assert first.to_dict() == before
+
+
+def test_merge_with_empty_summary_is_identity():
+    summary = TransactionSummary(DEFAULT_ADDRESS).add_page(generate_transactions(50))
+
+    assert_same_summary(summary.merge(TransactionSummary(DEFAULT_ADDRESS)), summary)
+
+
+def test_merge_ignores_address_case():
+    transactions = generate_transactions(20)
+    lower = TransactionSummary(DEFAULT_ADDRESS.lower()).add_page(transactions[:10])
+    upper = TransactionSummary(DEFAULT_ADDRESS.upper()).add_page(transactions[10:])
+
+    assert lower.merge(upper).to_dict()["data"]["total_count"] == 20
+
+
+def test_merge_rejects_other_wallet():
+    other = TransactionSummary("0x" + "1" * 40)
+
+    with pytest.raises(ValueError):
+        TransactionSummary(DEFAULT_ADDRESS).merge(other)
+
+
+def test_worker_summary_round_trips_through_dict():
+    summary = TransactionSummary(DEFAULT_ADDRESS).add_page(generate_transactions(300))
+
+    rebuilt = TransactionSummary.from_dict(DEFAULT_ADDRESS, summary.to_dict()["data"])
+
+    assert rebuilt.to_dict() == summary.to_dict()
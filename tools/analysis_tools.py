@@ -4,6 +4,7 @@ Tools for agent reasoning and analysis workflow.
 """
 
 from typing import TYPE_CHECKING, List, Dict
+from utils.offload import get_offload_pool
 from utils.transaction_analyzer import TransactionAnalyzer
 
 if TYPE_CHECKING:
@@ -64,5 +65,10 @@ def register_analysis_tools(tools: "ToolRegistry") -> None:
         }
     )
     async def summarize_transactions(transactions: List[Dict], address: str) -> Dict:
-        """Analyze transaction patterns."""
-        return TransactionAnalyzer.summarize_activity(transactions, address)
+        """Analyze transaction patterns; large histories run in the offload pool."""
+        return await get_offload_pool().run(
+            TransactionAnalyzer.summarize_activity,
+            transactions,
+            address,
+            size=len(transactions),
+        )
@@ -0,0 +1,231 @@
+"""
+Response cache for MCP tool calls.
+Sits between the agent and the servers in MCP_SERVERS, so repeat lookups of
+data that can't change (contract source, ABIs, mined transactions) skip the network.
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from mcp.types import CallToolResult
+from omnicoreagent import logger
+
+from utils.cache import LRUCache, SQLiteCache, NEVER_EXPIRE
+
+# Tool name patterns for data the session snapshots (tools/snapshot_tools.py) keep too
+TOKEN_METADATA_TOOLS = r"token_?(info|meta)"
+BALANCE_TOOLS = r"balance|portfolio|holding|account_?detail|account_?info"
+TRANSACTION_HISTORY_TOOLS = r"txlist|tokentx|tokennfttx|transactions|transfers|activities|history"
+
+# TTL policies as (tool name pattern, TTL in seconds), first match wins.
+# A TTL of 0 means never cache; tools matching no pattern are not cached.
+MCP_TTL_POLICIES: List[Tuple[str, float]] = [
+    # State-changing tools must always reach the server
+    (r"^(transfer|write|send|approve|sign|deploy|execute|swap)", 0),
+    # Immutable: verified source, ABI and deployed bytecode
+    # (matched as whole name segments, so 'abi' doesn't hit 'stability')
+    (r"(^|_)(get_?)?(source_?code|abi|bytecode|code)($|_)", NEVER_EXPIRE),
+    # Immutable once mined: transactions and receipts looked up by hash
+    (r"^(get_?)?(transaction|tx)(_?(by_?hash|receipt|detail|info))?$|transaction_?(receipt|detail)|txreceipt", NEVER_EXPIRE),
+    # Blocks by number only change on a reorg
+    (r"block_?by_?number|get_?block$|getblockreward", 3600),
+    # Token metadata (name, symbol, decimals) changes very rarely
+    (TOKEN_METADATA_TOOLS, 24 * 3600),
+    # Prices and gas move quickly
+    (r"price|gas", 15),
+    # Balances and positions
+    (BALANCE_TOOLS, 30),
+    # Transaction and transfer histories grow with every block
+    (TRANSACTION_HISTORY_TOOLS, 60),
+]
+
+# Arguments that point at the chain head cap any TTL to this
+HEAD_TTL = 15
+_HEAD_TAGS = {"latest", "pending", "safe"}
+
+# Results that describe a not-yet-mined transaction must not be kept forever
+_PENDING = re.compile(r'"(blockNumber|blockHash)"\s*:\s*null|"status"\s*:\s*"pending"', re.IGNORECASE)
+
+_HEX = re.compile(r"^0x[0-9a-fA-F]*$")
+
+
+def normalize_arguments(value: Any) -> Any:
+    """
+    Canonicalize tool arguments so equivalent calls share a cache key.
+
+    Hex strings (EVM addresses, hashes) are lowercased; base58 Solana
+    addresses are case-sensitive and left alone. None values are dropped.
+    """
+    if isinstance(value, dict):
+        return {k: normalize_arguments(v) for k, v in sorted(value.items()) if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [normalize_arguments(v) for v in value]
+    if isinstance(value, str):
+        value = value.strip()
+        return value.lower() if _HEX.match(value) else value
+    return value
+
+
+def _mentions_chain_head(value: Any) -> bool:
+    """Whether any argument is a block tag like 'latest'."""
+    if isinstance(value, dict):
+        return any(_mentions_chain_head(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_mentions_chain_head(v) for v in value)
+    return isinstance(value, str) and value.lower() in _HEAD_TAGS
+
+
+def _result_text(value: Dict[str, Any]) -> str:
+    """Text and structured content of a dumped CallToolResult, for inspection."""
+    parts = [item.get("text", "") for item in value.get("content", []) if isinstance(item, dict)]
+    if value.get("structuredContent"):
+        parts.append(json.dumps(value["structuredContent"]))
+    return "\n".join(parts)
+
+
+class MCPResponseCache:
+    """Cache MCP CallToolResults keyed on server, tool and normalized arguments."""
+
+    def __init__(
+        self,
+        cache: Optional[Union[LRUCache, SQLiteCache]] = None,
+        policies: Optional[List[Tuple[str, float]]] = None,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            cache: Backing store (default: in-memory LRUCache); values are
+                stored as JSON so a SQLiteCache works too
+            policies: (tool name regex, TTL) pairs, first match wins
+                (default: MCP_TTL_POLICIES)
+        """
+        self.cache = cache if cache is not None else LRUCache(max_entries=5_000)
+        self.policies = [
+            (re.compile(pattern, re.IGNORECASE), ttl)
+            for pattern, ttl in (policies if policies is not None else MCP_TTL_POLICIES)
+        ]
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+
+    def ttl_for(self, tool_name: str, arguments: Dict[str, Any]) -> float:
+        """
+        Resolve the TTL for a call; 0 means it must not be cached.
+
+        Args:
+            tool_name: MCP tool name
+            arguments: Normalized tool arguments
+
+        Returns:
+            TTL in seconds (NEVER_EXPIRE for immutable data)
+        """
+        for pattern, ttl in self.policies:
+            if pattern.search(tool_name):
+                if ttl and _mentions_chain_head(arguments):
+                    return min(ttl, HEAD_TTL)
+                return ttl
+        return 0
+
+    @staticmethod
+    def make_key(server_name: str, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Cache key in the 'mcp' namespace."""
+        digest = hashlib.sha256(
+            json.dumps(arguments, sort_keys=True, default=str).encode()
+        ).hexdigest()[:32]
+        return f"mcp:{server_name}:{tool_name}:{digest}"
+
+    def wrap_sessions(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Route call_tool on every connected MCP session through the cache.
+
+        Safe to call again after new servers connect; sessions already
+        wrapped are skipped.
+
+        Args:
+            sessions: MCPClient.sessions (server name -> {"session": ClientSession, ...})
+        """
+        for server_name, info in (sessions or {}).items():
+            session = info.get("session") if isinstance(info, dict) else None
+            if session is None or getattr(session, "_managlynx_cached", False):
+                continue
+            self._wrap_call_tool(session, server_name)
+
+    def _wrap_call_tool(self, session: Any, server_name: str) -> None:
+        call_tool = session.call_tool
+
+        async def cached_call_tool(name: str, arguments: Dict[str, Any] = None, *args, **kwargs):
+            normalized = normalize_arguments(arguments or {})
+            ttl = self.ttl_for(name, normalized)
+            if not ttl:
+                self._bypassed += 1
+                return await call_tool(name, arguments, *args, **kwargs)
+
+            key = self.make_key(server_name, name, normalized)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._hits += 1
+                return self._restore(cached)
+
+            self._misses += 1
+            result = await call_tool(name, arguments, *args, **kwargs)
+            self._store(key, result, ttl)
+            return result
+
+        session.call_tool = cached_call_tool
+        session._managlynx_cached = True
+
+    def _store(self, key: str, result: Any, ttl: float) -> None:
+        """Cache a successful result; errors and pending transactions are skipped."""
+        if getattr(result, "isError", False) or not hasattr(result, "model_dump"):
+            return
+
+        value = result.model_dump(mode="json", by_alias=True, exclude_none=True)
+        if ttl == NEVER_EXPIRE and _PENDING.search(_result_text(value)):
+            return
+        try:
+            self.cache.set(key, value, ttl=ttl)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Could not cache MCP result for {key}: {e}")
+
+    @staticmethod
+    def _restore(value: Dict[str, Any]) -> CallToolResult:
+        """Rebuild a CallToolResult from its cached JSON form."""
+        return CallToolResult.model_validate(value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and backing cache statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "bypassed": self._bypassed,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "cache": self.cache.stats(),
+        }
+
+
+# Global MCP response cache instance
+_mcp_cache: Optional[MCPResponseCache] = None
+
+
+def get_mcp_cache() -> MCPResponseCache:
+    """
+    Get global MCP response cache.
+
+    Uses the SQLite file at MANAGLYNX_CACHE_PATH when set, so immutable
+    responses survive restarts; otherwise an in-memory LRU cache. The file is
+    shared with the price cache, so MCP responses get their own table and
+    purging them never touches price rows still inside their stale window.
+    """
+    global _mcp_cache
+    if _mcp_cache is None:
+        cache = None
+        cache_path = os.getenv("MANAGLYNX_CACHE_PATH")
+        if cache_path:
+            cache = SQLiteCache(cache_path, table="mcp", memory_entries=5_000)
+        _mcp_cache = MCPResponseCache(cache=cache)
+    return _mcp_cache
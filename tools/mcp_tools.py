@@ -21,4 +21,12 @@ MCP_SERVERS = [
       }
 
     }
-]
\ No newline at end of file
+]
+
+# Chain each MCP server serves; servers are connected the first time a
+# query needs their chain (see core.mcp_connections)
+MCP_SERVER_CHAINS = {
+    "etherscan-server": "evm",
+    "evm-mcp-server": "evm",
+    "solscan-mcp": "solana",
+}
@@ -3,15 +3,96 @@ CoinGecko price integration tools.
 Provides real-time token prices and portfolio valuation.
 """
 
+import asyncio
+import json
+import os
+import time
 import aiohttp
-from typing import Dict, List, Optional, TYPE_CHECKING
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union, TYPE_CHECKING
 from omnicoreagent import logger
 
 if TYPE_CHECKING:
     from omnicoreagent import ToolRegistry
 
-from utils.cache import SimpleCache
-from utils.formatting import format_usd
+from tools.snapshot_tools import SECTION_SUMMARY, current_session_id, get_snapshot_store
+from utils.cache import LRUCache, SQLiteCache, NEVER_EXPIRE
+from utils.chains import is_solana_address
+from utils.formatting import format_percentage, format_token_amount, format_usd, shorten_address
+from utils.tracing import KIND_HTTP, get_tracer
+
+# Chain names accepted by the price tools -> DeFiLlama chain slug
+PRICE_CHAIN_ALIASES: Dict[str, str] = {
+    "ethereum": "ethereum", "eth": "ethereum", "mainnet": "ethereum", "evm": "ethereum",
+    "solana": "solana", "sol": "solana",
+    "base": "base",
+    "arbitrum": "arbitrum", "arb": "arbitrum",
+    "optimism": "optimism", "op": "optimism",
+    "polygon": "polygon", "matic": "polygon",
+    "bsc": "bsc", "bnb": "bsc", "binance": "bsc",
+    "avalanche": "avax", "avax": "avax",
+    "linea": "linea",
+    "scroll": "scroll",
+    "zksync": "era", "era": "era",
+    "blast": "blast",
+    "gnosis": "xdai", "xdai": "xdai",
+    "fantom": "fantom",
+}
+
+# Native coin of each chain: (DeFiLlama coin ID, symbol)
+NATIVE_COINS: Dict[str, Tuple[str, str]] = {
+    "ethereum": ("coingecko:ethereum", "ETH"),
+    "base": ("coingecko:ethereum", "ETH"),
+    "arbitrum": ("coingecko:ethereum", "ETH"),
+    "optimism": ("coingecko:ethereum", "ETH"),
+    "linea": ("coingecko:ethereum", "ETH"),
+    "scroll": ("coingecko:ethereum", "ETH"),
+    "era": ("coingecko:ethereum", "ETH"),
+    "blast": ("coingecko:ethereum", "ETH"),
+    "solana": ("coingecko:solana", "SOL"),
+    "polygon": ("coingecko:matic-network", "POL"),
+    "bsc": ("coingecko:binancecoin", "BNB"),
+    "avax": ("coingecko:avalanche-2", "AVAX"),
+    "xdai": ("coingecko:xdai", "XDAI"),
+    "fantom": ("coingecko:fantom", "FTM"),
+}
+
+# Native coins named by symbol, on any chain
+_NATIVE_SYMBOLS = {
+    "eth": "coingecko:ethereum",
+    "sol": "coingecko:solana",
+    "bnb": "coingecko:binancecoin",
+    "pol": "coingecko:matic-network",
+    "matic": "coingecko:matic-network",
+    "avax": "coingecko:avalanche-2",
+}
+
+# Placeholders wallets and explorers use for the chain's native coin
+_NATIVE_ADDRESSES = {
+    "native",
+    "0x0000000000000000000000000000000000000000",
+    "0xeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeeee",
+}
+
+
+def resolve_price_chain(chain: Optional[str]) -> Optional[str]:
+    """
+    Map a chain name or alias to its DeFiLlama slug.
+    
+    Args:
+        chain: 'ethereum', 'Arbitrum', 'sol', ... or None
+        
+    Returns:
+        DeFiLlama chain slug, or None when no chain was given
+        
+    Raises:
+        ValueError: If the chain is not supported
+    """
+    if not chain:
+        return None
+    slug = PRICE_CHAIN_ALIASES.get(chain.strip().lower())
+    if slug is None:
+        raise ValueError(f"Unsupported chain '{chain}', expected one of {', '.join(sorted(set(PRICE_CHAIN_ALIASES.values())))}")
+    return slug
 
 
 class PriceService:
@@ -20,44 +101,219 @@ class PriceService:
     # DeFiLlama Coins API endpoint
     BASE_URL = "https://coins.llama.fi/prices/current"
     
-    def __init__(self):
-        """Initialize price service with cache."""
-        # Cache prices for 5 minutes
-        self.cache = SimpleCache(ttl_seconds=300)
+    # Max coins per upstream request (keeps the URL well under server limits)
+    MAX_BATCH_SIZE = 100
+    
+    # DeFiLlama historical prices, many coins and timestamps per request
+    HISTORICAL_URL = "https://coins.llama.fi/batchHistorical"
+    
+    # Historical prices are looked up and cached per hour bucket
+    HISTORICAL_BUCKET_SECONDS = 3600
+    
+    # Max (coin, timestamp) points per historical request
+    MAX_HISTORICAL_POINTS = 100
+    
+    # How far from a bucket DeFiLlama may look for a data point
+    HISTORICAL_SEARCH_WIDTH = "6h"
+    
+    # Cache TTLs: prices move, token symbols/decimals practically never do
+    PRICE_TTL = 300
+    METADATA_TTL = 30 * 24 * 3600
+    
+    # How long an expired price may still be served while it refreshes
+    STALE_GRACE_SECONDS = 120
+    
+    def __init__(
+        self,
+        batch_window: float = 0.01,
+        connection_limit: int = 20,
+        dns_cache_ttl: int = 300,
+        keepalive_timeout: float = 30.0,
+        cache_max_entries: int = 10_000,
+        stale_grace_seconds: float = STALE_GRACE_SECONDS,
+        cache: Optional[Union[LRUCache, SQLiteCache]] = None,
+        history_cache: Optional[Union[LRUCache, SQLiteCache]] = None,
+    ):
+        """
+        Initialize price service with cache.
+        
+        Args:
+            batch_window: Seconds to wait for concurrent single-token lookups
+                before sending them upstream as one batched request
+            connection_limit: Max simultaneous connections in the shared pool
+            dns_cache_ttl: Seconds to cache DNS lookups
+            keepalive_timeout: Seconds to keep idle connections open for reuse
+            cache_max_entries: Max prices held in memory before LRU eviction
+            stale_grace_seconds: How long after expiry a cached price is still
+                served (flagged as stale) while it refreshes in the background;
+                0 disables stale-while-revalidate
+            cache: Optional cache backend (e.g. a persistent SQLiteCache);
+                defaults to an in-memory LRUCache
+            history_cache: Optional cache backend for historical prices, which
+                never change once their hour is over; defaults to a large
+                in-memory LRUCache without expiry
+        """
+        # Cache prices for 5 minutes, serving stale ones during the grace window
+        self.cache = cache if cache is not None else LRUCache(
+            max_entries=cache_max_entries,
+            ttl_seconds=self.PRICE_TTL,
+            stale_seconds=stale_grace_seconds,
+        )
+        self.history_cache = history_cache if history_cache is not None else LRUCache(
+            max_entries=100_000,
+            ttl_seconds=NEVER_EXPIRE,
+        )
+        self.batch_window = batch_window
+        
+        # Shared HTTP pool, opened by start() and closed by close()
+        self.connection_limit = connection_limit
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Single-flight state: query_id -> future shared by every caller
+        # until its upstream fetch completes
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Micro-batching state: in-flight futures still waiting for the window
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._background_tasks: Set[asyncio.Task] = set()
+    
+    async def start(self, connection_limit: Optional[int] = None) -> None:
+        """
+        Open the shared keep-alive connection pool.
+        
+        Args:
+            connection_limit: Optional override for the pool size
+        """
+        if connection_limit is not None:
+            self.connection_limit = connection_limit
+        
+        if self._session is not None and not self._session.closed:
+            return
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        self._session = aiohttp.ClientSession(connector=connector)
+        logger.info(f"💱 Price service connection pool opened (limit={self.connection_limit})")
+    
+    async def close(self) -> None:
+        """Close the shared connection pool."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        # Stop batch fetches and stale refreshes before their session goes away
+        tasks = list(self._background_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Release callers still waiting on a fetch that will never finish, and
+        # make later callers start a fresh one instead of joining it
+        inflight, self._inflight, self._pending = self._inflight, {}, {}
+        for future in inflight.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Price service closed"))
+        
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, opening it on first use if needed."""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+    
+    def resolve_coin_id(self, contract_address: str, chain: Optional[str] = None) -> str:
+        """
+        Map a token to the DeFiLlama coin ID its price is looked up and cached under.
+        
+        Args:
+            contract_address: Token as accepted by get_token_price
+            chain: Chain the token is on (default: detected from the address)
+            
+        Returns:
+            Coin ID such as 'base:0x...', 'solana:<mint>' or 'coingecko:ethereum'
+            
+        Raises:
+            ValueError: If the chain is not supported
+        """
+        return self._query_id(contract_address, chain)
+    
+    @staticmethod
+    def _query_id(contract_address: str, chain: Optional[str] = None) -> str:
+        """
+        Map a token to a DeFiLlama coin ID.
+        
+        Args:
+            contract_address: Contract address, Solana mint, 'native', a
+                native symbol ('eth', 'sol', ...) or 'chain:address'
+            chain: Chain the token is on; without one, base58 mints are
+                priced on Solana and everything else on Ethereum
+            
+        Returns:
+            Coin ID such as 'base:0x...', 'solana:<mint>' or 'coingecko:ethereum'
+            
+        Raises:
+            ValueError: If the chain is not supported
+        """
+        token = contract_address.strip()
+        # 'arbitrum:0x...' names the chain inline, which lets one batch mix chains
+        prefix, separator, rest = token.partition(":")
+        if separator:
+            if prefix.lower() == "coingecko":
+                return f"coingecko:{rest.lower()}"
+            chain, token = prefix, rest.strip()
+        
+        slug = resolve_price_chain(chain)
+        token_lower = token.lower()
+        if token_lower in _NATIVE_SYMBOLS:
+            return _NATIVE_SYMBOLS[token_lower]
+        if token_lower in _NATIVE_ADDRESSES:
+            return NATIVE_COINS[slug or "ethereum"][0]
+        
+        if slug is None:
+            slug = "solana" if is_solana_address(token) else "ethereum"
+        # Base58 mints are case-sensitive; hex addresses are not
+        return f"{slug}:{token}" if slug == "solana" else f"{slug}:{token_lower}"
     
-    async def get_token_price(self, contract_address: str) -> Optional[Dict]:
+    async def get_token_price(self, contract_address: str, chain: Optional[str] = None) -> Optional[Dict]:
         """
         Get token price from DeFiLlama.
         
+        Concurrent calls arriving within ``batch_window`` are coalesced into
+        a single upstream request, and callers asking for a token that is
+        already being fetched wait on that fetch instead of starting another.
+        
         Args:
-            contract_address: Ethereum contract address or 'eth'
+            contract_address: Contract address, Solana mint, 'native'/'eth'
+                or 'chain:address'
+            chain: Chain the token is on (default: detected from the address)
             
         Returns:
-            Dict with price data or None if not found
+            Dict with price data or None if not found. Cached prices also
+            carry ``age_seconds`` and ``stale``.
+            
+        Raises:
+            ValueError: If the chain is not supported
         """
         if not contract_address:
             return None
 
-        # Normalize address
-        address_lower = contract_address.lower()
-        
-        # Check cache
-        cache_key = f"price:{address_lower}"
-        cached = self.cache.get(cache_key)
+        # Cache keys carry the chain, so one address on two chains never collides
+        query_id = self._query_id(contract_address, chain)
+        cache_key = f"price:{query_id}"
+        cached = self._get_cached(cache_key, query_id)
         if cached is not None:
             return cached
         
         try:
-            # Determine DeFiLlama query ID
-            # Native ETH
-            if address_lower in ["0x0000000000000000000000000000000000000000", "eth"]:
-                query_id = "coingecko:ethereum"
-            # ERC20 Token
-            else:
-                query_id = f"ethereum:{address_lower}"
-            
-            # Fetch from API
-            price_data = await self._fetch_price(query_id)
+            price_data = await self._enqueue(query_id)
             
             # Cache result if found
             if price_data:
@@ -69,27 +325,447 @@ class PriceService:
             logger.error(f"Error fetching price for {contract_address}: {str(e)}")
             return None
     
-    async def _fetch_price(self, query_id: str) -> Optional[Dict]:
-        """Fetch price from DeFiLlama."""
-        url = f"{self.BASE_URL}/{query_id}"
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # DeFiLlama returns {"coins": {"ethereum:0x...": {"price": ...}}}
-                    coins = data.get("coins", {})
-                    if query_id in coins:
-                        item = coins[query_id]
-                        return {
-                            "usd": item.get("price"),
-                            # DeFiLlama doesn't always provide 24h change in this endpoint, 
-                            # but simpler implementation is preferred for MVP.
-                            # We'll map what we have.
-                            "usd_market_cap": None  # Not provided by this endpoint
-                        }
-        return None
+    async def get_token_metadata(self, contract_address: str, chain: Optional[str] = None) -> Optional[Dict]:
+        """
+        Get token symbol and decimals, from cache when possible.
+        
+        Metadata is cached alongside every price fetch with a long TTL, so it
+        is usually available even after the price itself has expired.
+        
+        Args:
+            contract_address: Contract address, Solana mint, 'native'/'eth'
+                or 'chain:address'
+            chain: Chain the token is on (default: detected from the address)
+            
+        Returns:
+            Dict with 'symbol' and 'decimals' or None if unknown
+        """
+        if not contract_address:
+            return None
+        
+        query_id = self._query_id(contract_address, chain)
+        cached = self.cache.get(f"token:{query_id}")
+        if cached is not None:
+            return cached
+        
+        # A price lookup records the metadata as a side effect
+        await self.get_token_price(contract_address, chain)
+        return self.cache.get(f"token:{query_id}")
+    
+    async def get_token_prices(
+        self,
+        contract_addresses: List[str],
+        chain: Optional[str] = None,
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Get prices for many tokens with as few upstream requests as possible.
+        
+        Tokens on different chains share the same batched requests.
+        
+        Args:
+            contract_addresses: Contract addresses, Solana mints, 'native'/'eth'
+                and/or 'chain:address' entries
+            chain: Chain for entries without a 'chain:' prefix (default:
+                detected per address)
+            
+        Returns:
+            Dict mapping each requested address to its price data (None if not found)
+            
+        Raises:
+            ValueError: If a chain is not supported
+        """
+        results: Dict[str, Optional[Dict]] = {}
+        missing: Dict[str, List[str]] = {}
+        
+        for contract_address in contract_addresses:
+            if not contract_address or contract_address in results:
+                continue
+            query_id = self._query_id(contract_address, chain)
+            cached = self._get_cached(f"price:{query_id}", query_id)
+            if cached is not None:
+                results[contract_address] = cached
+                continue
+            missing.setdefault(query_id, []).append(contract_address)
+        
+        if not missing:
+            return results
+        
+        # Join fetches already in flight; fetch the rest as one batch
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        batch: Dict[str, asyncio.Future] = {}
+        for query_id in missing:
+            future = self._inflight.get(query_id)
+            if future is None:
+                future = loop.create_future()
+                self._inflight[query_id] = future
+                batch[query_id] = future
+            futures[query_id] = future
+        
+        if batch:
+            self._dispatch(batch)
+        
+        outcomes = await asyncio.gather(
+            *(asyncio.shield(future) for future in futures.values()),
+            return_exceptions=True,
+        )
+        
+        for query_id, outcome in zip(futures, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Error fetching price for {query_id}: {str(outcome)}")
+                outcome = None
+            if outcome:
+                self.cache.set(f"price:{query_id}", outcome)
+            for contract_address in missing[query_id]:
+                results[contract_address] = outcome
+        
+        return results
+    
+    def _get_cached(self, cache_key: str, query_id: str) -> Optional[Dict]:
+        """
+        Read a cached price, scheduling a background refresh if it is stale.
+        
+        Returns:
+            Price data annotated with its age, or None on a cache miss
+        """
+        entry = self.cache.get_stale(cache_key)
+        if entry is None:
+            return None
+        
+        price_data, age, is_stale = entry
+        if is_stale:
+            self._schedule_refresh(cache_key, query_id)
+        
+        return {**price_data, "age_seconds": round(age, 1), "stale": is_stale}
+    
+    def _schedule_refresh(self, cache_key: str, query_id: str) -> None:
+        """Refresh a stale price without making the caller wait for it."""
+        if query_id in self._inflight:
+            return
+        
+        async def refresh() -> None:
+            try:
+                price_data = await self._enqueue(query_id)
+            except Exception as e:
+                logger.warning(f"Background price refresh failed for {query_id}: {str(e)}")
+                return
+            if price_data:
+                self.cache.set(cache_key, price_data)
+        
+        self._track(asyncio.get_running_loop().create_task(refresh()))
+    
+    def _track(self, task: asyncio.Task) -> None:
+        """Keep a reference to a background task until it finishes."""
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _enqueue(self, query_id: str) -> Optional[Dict]:
+        """Join the in-flight fetch for a coin, or add it to the current micro-batch."""
+        future = self._inflight.get(query_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._inflight[query_id] = future
+            self._pending[query_id] = future
+            
+            if len(self._pending) >= self.MAX_BATCH_SIZE:
+                self._flush_pending()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush_pending)
+        
+        # Shield so one cancelled caller doesn't cancel the shared future
+        return await asyncio.shield(future)
+    
+    def _flush_pending(self) -> None:
+        """Send everything collected in the current window upstream."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._dispatch(batch)
+    
+    def _dispatch(self, batch: Dict[str, asyncio.Future]) -> None:
+        """Resolve a batch in a background task so no single caller owns it."""
+        self._track(asyncio.get_running_loop().create_task(self._resolve_batch(batch)))
+    
+    async def _resolve_batch(self, batch: Dict[str, asyncio.Future]) -> None:
+        """Fetch a batch, hand each waiter its result and clear it from in-flight."""
+        fetched: Dict[str, Dict] = {}
+        error: Optional[Exception] = None
+        try:
+            fetched = await self._fetch_prices(list(batch))
+        except Exception as e:
+            error = e
+        
+        self._remember_metadata(fetched)
+        
+        for query_id, future in batch.items():
+            if self._inflight.get(query_id) is future:
+                del self._inflight[query_id]
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(fetched.get(query_id))
+    
+    def _remember_metadata(self, fetched: Dict[str, Dict]) -> None:
+        """Cache symbol/decimals from fresh price data with a long TTL."""
+        for query_id, price_data in fetched.items():
+            if price_data.get("symbol") is None and price_data.get("decimals") is None:
+                continue
+            self.cache.set(
+                f"token:{query_id}",
+                {"symbol": price_data.get("symbol"), "decimals": price_data.get("decimals")},
+                ttl=self.METADATA_TTL,
+            )
+    
+    async def _fetch_prices(self, query_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch prices from DeFiLlama in as few requests as possible.
+        
+        Args:
+            query_ids: DeFiLlama coin IDs (e.g. 'ethereum:0x...')
+            
+        Returns:
+            Dict mapping query ID to price data for every coin that was found
+        """
+        results: Dict[str, Dict] = {}
+        session = await self._get_session()
+        
+        for start in range(0, len(query_ids), self.MAX_BATCH_SIZE):
+            chunk = query_ids[start:start + self.MAX_BATCH_SIZE]
+            url = f"{self.BASE_URL}/{','.join(chunk)}"
+            
+            with get_tracer().span("http:defillama/prices", KIND_HTTP, coins=len(chunk), request_bytes=len(url)) as span:
+                async with session.get(url) as response:
+                    span.set(status_code=response.status)
+                    if response.status != 200:
+                        span.status = "error"
+                        logger.warning(f"DeFiLlama returned {response.status} for {len(chunk)} coins")
+                        continue
+                    body = await response.read()
+                    span.set(response_bytes=len(body))
+                    data = json.loads(body)
+            
+            # DeFiLlama returns {"coins": {"ethereum:0x...": {"price": ...}}}
+            coins = data.get("coins", {})
+            for query_id in chunk:
+                if query_id in coins:
+                    item = coins[query_id]
+                    results[query_id] = {
+                        "usd": item.get("price"),
+                        "symbol": item.get("symbol"),
+                        "decimals": item.get("decimals"),
+                        # DeFiLlama doesn't always provide 24h change in this endpoint, 
+                        # but simpler implementation is preferred for MVP.
+                        # We'll map what we have.
+                        "usd_market_cap": None  # Not provided by this endpoint
+                    }
+        
+        return results
+    
+    def _history_bucket(self, timestamp: float) -> int:
+        """Start of the bucket a Unix timestamp falls in."""
+        return int(timestamp) // self.HISTORICAL_BUCKET_SECONDS * self.HISTORICAL_BUCKET_SECONDS
+    
+    async def get_historical_prices(
+        self,
+        lookups: Iterable[Tuple[str, float]],
+        chain: Optional[str] = None,
+    ) -> Dict[Tuple[str, int], Optional[Dict]]:
+        """
+        Get USD prices at past times, batched across all lookups.
+        
+        Timestamps are grouped into hour buckets, so a long transaction
+        history needs one price per (token, hour) and a handful of requests.
+        Prices of finished buckets are cached without expiry when the data
+        point is within an hour of the bucket.
+        
+        Args:
+            lookups: (token, Unix timestamp) pairs; tokens as for
+                get_token_prices, including 'chain:address'
+            chain: Chain for tokens without a 'chain:' prefix
+            
+        Returns:
+            Dict mapping each (contract_address, int timestamp) to price data
+            with usd, symbol and timestamp (of the data point used), or None
+            if DeFiLlama has no price near that time
+        """
+        results: Dict[Tuple[str, int], Optional[Dict]] = {}
+        # (query_id, bucket) -> lookups answered by it
+        wanted: Dict[Tuple[str, int], List[Tuple[str, int]]] = {}
+        
+        for contract_address, timestamp in lookups:
+            lookup = (contract_address, int(timestamp))
+            if not contract_address or lookup in results:
+                continue
+            point = (self._query_id(contract_address, chain), self._history_bucket(timestamp))
+            cached = self.history_cache.get(f"hist:{point[0]}:{point[1]}")
+            if cached is not None:
+                results[lookup] = cached
+                continue
+            results[lookup] = None
+            wanted.setdefault(point, []).append(lookup)
+        
+        if not wanted:
+            return results
+        
+        fetched = await self._fetch_historical(list(wanted))
+        settled = time.time() - self.HISTORICAL_BUCKET_SECONDS
+        half_bucket = self.HISTORICAL_BUCKET_SECONDS // 2
+        for point, price_data in fetched.items():
+            query_id, bucket = point
+            # The current hour's price may still move, and a point hours away
+            # (DeFiLlama searches up to HISTORICAL_SEARCH_WIDTH) may be joined
+            # by a closer one later; only settled, nearby points are permanent
+            near = abs((price_data.get("timestamp") or 0) - (bucket + half_bucket)) <= self.HISTORICAL_BUCKET_SECONDS
+            ttl = NEVER_EXPIRE if bucket < settled and near else self.PRICE_TTL
+            self.history_cache.set(f"hist:{query_id}:{bucket}", price_data, ttl=ttl)
+            for lookup in wanted[point]:
+                results[lookup] = price_data
+        
+        return results
+    
+    async def get_historical_price(
+        self,
+        contract_address: str,
+        timestamp: float,
+        chain: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """Get the USD price of a token at a past Unix timestamp."""
+        prices = await self.get_historical_prices([(contract_address, timestamp)], chain)
+        return prices.get((contract_address, int(timestamp)))
+    
+    async def _fetch_historical(self, points: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Dict]:
+        """
+        Fetch historical prices from DeFiLlama, chunks in parallel.
+        
+        Args:
+            points: (DeFiLlama coin ID, bucket start) pairs
+            
+        Returns:
+            Dict mapping each point that was found to its price data
+        """
+        session = await self._get_session()
+        half_bucket = self.HISTORICAL_BUCKET_SECONDS // 2
+        
+        async def fetch_chunk(chunk: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Dict]:
+            coins: Dict[str, List[int]] = {}
+            for query_id, bucket in chunk:
+                coins.setdefault(query_id, []).append(bucket + half_bucket)
+            params = {
+                "coins": json.dumps(coins, separators=(",", ":")),
+                "searchWidth": self.HISTORICAL_SEARCH_WIDTH,
+            }
+            
+            with get_tracer().span("http:defillama/batchHistorical", KIND_HTTP, coins=len(coins), points=len(chunk)) as span:
+                async with session.get(self.HISTORICAL_URL, params=params) as response:
+                    span.set(status_code=response.status)
+                    if response.status != 200:
+                        span.status = "error"
+                        logger.warning(f"DeFiLlama returned {response.status} for {len(chunk)} historical prices")
+                        return {}
+                    body = await response.read()
+                    span.set(response_bytes=len(body))
+                    data = json.loads(body)
+            
+            # {"coins": {"ethereum:0x...": {"symbol": ..., "prices": [{"timestamp", "price"}]}}};
+            # data points are the nearest DeFiLlama has, not the exact times asked for
+            found: Dict[Tuple[str, int], Dict] = {}
+            for query_id, item in data.get("coins", {}).items():
+                prices = [p for p in item.get("prices", []) if p.get("price") is not None]
+                if not prices:
+                    continue
+                for bucket in coins.get(query_id, []):
+                    nearest = min(prices, key=lambda p: abs(p.get("timestamp", 0) - bucket))
+                    found[(query_id, bucket - half_bucket)] = {
+                        "usd": nearest["price"],
+                        "symbol": item.get("symbol"),
+                        "timestamp": nearest.get("timestamp"),
+                    }
+            return found
+        
+        chunks = [
+            points[start:start + self.MAX_HISTORICAL_POINTS]
+            for start in range(0, len(points), self.MAX_HISTORICAL_POINTS)
+        ]
+        outcomes = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        
+        results: Dict[Tuple[str, int], Dict] = {}
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                logger.error(f"Error fetching historical prices: {str(outcome)}")
+                continue
+            results.update(outcome)
+        return results
+    
+    async def value_holdings(self, holdings: List[Dict]) -> Dict:
+        """
+        Value a list of holdings with one batched price lookup.
+        
+        Args:
+            holdings: Dicts with contract_address, balance and optionally
+                symbol and chain; repeated tokens are added together
+            
+        Returns:
+            Dict with positions (largest value first, each with usd_price,
+            value_usd and allocation as a fraction of the total), total_usd
+            and unpriced (holdings without a price or a valid balance)
+        """
+        merged: Dict[str, Dict] = {}
+        unpriced: List[Dict] = []
+        for holding in holdings:
+            contract_address = str(holding.get("contract_address") or "").strip()
+            try:
+                balance = float(holding.get("balance"))
+            except (TypeError, ValueError):
+                balance = None
+            try:
+                query_id = self._query_id(contract_address, holding.get("chain")) if contract_address else None
+            except ValueError as e:
+                unpriced.append({**holding, "reason": str(e)})
+                continue
+            if not query_id or balance is None or balance < 0:
+                unpriced.append({**holding, "reason": "invalid contract address or balance"})
+                continue
+            
+            if query_id in merged:
+                merged[query_id]["balance"] += balance
+            else:
+                merged[query_id] = {
+                    "contract_address": contract_address,
+                    "chain": holding.get("chain"),
+                    "symbol": holding.get("symbol"),
+                    "balance": balance,
+                }
+        
+        # One batch for every chain, keyed by coin ID
+        prices = await self.get_token_prices(list(merged))
+        
+        positions: List[Dict] = []
+        for query_id, holding in merged.items():
+            price_data = prices.get(query_id)
+            if not price_data or price_data.get("usd") is None:
+                unpriced.append({**holding, "reason": "price not found"})
+                continue
+            price = float(price_data["usd"])
+            positions.append({
+                **holding,
+                "symbol": holding["symbol"] or price_data.get("symbol") or shorten_address(holding["contract_address"]),
+                "usd_price": price,
+                "value_usd": holding["balance"] * price,
+                "stale": price_data.get("stale", False),
+            })
+        
+        total = sum(position["value_usd"] for position in positions)
+        for position in positions:
+            position["allocation"] = position["value_usd"] / total if total else 0.0
+        positions.sort(key=lambda position: position["value_usd"], reverse=True)
+        
+        return {"positions": positions, "total_usd": total, "unpriced": unpriced, "prices": prices}
     
     async def calculate_token_value(
         self, 
@@ -111,13 +787,84 @@ class PriceService:
 _price_service = None
 
 def get_price_service() -> PriceService:
-    """Get global price service instance."""
+    """
+    Get global price service instance.
+    
+    Set MANAGLYNX_CACHE_PATH to keep prices, historical prices and token
+    metadata in a SQLite file that survives restarts and is shared between
+    processes.
+    """
     global _price_service
     if _price_service is None:
-        _price_service = PriceService()
+        cache = None
+        cache_path = os.getenv("MANAGLYNX_CACHE_PATH")
+        if cache_path:
+            cache = SQLiteCache(
+                cache_path,
+                namespace_ttls={
+                    "price": PriceService.PRICE_TTL,
+                    "token": PriceService.METADATA_TTL,
+                    "hist": NEVER_EXPIRE,
+                },
+                stale_seconds=PriceService.STALE_GRACE_SECONDS,
+            )
+        # Historical prices share the SQLite file, where they outlive restarts
+        _price_service = PriceService(cache=cache, history_cache=cache)
     return _price_service
 
 
+def _record_prices(prices: Dict[str, Optional[Dict]], chain: Optional[str] = None) -> None:
+    """
+    Keep the prices an answer used in the session's snapshot, for follow-ups.
+    
+    Args:
+        prices: Token as the tool was given it (address, 'chain:address' or
+            coin ID) -> price data; recorded under the DeFiLlama coin ID, so
+            every tool's prices for a token land on the same key
+        chain: Chain for tokens without a 'chain:' prefix
+    """
+    session_id = current_session_id()
+    if session_id:
+        price_service = get_price_service()
+        get_snapshot_store().record_prices(session_id, {
+            price_service.resolve_coin_id(token, chain): price_data for token, price_data in prices.items()
+        })
+
+
+def _transaction_transfer(tx: Dict, native_symbol: str = "ETH") -> Optional[Tuple[str, str, float]]:
+    """
+    What an Etherscan transaction moved: (token, symbol, amount).
+    
+    Token transfers (tokentx) carry contractAddress and tokenDecimal; anything
+    else is a transfer of the chain's native coin in wei. Failed and
+    zero-value transactions return None.
+    """
+    if str(tx.get("isError", "0")) == "1":
+        return None
+    try:
+        raw = int(tx.get("value") or 0)
+        if tx.get("contractAddress") and tx.get("tokenDecimal") not in (None, ""):
+            amount = raw / 10 ** int(tx["tokenDecimal"])
+            symbol = tx.get("tokenSymbol") or shorten_address(tx["contractAddress"])
+            return (tx["contractAddress"], symbol, amount) if amount else None
+        amount = raw / 10 ** 18
+    except (TypeError, ValueError):
+        return None
+    return ("native", native_symbol, amount) if amount else None
+
+
+# Shared input schema for the tools' chain parameter
+_CHAIN_PARAM = {
+    "type": "string",
+    "description": (
+        "Optional: Chain the tokens are on (ethereum, solana, base, arbitrum, optimism, polygon, bsc, "
+        "avalanche, ...). Default: Solana for base58 mints, Ethereum otherwise"
+    )
+}
+
+_TOKEN_DESCRIPTION = "Token contract address (0x...), Solana mint, 'native' for the chain's coin, or 'chain:address'"
+
+
 def register_price_tools(tools: "ToolRegistry") -> None:
     """
     Register price-related tools with the agent.
@@ -135,19 +882,23 @@ def register_price_tools(tools: "ToolRegistry") -> None:
             "properties": {
                 "contract_address": {
                     "type": "string",
-                    "description": "Token contract address (0x...) or 'eth'"
+                    "description": _TOKEN_DESCRIPTION
                 },
                 "balance": {
                     "type": "number",
                     "description": "Optional: Amount of tokens to calculate total USD value"
-                }
+                },
+                "chain": _CHAIN_PARAM
             },
             "required": ["contract_address"]
         }
     )
-    async def get_token_price_tool(contract_address: str, balance: float = None) -> dict:
+    async def get_token_price_tool(contract_address: str, balance: float = None, chain: str = None) -> dict:
         """Get price and optionally calculate value."""
-        price_data = await price_service.get_token_price(contract_address)
+        try:
+            price_data = await price_service.get_token_price(contract_address, chain)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
         
         if not price_data:
             return {
@@ -156,6 +907,7 @@ def register_price_tools(tools: "ToolRegistry") -> None:
             }
         
         price = price_data.get("usd", 0)
+        _record_prices({contract_address: price_data}, chain)
         
         response = {
             "status": "success",
@@ -163,7 +915,9 @@ def register_price_tools(tools: "ToolRegistry") -> None:
             "data": {
                 "contract_address": contract_address,
                 "usd_price": price,
-                "formatted_price": format_usd(price)
+                "formatted_price": format_usd(price),
+                "price_age_seconds": price_data.get("age_seconds", 0.0),
+                "stale": price_data.get("stale", False)
             }
         }
 
@@ -175,3 +929,357 @@ def register_price_tools(tools: "ToolRegistry") -> None:
             response["data"]["formatted_value"] = format_usd(value)
         
         return response
+
+    @tools.register_tool(
+        name="get_token_prices",
+        description="Get USD prices for many tokens in one call. Use this instead of calling get_token_price once per token.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "contract_addresses": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": f"{_TOKEN_DESCRIPTION}; use 'chain:address' to mix chains in one call"
+                },
+                "chain": _CHAIN_PARAM
+            },
+            "required": ["contract_addresses"]
+        }
+    )
+    async def get_token_prices_tool(contract_addresses: List[str], chain: str = None) -> dict:
+        """Get prices for a list of tokens, on any mix of chains, in a single batched lookup."""
+        try:
+            prices = await price_service.get_token_prices(contract_addresses, chain)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        _record_prices(prices, chain)
+        
+        found = {}
+        not_found = []
+        for contract_address, price_data in prices.items():
+            if not price_data:
+                not_found.append(contract_address)
+                continue
+            price = price_data.get("usd", 0)
+            found[contract_address] = {
+                "usd_price": price,
+                "formatted_price": format_usd(price),
+                "price_age_seconds": price_data.get("age_seconds", 0.0),
+                "stale": price_data.get("stale", False)
+            }
+        
+        if not found:
+            return {
+                "status": "error",
+                "message": f"No prices found for {len(not_found)} tokens"
+            }
+        
+        return {
+            "status": "success",
+            "message": f"Fetched {len(found)} of {len(prices)} prices",
+            "data": {
+                "prices": found,
+                "not_found": not_found
+            }
+        }
+
+    @tools.register_tool(
+        name="value_portfolio",
+        description=(
+            "Value a whole wallet in one call: prices every holding, then returns per-token USD values, "
+            "the total, allocation percentages and tokens without a price. Use this instead of pricing "
+            "holdings one by one and adding them up yourself."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "holdings": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "contract_address": {
+                                "type": "string",
+                                "description": _TOKEN_DESCRIPTION
+                            },
+                            "balance": {
+                                "type": "number",
+                                "description": "Token amount in whole units (already divided by decimals)"
+                            },
+                            "symbol": {
+                                "type": "string",
+                                "description": "Optional: Token symbol for display"
+                            },
+                            "chain": _CHAIN_PARAM
+                        },
+                        "required": ["contract_address", "balance"]
+                    },
+                    "description": "Holdings to value"
+                },
+                "wallet_address": {
+                    "type": "string",
+                    "description": "Optional: Wallet the holdings belong to; the valuation is saved to its session snapshot"
+                }
+            },
+            "required": ["holdings"]
+        }
+    )
+    async def value_portfolio_tool(holdings: List[Dict], wallet_address: str = None) -> dict:
+        """Value all holdings with one batched price lookup and aggregate server-side."""
+        valuation = await price_service.value_holdings(holdings)
+        _record_prices(valuation["prices"])
+        
+        positions = valuation["positions"]
+        if not positions:
+            return {
+                "status": "error",
+                "message": f"No prices found for {len(valuation['unpriced'])} holdings"
+            }
+        
+        total = valuation["total_usd"]
+        data = {
+            "total_value_usd": total,
+            "formatted_total": format_usd(total),
+            "positions": [
+                {
+                    "contract_address": position["contract_address"],
+                    "chain": position["chain"],
+                    "symbol": position["symbol"],
+                    "balance": position["balance"],
+                    "formatted_balance": format_token_amount(position["balance"], position["symbol"]),
+                    "usd_price": position["usd_price"],
+                    "formatted_price": format_usd(position["usd_price"]),
+                    "value_usd": position["value_usd"],
+                    "formatted_value": format_usd(position["value_usd"]),
+                    "allocation": position["allocation"],
+                    "formatted_allocation": format_percentage(position["allocation"]),
+                    "stale": position["stale"],
+                }
+                for position in positions
+            ],
+            "unpriced": valuation["unpriced"],
+        }
+        
+        session_id = current_session_id()
+        if wallet_address and session_id:
+            try:
+                get_snapshot_store().save(
+                    session_id, wallet_address, SECTION_SUMMARY, data, source="value_portfolio"
+                )
+            except ValueError as e:
+                logger.warning(f"Could not save valuation snapshot: {e}")
+        
+        return {
+            "status": "success",
+            "message": f"Valued {len(positions)} of {len(positions) + len(valuation['unpriced'])} holdings",
+            "data": data
+        }
+
+    @tools.register_tool(
+        name="get_historical_prices",
+        description=(
+            "Get USD prices of tokens at past times (e.g. at the time of a transaction) in one batched call. "
+            "Pass amounts to get the USD value at that time."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "lookups": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "contract_address": {
+                                "type": "string",
+                                "description": _TOKEN_DESCRIPTION
+                            },
+                            "chain": _CHAIN_PARAM,
+                            "timestamp": {
+                                "type": "integer",
+                                "description": "Unix timestamp in seconds (e.g. Etherscan timeStamp)"
+                            },
+                            "amount": {
+                                "type": "number",
+                                "description": "Optional: Token amount to value at that time"
+                            }
+                        },
+                        "required": ["contract_address", "timestamp"]
+                    },
+                    "description": "Token and time pairs to price"
+                }
+            },
+            "required": ["lookups"]
+        }
+    )
+    async def get_historical_prices_tool(lookups: List[Dict]) -> dict:
+        """Price many (token, time) pairs with a few batched historical requests."""
+        valid = []
+        invalid = []
+        for index, lookup in enumerate(lookups):
+            try:
+                token = str(lookup["contract_address"])
+                if lookup.get("chain"):
+                    token = f"{lookup['chain']}:{token}"
+                # Raises ValueError for an unsupported chain
+                price_service.resolve_coin_id(token)
+                amount = lookup.get("amount")
+                valid.append((token, int(lookup["timestamp"]), None if amount is None else float(amount)))
+            except KeyError as e:
+                invalid.append({"index": index, "error": f"Missing {e.args[0]}"})
+            except (TypeError, ValueError) as e:
+                invalid.append({"index": index, "error": f"Invalid lookup: {e}"})
+        
+        prices = await price_service.get_historical_prices([(token, timestamp) for token, timestamp, _ in valid])
+        
+        results = []
+        total = 0.0
+        not_found = 0
+        for token, timestamp, amount in valid:
+            price_data = prices.get((token, timestamp))
+            entry = {"contract_address": token, "timestamp": timestamp}
+            if not price_data:
+                not_found += 1
+                results.append({**entry, "usd_price": None})
+                continue
+            entry.update({
+                "usd_price": price_data["usd"],
+                "formatted_price": format_usd(price_data["usd"]),
+                "price_timestamp": price_data.get("timestamp"),
+            })
+            if amount is not None:
+                value = amount * price_data["usd"]
+                total += value
+                entry.update({"amount": amount, "value_usd": value, "formatted_value": format_usd(value)})
+            results.append(entry)
+        
+        if not valid or not_found == len(valid):
+            return {
+                "status": "error",
+                "message": f"No historical prices found for {len(lookups)} lookups",
+                "data": {"invalid": invalid}
+            }
+        
+        return {
+            "status": "success",
+            "message": f"Fetched {len(valid) - not_found} of {len(lookups)} historical prices",
+            "data": {
+                "prices": results,
+                "total_value_usd": total,
+                "formatted_total": format_usd(total),
+                "not_found": not_found,
+                "invalid": invalid
+            }
+        }
+
+    @tools.register_tool(
+        name="value_transaction_history",
+        description=(
+            "Value an Etherscan transaction history (normal, internal or ERC20 token transfers) in USD at the "
+            "time of each transaction. Returns USD in/out per token, net flow and the largest transactions."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "transactions": {
+                    "type": "array",
+                    "items": {"type": "object"},
+                    "description": "List of transaction objects from Etherscan (txlist, txlistinternal or tokentx)"
+                },
+                "address": {
+                    "type": "string",
+                    "description": "The wallet address being analyzed"
+                },
+                "top": {
+                    "type": "integer",
+                    "description": "Optional: Number of largest transactions to list (default 10)"
+                },
+                "chain": {
+                    "type": "string",
+                    "description": "Optional: EVM chain of the explorer data (ethereum, base, arbitrum, polygon, ...; default ethereum)"
+                }
+            },
+            "required": ["transactions", "address"]
+        }
+    )
+    async def value_transaction_history_tool(
+        transactions: List[Dict],
+        address: str,
+        top: int = 10,
+        chain: str = None,
+    ) -> dict:
+        """Value each transfer at its own time with one batched historical lookup."""
+        try:
+            slug = resolve_price_chain(chain) or "ethereum"
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+        native_symbol = NATIVE_COINS[slug][1]
+        
+        address_lower = address.lower()
+        transfers = []
+        for tx in transactions:
+            moved = _transaction_transfer(tx, native_symbol)
+            direction = (
+                "in" if str(tx.get("to", "")).lower() == address_lower
+                else "out" if str(tx.get("from", "")).lower() == address_lower
+                else None
+            )
+            if moved is None or direction is None or not str(tx.get("timeStamp", "")).isdigit():
+                continue
+            transfers.append((tx, int(tx["timeStamp"]), direction, *moved))
+        
+        if not transfers:
+            return {
+                "status": "error",
+                "message": f"No value transfers to or from {address} in {len(transactions)} transactions"
+            }
+        
+        prices = await price_service.get_historical_prices(
+            ((token, timestamp) for _, timestamp, _, token, _, _ in transfers), slug
+        )
+        
+        tokens: Dict[str, Dict] = {}
+        valued = []
+        unpriced = 0
+        for tx, timestamp, direction, token, symbol, amount in transfers:
+            flow = tokens.setdefault(token, {
+                "symbol": symbol, "amount_in": 0.0, "amount_out": 0.0, "usd_in": 0.0, "usd_out": 0.0, "unpriced": 0
+            })
+            flow[f"amount_{direction}"] += amount
+            price_data = prices.get((token, timestamp))
+            if not price_data:
+                flow["unpriced"] += 1
+                unpriced += 1
+                continue
+            value = amount * price_data["usd"]
+            flow[f"usd_{direction}"] += value
+            valued.append((value, {
+                "hash": tx.get("hash"),
+                "timestamp": timestamp,
+                "direction": direction,
+                "formatted_amount": format_token_amount(amount, symbol),
+                "usd_price": price_data["usd"],
+                "formatted_value": format_usd(value),
+            }))
+        
+        usd_in = sum(flow["usd_in"] for flow in tokens.values())
+        usd_out = sum(flow["usd_out"] for flow in tokens.values())
+        for flow in tokens.values():
+            flow["formatted_usd_in"] = format_usd(flow["usd_in"])
+            flow["formatted_usd_out"] = format_usd(flow["usd_out"])
+        valued.sort(key=lambda item: item[0], reverse=True)
+        
+        return {
+            "status": "success",
+            "message": f"Valued {len(valued)} of {len(transfers)} transfers at their historical prices",
+            "data": {
+                "usd_in": usd_in,
+                "usd_out": usd_out,
+                "net_usd": usd_in - usd_out,
+                "formatted_usd_in": format_usd(usd_in),
+                "formatted_usd_out": format_usd(usd_out),
+                "formatted_net": ("-" if usd_in < usd_out else "") + format_usd(abs(usd_in - usd_out)),
+                "by_token": tokens,
+                "largest_transactions": [entry for _, entry in valued[:max(top, 0)]],
+                "unpriced_transfers": unpriced
+            }
+        }
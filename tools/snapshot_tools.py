@@ -0,0 +1,458 @@
+"""
+Session wallet snapshots.
+Keeps what earlier queries in a session fetched about each address (balances,
+token metadata, transaction pages) and the prices they used, so follow-ups
+like "What are his top 3 holdings?" are answered without going back to the
+MCP servers.
+"""
+
+import contextvars
+import json
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from omnicoreagent import logger
+
+from tools.mcp_cache import BALANCE_TOOLS, TOKEN_METADATA_TOOLS, TRANSACTION_HISTORY_TOOLS
+from utils.cache import LRUCache
+from utils.chains import is_evm_address, is_solana_address
+
+if TYPE_CHECKING:
+    from omnicoreagent import ToolRegistry
+
+SECTION_BALANCES = "balances"
+SECTION_TOKENS = "tokens"
+SECTION_TRANSACTIONS = "transactions"
+SECTION_SUMMARY = "summary"
+SNAPSHOT_SECTIONS = (SECTION_BALANCES, SECTION_TOKENS, SECTION_TRANSACTIONS, SECTION_SUMMARY)
+
+# MCP tool name pattern -> snapshot section, first match wins; tools
+# matching none are not captured
+SNAPSHOT_TOOL_SECTIONS: List[Tuple[str, str]] = [
+    (TOKEN_METADATA_TOOLS, SECTION_TOKENS),
+    (BALANCE_TOOLS, SECTION_BALANCES),
+    (TRANSACTION_HISTORY_TOOLS, SECTION_TRANSACTIONS),
+]
+
+# Default freshness window in seconds for answering from a snapshot
+DEFAULT_SNAPSHOT_TTL = 300
+
+# Transaction pages kept per address; the oldest is dropped beyond this
+MAX_TRANSACTION_PAGES = 10
+
+# Arguments that name the address a tool call is about, most specific first
+_ADDRESS_ARGS = ("address", "wallet", "wallet_address", "account", "owner", "contractaddress", "token_address")
+
+# Arguments that don't tell transaction pages apart
+_NON_PAGE_ARGS = {"chain", "chainid", "network", "apikey", "module", "action"}
+
+# Session the running query belongs to
+_current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "managlynx_snapshot_session", default=None
+)
+
+
+@contextmanager
+def snapshot_session(session_id: Optional[str]) -> Iterator[None]:
+    """Attribute snapshots captured inside this block to session_id."""
+    token = _current_session.set(session_id)
+    try:
+        yield
+    finally:
+        _current_session.reset(token)
+
+
+def current_session_id() -> Optional[str]:
+    """Session of the query running in this context, if any."""
+    return _current_session.get()
+
+
+def normalize_address(address: str) -> Optional[str]:
+    """EVM addresses lowercased, Solana addresses as is; None if neither."""
+    address = (address or "").strip()
+    if is_evm_address(address):
+        return address.lower()
+    if is_solana_address(address):
+        return address
+    return None
+
+
+def _find_address(arguments: Dict[str, Any]) -> Optional[str]:
+    """The address a tool call is about, preferring well-known argument names."""
+    by_name = {key.lower(): value for key, value in arguments.items() if isinstance(value, str)}
+    for name in _ADDRESS_ARGS:
+        address = normalize_address(by_name.get(name, ""))
+        if address:
+            return address
+    for value in by_name.values():
+        address = normalize_address(value)
+        if address:
+            return address
+    return None
+
+
+def _page_key(arguments: Dict[str, Any], address: str) -> str:
+    """Identify a transaction page by the arguments other than the address."""
+    rest = {
+        key: value for key, value in arguments.items()
+        if key.lower() not in _NON_PAGE_ARGS and value is not None
+        and normalize_address(str(value)) != address
+    }
+    return json.dumps(rest, sort_keys=True, default=str) if rest else "latest"
+
+
+def _result_data(result: Any) -> Any:
+    """The payload of a CallToolResult: parsed JSON when the text is JSON."""
+    structured = getattr(result, "structuredContent", None)
+    if structured:
+        return structured
+    text = "\n".join(getattr(item, "text", "") or "" for item in getattr(result, "content", None) or [])
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return text
+
+
+class SnapshotStore:
+    """Per-session, per-address snapshots of fetched wallet data."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_SNAPSHOT_TTL,
+        max_sessions: int = 1_000,
+        session_ttl: float = 24 * 3600,
+    ):
+        """
+        Initialize store.
+
+        Args:
+            ttl_seconds: Default freshness window for get()
+            max_sessions: Sessions kept; least recently used are dropped
+            session_ttl: Seconds an idle session's snapshots are kept
+        """
+        self.ttl_seconds = ttl_seconds
+        self.policies = [(re.compile(pattern, re.IGNORECASE), section) for pattern, section in SNAPSHOT_TOOL_SECTIONS]
+        # session_id -> {"addresses": {address: {section: entry}}, "prices": {token: entry}}
+        self._sessions = LRUCache(max_entries=max_sessions, ttl_seconds=session_ttl)
+        self._captured = 0
+        self._served = 0
+
+    def _session(self, session_id: str) -> Dict[str, Any]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = {"addresses": {}, "prices": {}}
+        # Re-set on every write so active sessions stay in the LRU
+        self._sessions.set(session_id, session)
+        return session
+
+    def save(
+        self,
+        session_id: str,
+        address: str,
+        section: str,
+        data: Any,
+        page: Optional[str] = None,
+        source: str = "",
+    ) -> None:
+        """
+        Store a section of an address's snapshot.
+
+        Args:
+            session_id: Session the data belongs to
+            address: Wallet or token address
+            section: One of SNAPSHOT_SECTIONS
+            data: JSON-serializable payload
+            page: Transaction page key (transactions section only)
+            source: Tool the data came from
+
+        Raises:
+            ValueError: If the address or section is invalid
+        """
+        normalized = normalize_address(address)
+        if not normalized:
+            raise ValueError(f"Invalid address: {address}")
+        if section not in SNAPSHOT_SECTIONS:
+            raise ValueError(f"Unknown snapshot section '{section}', expected one of {', '.join(SNAPSHOT_SECTIONS)}")
+
+        entry = {"data": data, "saved_at": time.time(), "source": source}
+        sections = self._session(session_id)["addresses"].setdefault(normalized, {})
+        if section == SECTION_TRANSACTIONS:
+            pages = sections.setdefault(section, {})
+            pages.pop(page or "latest", None)
+            pages[page or "latest"] = entry
+            while len(pages) > MAX_TRANSACTION_PAGES:
+                pages.pop(next(iter(pages)))
+        else:
+            sections[section] = entry
+
+    def record_prices(self, session_id: str, prices: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Remember the prices a session's answers used.
+
+        Args:
+            session_id: Session
+            prices: DeFiLlama coin ID (PriceService.resolve_coin_id) -> price
+                data from the price service
+        """
+        now = time.time()
+        stored = self._session(session_id)["prices"]
+        for coin_id, price_data in prices.items():
+            if price_data and price_data.get("usd") is not None:
+                stored[coin_id] = {
+                    "data": {"usd_price": price_data["usd"]},
+                    "saved_at": now,
+                }
+
+    def get(
+        self,
+        session_id: str,
+        address: str,
+        sections: Optional[List[str]] = None,
+        max_age: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Read the fresh parts of an address's snapshot.
+
+        Args:
+            session_id: Session
+            address: Wallet or token address
+            sections: Sections to return (default: all)
+            max_age: Freshness window in seconds (default: the store's)
+
+        Returns:
+            Dict with address, sections (fresh entries with age_seconds),
+            prices recorded in the session (by coin ID), and the names of stale and
+            missing sections
+        """
+        max_age = self.ttl_seconds if max_age is None else max_age
+        wanted = list(sections or SNAPSHOT_SECTIONS)
+        normalized = normalize_address(address) or address
+        session = self._sessions.get(session_id) or {"addresses": {}, "prices": {}}
+        stored = session["addresses"].get(normalized, {})
+        now = time.time()
+
+        def fresh(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            age = now - entry["saved_at"]
+            if age > max_age:
+                return None
+            return {"data": entry["data"], "age_seconds": round(age, 1), "source": entry.get("source", "")}
+
+        found: Dict[str, Any] = {}
+        stale: List[str] = []
+        missing: List[str] = []
+        for section in wanted:
+            if section not in stored:
+                missing.append(section)
+                continue
+            if section == SECTION_TRANSACTIONS:
+                pages = {key: fresh(entry) for key, entry in stored[section].items()}
+                pages = {key: entry for key, entry in pages.items() if entry}
+                value = {"pages": pages} if pages else None
+            else:
+                value = fresh(stored[section])
+            if value is None:
+                stale.append(section)
+            else:
+                found[section] = value
+
+        prices = {coin_id: fresh(entry) for coin_id, entry in session["prices"].items()}
+        if found:
+            self._served += 1
+        return {
+            "address": normalized,
+            "sections": found,
+            "prices": {coin_id: entry["data"]["usd_price"] for coin_id, entry in prices.items() if entry},
+            "stale": stale,
+            "missing": missing,
+        }
+
+    def addresses(self, session_id: str) -> List[str]:
+        """Addresses with a snapshot in the session."""
+        session = self._sessions.get(session_id)
+        return list(session["addresses"]) if session else []
+
+    def clear(self, session_id: str) -> None:
+        """Drop a session's snapshots."""
+        self._sessions.delete(session_id)
+
+    def section_for(self, tool_name: str) -> Optional[str]:
+        """Snapshot section an MCP tool's results belong in, if any."""
+        for pattern, section in self.policies:
+            if pattern.search(tool_name):
+                return section
+        return None
+
+    def capture(self, session_id: str, tool_name: str, arguments: Dict[str, Any], result: Any) -> bool:
+        """
+        Store an MCP tool result in the session's snapshot.
+
+        Returns:
+            True if the result was captured
+        """
+        section = self.section_for(tool_name)
+        if section is None or getattr(result, "isError", False):
+            return False
+        address = _find_address(arguments or {})
+        if address is None:
+            return False
+
+        page = _page_key(arguments, address) if section == SECTION_TRANSACTIONS else None
+        self.save(session_id, address, section, _result_data(result), page=page, source=tool_name)
+        self._captured += 1
+        return True
+
+    def wrap_sessions(self, sessions: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Capture results of MCP calls made while a snapshot_session() is set.
+
+        Safe to call again after new servers connect; sessions already
+        wrapped are skipped.
+
+        Args:
+            sessions: MCPClient.sessions (server name -> {"session": ClientSession, ...})
+        """
+        for info in (sessions or {}).values():
+            session = info.get("session") if isinstance(info, dict) else None
+            if session is None or getattr(session, "_managlynx_snapshot", False):
+                continue
+            self._wrap_call_tool(session)
+
+    def _wrap_call_tool(self, session: Any) -> None:
+        call_tool = session.call_tool
+
+        async def snapshot_call_tool(name: str, arguments: Dict[str, Any] = None, *args, **kwargs):
+            result = await call_tool(name, arguments, *args, **kwargs)
+            session_id = current_session_id()
+            if session_id:
+                try:
+                    self.capture(session_id, name, arguments or {}, result)
+                except Exception as e:
+                    logger.warning(f"Could not snapshot {name} result: {e}")
+            return result
+
+        session.call_tool = snapshot_call_tool
+        session._managlynx_snapshot = True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get capture counters and session count."""
+        return {
+            "sessions": len(self._sessions),
+            "captured": self._captured,
+            "served": self._served,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+# Global snapshot store instance
+_snapshot_store: Optional[SnapshotStore] = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Get global snapshot store; MANAGLYNX_SNAPSHOT_TTL sets the freshness window."""
+    global _snapshot_store
+    if _snapshot_store is None:
+        ttl = float(os.getenv("MANAGLYNX_SNAPSHOT_TTL", DEFAULT_SNAPSHOT_TTL))
+        _snapshot_store = SnapshotStore(ttl_seconds=ttl)
+    return _snapshot_store
+
+
+def register_snapshot_tools(tools: "ToolRegistry") -> None:
+    """
+    Register session snapshot tools with the agent.
+
+    Args:
+        tools: ToolRegistry instance
+    """
+    store = get_snapshot_store()
+
+    @tools.register_tool(
+        name="get_wallet_snapshot",
+        description=(
+            "Get balances, token metadata, transaction pages and prices already fetched for an address "
+            "in this conversation. Call this before MCP tools for follow-up questions about the same address."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "address": {
+                    "type": "string",
+                    "description": "Wallet or token address (EVM 0x... or Solana)"
+                },
+                "sections": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": list(SNAPSHOT_SECTIONS)},
+                    "description": "Optional: Sections to return (default: all)"
+                },
+                "max_age_seconds": {
+                    "type": "number",
+                    "description": "Optional: Only return data fetched within this many seconds"
+                }
+            },
+            "required": ["address"]
+        }
+    )
+    async def get_wallet_snapshot_tool(address: str, sections: List[str] = None, max_age_seconds: float = None) -> dict:
+        """Read the fresh parts of an address's snapshot for the current session."""
+        session_id = current_session_id()
+        if not session_id:
+            return {"status": "error", "message": "No active session"}
+
+        snapshot = store.get(session_id, address, sections, max_age_seconds)
+        if not snapshot["sections"]:
+            missing = ", ".join(snapshot["stale"] + snapshot["missing"])
+            return {
+                "status": "error",
+                "message": f"No fresh snapshot for {address} ({missing}); fetch it with the chain's MCP tools"
+            }
+
+        return {
+            "status": "success",
+            "message": f"Snapshot has {', '.join(snapshot['sections'])}",
+            "data": snapshot
+        }
+
+    @tools.register_tool(
+        name="save_wallet_snapshot",
+        description=(
+            "Save a compact result you computed for an address (e.g. valued holdings, total value) so "
+            "follow-up questions can reuse it. Raw MCP results are saved automatically."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "address": {
+                    "type": "string",
+                    "description": "Wallet or token address (EVM 0x... or Solana)"
+                },
+                "data": {
+                    "type": "object",
+                    "description": "Structured data to save"
+                },
+                "section": {
+                    "type": "string",
+                    "enum": list(SNAPSHOT_SECTIONS),
+                    "description": "Optional: Section to save into (default: summary)"
+                }
+            },
+            "required": ["address", "data"]
+        }
+    )
+    async def save_wallet_snapshot_tool(address: str, data: dict, section: str = SECTION_SUMMARY) -> dict:
+        """Save model-computed data into the current session's snapshot."""
+        session_id = current_session_id()
+        if not session_id:
+            return {"status": "error", "message": "No active session"}
+
+        try:
+            store.save(session_id, address, section, data, source="save_wallet_snapshot")
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+
+        return {
+            "status": "success",
+            "message": f"Saved {section} for {address}",
+            "data": {"address": address, "section": section}
+        }
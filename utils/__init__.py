@@ -9,7 +9,11 @@ from .formatting import (
     format_usd,
     format_percentage,
 )
-from .cache import SimpleCache
+from .cache import LRUCache, SimpleCache, SQLiteCache, NEVER_EXPIRE
+from .selectors import SelectorRegistry, get_selector_registry
+from .tokens import TokenRegistry, get_token_registry
+from .offload import OffloadPool, get_offload_pool
+from .tracing import Tracer, get_tracer
 
 __all__ = [
     "shorten_address",
@@ -17,5 +21,16 @@ __all__ = [
     "format_token_amount",
     "format_usd",
     "format_percentage",
+    "LRUCache",
     "SimpleCache",
+    "SQLiteCache",
+    "NEVER_EXPIRE",
+    "SelectorRegistry",
+    "get_selector_registry",
+    "TokenRegistry",
+    "get_token_registry",
+    "OffloadPool",
+    "get_offload_pool",
+    "Tracer",
+    "get_tracer",
 ]
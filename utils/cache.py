@@ -1,71 +1,525 @@
 """
-Simple in-memory cache with TTL support.
+In-memory and persistent caches with TTL support.
 """
 
+import atexit
+import heapq
+import json
+import logging
+import queue
+import sqlite3
+import threading
 import time
-from typing import Any, Optional, Dict
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Dict, List, Tuple, Union
 
+logger = logging.getLogger(__name__)
 
-class SimpleCache:
-    """Time-based cache for API responses."""
-    
-    def __init__(self, ttl_seconds: int = 300):
+# TTL for entries that never change (token decimals, immutable on-chain data)
+NEVER_EXPIRE = float("inf")
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with per-entry TTL and statistics."""
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 300,
+        stale_seconds: float = 0,
+    ):
         """
         Initialize cache.
-        
+
         Args:
-            ttl_seconds: Time-to-live in seconds (default: 5 minutes)
+            max_entries: Maximum number of entries kept before the least
+                recently used one is evicted
+            ttl_seconds: Default time-to-live in seconds (default: 5 minutes)
+            stale_seconds: Grace window after expiry during which get_stale()
+                still returns the entry (default: 0, disabled)
         """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self.max_entries = max_entries
         self.ttl_seconds = ttl_seconds
-        self._cache: Dict[str, tuple[Any, float]] = {}
-    
+        self.stale_seconds = stale_seconds
+
+        # key -> (value, stored_at, expires_at), least to most recently used
+        self._cache: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        # Min-heap of (remove_at, key); outdated heap entries are skipped lazily
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
     def get(self, key: str) -> Optional[Any]:
         """
         Get cached value if not expired.
-        
+
         Args:
             key: Cache key
-            
+
         Returns:
             Cached value or None if expired/not found
         """
-        if key not in self._cache:
+        entry = self._cache.get(key)
+        if entry is None:
+            self._misses += 1
             return None
-        
-        value, timestamp = self._cache[key]
-        
-        # Check if expired
-        if time.time() - timestamp > self.ttl_seconds:
-            del self._cache[key]
+
+        value, _, expires_at = entry
+        now = time.time()
+        if now >= expires_at:
+            # Keep the entry around for get_stale() while inside the grace window
+            if now >= expires_at + self.stale_seconds:
+                del self._cache[key]
+                self._expirations += 1
+            self._misses += 1
             return None
-        
+
+        self._cache.move_to_end(key)
+        self._hits += 1
         return value
-    
-    def set(self, key: str, value: Any) -> None:
+
+    def get_stale(self, key: str) -> Optional[Tuple[Any, float, bool]]:
+        """
+        Get cached value even if it expired within the stale grace window.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Tuple of (value, age in seconds, is_stale) or None if not found
+            or past the grace window
+        """
+        entry = self._cache.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        value, stored_at, expires_at = entry
+        now = time.time()
+        if now >= expires_at + self.stale_seconds:
+            del self._cache[key]
+            self._expirations += 1
+            self._misses += 1
+            return None
+
+        self._cache.move_to_end(key)
+        is_stale = now >= expires_at
+        if is_stale:
+            self._stale_hits += 1
+        else:
+            self._hits += 1
+        return value, now - stored_at, is_stale
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
         """
-        Cache value with current timestamp.
-        
+        Cache value, evicting expired and least recently used entries as needed.
+
         Args:
             key: Cache key
             value: Value to cache
+            ttl: Optional TTL in seconds overriding the cache default
         """
-        self._cache[key] = (value, time.time())
-    
+        now = time.time()
+        self._store(key, value, now, now + (self.ttl_seconds if ttl is None else ttl))
+
+    def _store(self, key: str, value: Any, stored_at: float, expires_at: float) -> None:
+        """Insert an entry with explicit timestamps (e.g. loaded from disk)."""
+        now = time.time()
+        self._cache[key] = (value, stored_at, expires_at)
+        self._cache.move_to_end(key)
+        heapq.heappush(self._expiry_heap, (expires_at + self.stale_seconds, key))
+
+        self._purge_expired(now)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+            self._evictions += 1
+
+        # Drop heap entries that no longer match a live key
+        if len(self._expiry_heap) > 2 * self.max_entries:
+            self._rebuild_heap()
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        self._cache.pop(key, None)
+
     def clear(self) -> None:
         """Clear all cached values."""
         self._cache.clear()
-    
+        self._expiry_heap.clear()
+
     def clear_expired(self) -> None:
         """Remove expired entries."""
-        current_time = time.time()
-        expired_keys = [
-            key for key, (_, timestamp) in self._cache.items()
-            if current_time - timestamp > self.ttl_seconds
-        ]
-        
-        for key in expired_keys:
-            del self._cache[key]
-    
+        self._purge_expired(time.time())
+
     def size(self) -> int:
         """Get number of cached items."""
         return len(self._cache)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics for monitoring.
+
+        Returns:
+            Dict with size, capacity, hit/miss/eviction/expiration counters and hit rate
+        """
+        lookups = self._hits + self._stale_hits + self._misses
+        return {
+            "size": len(self._cache),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+    def _purge_expired(self, now: float) -> None:
+        """Pop entries past their TTL and grace window; each heap entry is popped once."""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            remove_at, key = heapq.heappop(heap)
+            entry = self._cache.get(key)
+            # Only drop the key if this heap entry is its current expiry
+            if entry is not None and entry[2] + self.stale_seconds == remove_at:
+                del self._cache[key]
+                self._expirations += 1
+
+    def _rebuild_heap(self) -> None:
+        """Rebuild the expiry heap from live entries only."""
+        self._expiry_heap = [
+            (expires_at + self.stale_seconds, key)
+            for key, (_, _, expires_at) in self._cache.items()
+        ]
+        heapq.heapify(self._expiry_heap)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._cache.get(key)
+        return entry is not None and time.time() < entry[2]
+
+
+class SimpleCache(LRUCache):
+    """Time-based cache for API responses."""
+
+    def __init__(self, ttl_seconds: int = 300, max_entries: int = 10_000):
+        """
+        Initialize cache.
+
+        Args:
+            ttl_seconds: Time-to-live in seconds (default: 5 minutes)
+            max_entries: Maximum number of entries (default: 10,000)
+        """
+        super().__init__(max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+
+class SQLiteCache:
+    """
+    Persistent cache backed by SQLite in WAL mode.
+
+    Same interface as LRUCache, but entries survive restarts and can be
+    shared by several processes on one host. Values must be JSON-serializable.
+    TTLs are resolved per namespace, where the namespace is the part of the
+    key before the first ':' (e.g. 'price:eth' -> 'price'). Caches that share
+    a file but need their own expiry (stale grace window, purging) use
+    separate tables.
+
+    Reads are served from an in-memory LRU front and only go to disk on a
+    miss. Writes, deletes and purges are queued and applied by a background
+    writer thread, so callers on the event loop never wait on a commit.
+    Another process's update to a key this process holds in memory is seen
+    once the in-memory copy expires.
+    """
+
+    # Purge expired rows every N writes
+    PURGE_INTERVAL = 256
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        ttl_seconds: float = 300,
+        namespace_ttls: Optional[Dict[str, float]] = None,
+        stale_seconds: float = 0,
+        table: str = "cache",
+        memory_entries: int = 10_000,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            path: SQLite database file (created if missing)
+            ttl_seconds: Default time-to-live for keys without a namespace TTL
+            namespace_ttls: Optional TTL per key namespace; use NEVER_EXPIRE
+                for data that never changes
+            stale_seconds: Grace window after expiry during which get_stale()
+                still returns the entry (default: 0, disabled)
+            table: Table to store entries in (default: 'cache')
+            memory_entries: Entries kept in the in-memory front
+
+        Raises:
+            ValueError: If table is not a valid identifier
+        """
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.namespace_ttls = dict(namespace_ttls or {})
+        self.stale_seconds = stale_seconds
+        self.table = table
+        self.memory = LRUCache(max_entries=memory_entries, ttl_seconds=ttl_seconds, stale_seconds=stale_seconds)
+
+        # Reads and writes use separate connections; in WAL mode readers
+        # never wait for the writer's commits
+        self._write_conn = self._connect()
+        self._write_conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, expires_at REAL)"
+        )
+        self._write_conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_expires_at ON {table} (expires_at)")
+        self._write_conn.commit()
+        self._read_lock = threading.Lock()
+        self._read_conn = self._connect()
+
+        self._writes = 0
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._expirations = 0
+
+        self._queue: "queue.SimpleQueue[Optional[Tuple]]" = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name=f"sqlite-cache:{table}", daemon=True)
+        self._writer.start()
+        self._closed = False
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def ttl_for(self, key: str) -> float:
+        """Resolve the TTL for a key from its namespace."""
+        namespace = key.split(":", 1)[0]
+        return self.namespace_ttls.get(namespace, self.ttl_seconds)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get cached value if not expired.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if expired/not found
+        """
+        entry = self.get_stale(key, count=False)
+        if entry is None or entry[2]:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return entry[0]
+
+    def get_stale(self, key: str, count: bool = True) -> Optional[Tuple[Any, float, bool]]:
+        """
+        Get cached value even if it expired within the stale grace window.
+
+        Args:
+            key: Cache key
+            count: Whether to record the lookup in the statistics
+
+        Returns:
+            Tuple of (value, age in seconds, is_stale) or None if not found
+            or past the grace window
+        """
+        entry = self.memory.get_stale(key)
+        if entry is None:
+            entry = self._load(key)
+
+        if count:
+            if entry is None:
+                self._misses += 1
+            elif entry[2]:
+                self._stale_hits += 1
+            else:
+                self._hits += 1
+        return entry
+
+    def _load(self, key: str) -> Optional[Tuple[Any, float, bool]]:
+        """Read a key missing from memory from disk and keep it in memory."""
+        with self._read_lock:
+            row = self._read_conn.execute(
+                f"SELECT value, stored_at, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        value, stored_at, expires_at = row
+        expires_at = NEVER_EXPIRE if expires_at is None else expires_at
+        now = time.time()
+        if now >= expires_at + self.stale_seconds:
+            self._queue.put(("delete", key))
+            self._expirations += 1
+            return None
+
+        value = json.loads(value)
+        self.memory._store(key, value, stored_at, expires_at)
+        return value, now - stored_at, now >= expires_at
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Cache value with the given TTL, or its namespace TTL if not given.
+
+        The value is readable at once; it reaches disk shortly after.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value to cache
+            ttl: Optional TTL in seconds; NEVER_EXPIRE keeps the entry forever
+
+        Raises:
+            TypeError: If the value is not JSON-serializable
+        """
+        now = time.time()
+        ttl = self.ttl_for(key) if ttl is None else ttl
+        encoded = json.dumps(value)
+        self.memory._store(key, value, now, now + ttl)
+        self._queue.put(("set", key, encoded, now, None if ttl == NEVER_EXPIRE else now + ttl))
+
+        self._writes += 1
+        if self._writes % self.PURGE_INTERVAL == 0:
+            self.clear_expired()
+
+    def delete(self, key: str) -> None:
+        """Remove a key if present."""
+        self.memory.delete(key)
+        self._queue.put(("delete", key))
+
+    def clear(self) -> None:
+        """Clear all cached values."""
+        self.memory.clear()
+        self._queue.put(("clear",))
+
+    def clear_expired(self) -> None:
+        """Remove entries past their TTL and grace window (on the writer thread)."""
+        self.memory.clear_expired()
+        self._queue.put(("purge",))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued write has reached disk.
+
+        Args:
+            timeout: Max seconds to wait (default: no limit)
+
+        Returns:
+            Whether the queue was drained in time
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def _write_loop(self) -> None:
+        """Apply queued operations, committing once per batch."""
+        while True:
+            ops = [self._queue.get()]
+            while not self._queue.empty() and len(ops) < 1_000:
+                ops.append(self._queue.get())
+
+            flushed = []
+            stop = False
+            try:
+                for op in ops:
+                    if op is None:
+                        stop = True
+                    elif op[0] == "flush":
+                        flushed.append(op[1])
+                    else:
+                        self._apply(op)
+                self._write_conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"SQLite cache write to {self.path} failed: {e}")
+                self._write_conn.rollback()
+            for done in flushed:
+                done.set()
+            if stop:
+                return
+
+    def _apply(self, op: Tuple) -> None:
+        kind, args = op[0], op[1:]
+        if kind == "set":
+            self._write_conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                args,
+            )
+        elif kind == "delete":
+            self._write_conn.execute(f"DELETE FROM {self.table} WHERE key = ?", args)
+        elif kind == "clear":
+            self._write_conn.execute(f"DELETE FROM {self.table}")
+        elif kind == "purge":
+            cursor = self._write_conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time() - self.stale_seconds,),
+            )
+            self._expirations += cursor.rowcount
+
+    def size(self) -> int:
+        """Get number of cached items on disk (after pending writes land)."""
+        self.flush()
+        with self._read_lock:
+            return self._read_conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics for monitoring (counters are per process).
+
+        Returns:
+            Dict with size, hit/miss/expiration counters and hit rate
+        """
+        lookups = self._hits + self._stale_hits + self._misses
+        return {
+            "size": self.size(),
+            "memory_size": len(self.memory),
+            "path": str(self.path),
+            "table": self.table,
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "misses": self._misses,
+            "expirations": self._expirations,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Write out queued changes and close the database connections."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._write_conn.close()
+        with self._read_lock:
+            self._read_conn.close()
+        atexit.unregister(self.close)
+
+    def __len__(self) -> int:
+        return self.size()
+
+    def __contains__(self, key: str) -> bool:
+        entry = self.get_stale(key, count=False)
+        return entry is not None and not entry[2]
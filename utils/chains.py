@@ -0,0 +1,90 @@
+"""
+Chain detection for wallet addresses, transaction hashes and free-form queries.
+"""
+
+import re
+from typing import Optional, Set
+
+CHAIN_EVM = "evm"
+CHAIN_SOLANA = "solana"
+ALL_CHAINS = (CHAIN_EVM, CHAIN_SOLANA)
+
+_EVM_ADDRESS = re.compile(r"^0x[a-fA-F0-9]{40}$")
+_EVM_TOKEN = re.compile(r"\b0x[a-fA-F0-9]{64}\b|\b0x[a-fA-F0-9]{40}\b")
+
+_BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_BASE58_INDEX = {char: index for index, char in enumerate(_BASE58_ALPHABET)}
+# Solana addresses are 32 bytes (32-44 chars), signatures 64 bytes (up to 88)
+_BASE58_TOKEN = re.compile(r"(?<![A-Za-z0-9])[1-9A-HJ-NP-Za-km-z]{32,88}(?![A-Za-z0-9])")
+
+_CHAIN_KEYWORDS = {
+    CHAIN_EVM: re.compile(r"\b(ethereum|etherscan|evm|erc-?20|erc-?721|eth|weth|arbitrum|optimism|polygon)\b", re.IGNORECASE),
+    CHAIN_SOLANA: re.compile(r"\b(solana|solscan|spl|sol|jupiter|phantom)\b", re.IGNORECASE),
+}
+
+
+def base58_decode(value: str) -> Optional[bytes]:
+    """
+    Decode a base58 (Bitcoin alphabet) string.
+
+    Args:
+        value: Base58 text
+
+    Returns:
+        Decoded bytes, or None if the string contains invalid characters
+    """
+    number = 0
+    for char in value:
+        digit = _BASE58_INDEX.get(char)
+        if digit is None:
+            return None
+        number = number * 58 + digit
+
+    # Leading '1's encode leading zero bytes
+    leading_zeros = len(value) - len(value.lstrip("1"))
+    body = number.to_bytes((number.bit_length() + 7) // 8, "big") if number else b""
+    return b"\x00" * leading_zeros + body
+
+
+def is_evm_address(value: str) -> bool:
+    """Whether the string is a 0x-prefixed 20-byte hex address."""
+    return bool(_EVM_ADDRESS.match(value.strip()))
+
+
+def is_solana_address(value: str) -> bool:
+    """Whether the string is base58 that decodes to a 32-byte public key."""
+    value = value.strip()
+    if not 32 <= len(value) <= 44:
+        return False
+    decoded = base58_decode(value)
+    return decoded is not None and len(decoded) == 32
+
+
+def _is_solana_token(value: str) -> bool:
+    """Solana address (32 bytes) or transaction signature (64 bytes)."""
+    decoded = base58_decode(value)
+    return decoded is not None and len(decoded) in (32, 64)
+
+
+def detect_chains(text: str, keywords: bool = True) -> Set[str]:
+    """
+    Work out which chains a query refers to.
+
+    Args:
+        text: Query or identifier
+        keywords: Also match chain names such as 'solana' or 'ethereum'
+
+    Returns:
+        Set of CHAIN_* names; empty if nothing chain-specific was found
+    """
+    chains: Set[str] = set()
+    if _EVM_TOKEN.search(text):
+        chains.add(CHAIN_EVM)
+    if any(_is_solana_token(token) for token in _BASE58_TOKEN.findall(text)):
+        chains.add(CHAIN_SOLANA)
+
+    if keywords:
+        for chain, pattern in _CHAIN_KEYWORDS.items():
+            if pattern.search(text):
+                chains.add(chain)
+    return chains
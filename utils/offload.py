@@ -0,0 +1,117 @@
+"""
+Worker pool for CPU-bound tool work.
+Keeps the event loop free for other sessions, MCP traffic and price fetches.
+"""
+
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+# Inputs smaller than this run inline; handing them to a worker costs more
+DEFAULT_INLINE_THRESHOLD = 500
+
+OFFLOAD_MODES = ("thread", "process")
+
+
+class OffloadPool:
+    """Run blocking functions in a thread or process pool, or inline when small."""
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: Optional[int] = None,
+        inline_threshold: int = DEFAULT_INLINE_THRESHOLD,
+    ):
+        """
+        Initialize pool. Workers are started on first use.
+
+        Args:
+            mode: 'thread' (cheap to hand off, shares the GIL) or 'process'
+                (true parallelism; arguments and results must be picklable,
+                and pickling large arguments briefly holds the GIL)
+            max_workers: Pool size (default: the executor's own default)
+            inline_threshold: Inputs with size below this run on the calling thread
+        """
+        if mode not in OFFLOAD_MODES:
+            raise ValueError(f"mode must be one of {OFFLOAD_MODES}, got {mode!r}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.inline_threshold = inline_threshold
+        self._executor: Optional[Executor] = None
+
+        self._inline_runs = 0
+        self._offloaded_runs = 0
+
+    def _get_executor(self) -> Executor:
+        """Create the executor lazily."""
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="managlynx-offload"
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any, size: Optional[int] = None, **kwargs: Any) -> Any:
+        """
+        Run a blocking function without stalling the event loop.
+
+        Args:
+            func: Function to call (module-level or staticmethod in process mode)
+            *args: Positional arguments for func
+            size: Input size (e.g. number of transactions); below the inline
+                threshold the call runs directly. None always offloads.
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Result of func
+        """
+        if size is not None and size < self.inline_threshold:
+            self._inline_runs += 1
+            return func(*args, **kwargs)
+
+        self._offloaded_runs += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(func, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool configuration and usage counters."""
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "inline_threshold": self.inline_threshold,
+            "inline_runs": self._inline_runs,
+            "offloaded_runs": self._offloaded_runs,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers; the pool restarts them if used again."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+# Global pool instance
+_offload_pool: Optional[OffloadPool] = None
+
+
+def get_offload_pool() -> OffloadPool:
+    """
+    Get global offload pool instance.
+
+    Configured from MANAGLYNX_OFFLOAD_MODE ('thread' or 'process'),
+    MANAGLYNX_OFFLOAD_WORKERS and MANAGLYNX_OFFLOAD_THRESHOLD.
+    """
+    global _offload_pool
+    if _offload_pool is None:
+        workers = os.getenv("MANAGLYNX_OFFLOAD_WORKERS")
+        _offload_pool = OffloadPool(
+            mode=os.getenv("MANAGLYNX_OFFLOAD_MODE", "thread"),
+            max_workers=int(workers) if workers else None,
+            inline_threshold=int(os.getenv("MANAGLYNX_OFFLOAD_THRESHOLD", DEFAULT_INLINE_THRESHOLD)),
+        )
+    return _offload_pool
@@ -0,0 +1,136 @@
+"""
+Method-selector registry for transaction categorization.
+Maps 4-byte function selectors to a category, signature and protocol.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Bundled signature file shipped with the package
+DEFAULT_SELECTOR_FILE = Path(__file__).parent / "data" / "method_selectors.json"
+
+
+class SelectorRegistry:
+    """Dictionary-backed lookup of method selectors (0x + 8 hex chars)."""
+
+    def __init__(self):
+        # selector -> {"signature", "category", "protocol"}
+        self._entries: Dict[str, Dict[str, str]] = {}
+
+    @staticmethod
+    def normalize(method_id: str) -> Optional[str]:
+        """
+        Reduce a method ID or full calldata to its lowercase 4-byte selector.
+
+        Args:
+            method_id: Method ID or transaction input, with or without 0x
+
+        Returns:
+            Selector like '0xa9059cbb', or None if too short
+        """
+        if not method_id:
+            return None
+        method_id = method_id.lower()
+        if not method_id.startswith("0x"):
+            method_id = "0x" + method_id
+        if len(method_id) < 10:
+            return None
+        return method_id[:10]
+
+    def register(
+        self,
+        selector: str,
+        category: str,
+        signature: str = "",
+        protocol: str = "",
+    ) -> None:
+        """
+        Register or override a selector.
+
+        Args:
+            selector: 4-byte selector (0x-prefixed hex)
+            category: Transaction type reported for this selector
+            signature: Human-readable function signature
+            protocol: Protocol or standard the selector belongs to
+        """
+        key = self.normalize(selector)
+        if key is None:
+            raise ValueError(f"Invalid method selector: {selector}")
+        self._entries[key] = {
+            "signature": signature,
+            "category": category,
+            "protocol": protocol,
+        }
+
+    def load(self, path: Union[str, Path]) -> int:
+        """
+        Load selectors from a JSON signature file, overriding existing entries.
+
+        The file holds {"selectors": {"0x...": {"category", "signature", "protocol"}}}.
+
+        Args:
+            path: Path to the signature file
+
+        Returns:
+            Number of selectors loaded
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        selectors = data.get("selectors", {})
+        for selector, entry in selectors.items():
+            self.register(
+                selector,
+                entry["category"],
+                signature=entry.get("signature", ""),
+                protocol=entry.get("protocol", ""),
+            )
+        return len(selectors)
+
+    def lookup(self, method_id: str) -> Optional[Dict[str, str]]:
+        """
+        Get the full entry for a method ID.
+
+        Args:
+            method_id: Method ID or transaction input
+
+        Returns:
+            Dict with signature, category and protocol, or None if unknown
+        """
+        key = self.normalize(method_id)
+        if key is None:
+            return None
+        return self._entries.get(key)
+
+    def categorize(self, method_id: str) -> Optional[str]:
+        """
+        Get the category for a method ID.
+
+        Args:
+            method_id: Method ID or transaction input
+
+        Returns:
+            Category string, or None if unknown
+        """
+        entry = self.lookup(method_id)
+        return entry["category"] if entry else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, method_id: str) -> bool:
+        return self.lookup(method_id) is not None
+
+
+# Global registry instance
+_selector_registry: Optional[SelectorRegistry] = None
+
+
+def get_selector_registry() -> SelectorRegistry:
+    """Get or create the global selector registry, loaded from the bundled file."""
+    global _selector_registry
+    if _selector_registry is None:
+        _selector_registry = SelectorRegistry()
+        _selector_registry.load(DEFAULT_SELECTOR_FILE)
+    return _selector_registry
@@ -0,0 +1,124 @@
+"""
+Token symbol registry.
+Resolves well-known symbols (WETH, USDC, SOL, ...) to the addresses the price
+service understands, so simple questions can be answered without the agent.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+from .chains import is_evm_address, is_solana_address
+from .formatting import shorten_address
+
+# Bundled symbol file shipped with the package
+DEFAULT_TOKEN_FILE = Path(__file__).parent / "data" / "token_symbols.json"
+
+# Native coins, registered by name instead of a contract address
+NATIVE_TOKEN_ADDRESSES = ("eth", "sol")
+
+
+class TokenRegistry:
+    """Case-insensitive lookup of token symbols and aliases."""
+
+    def __init__(self):
+        # lowercase symbol or alias -> {"symbol", "address", "name"}
+        self._entries: Dict[str, Dict[str, str]] = {}
+
+    def register(
+        self,
+        symbol: str,
+        address: str,
+        name: str = "",
+        aliases: Iterable[str] = (),
+    ) -> None:
+        """
+        Register or override a token.
+
+        Args:
+            symbol: Ticker as displayed (e.g. 'USDC')
+            address: Contract address (0x...), Solana mint, or 'eth'/'sol'
+                for the native coins
+            name: Full token name
+            aliases: Other names that resolve to this token (e.g. 'tether')
+        """
+        if not symbol:
+            raise ValueError("Token symbol is required")
+        if address not in NATIVE_TOKEN_ADDRESSES and not (is_evm_address(address) or is_solana_address(address)):
+            raise ValueError(f"Invalid token address for {symbol}: {address}")
+
+        entry = {"symbol": symbol, "address": address, "name": name}
+        for key in (symbol, *aliases):
+            self._entries[key.lower()] = entry
+
+    def load(self, path: Union[str, Path]) -> int:
+        """
+        Load tokens from a JSON file, overriding existing entries.
+
+        The file holds {"tokens": {"SYMBOL": {"address", "name", "aliases"}}}.
+
+        Args:
+            path: Path to the token file
+
+        Returns:
+            Number of tokens loaded
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        tokens = data.get("tokens", {})
+        for symbol, entry in tokens.items():
+            self.register(
+                symbol,
+                entry["address"],
+                name=entry.get("name", ""),
+                aliases=entry.get("aliases", ()),
+            )
+        return len(tokens)
+
+    def resolve(self, token: str) -> Optional[Dict[str, str]]:
+        """
+        Resolve a symbol, alias or contract address.
+
+        Args:
+            token: 'usdc', '$USDC', 'tether', a 0x contract address or a
+                Solana mint
+
+        Returns:
+            Dict with symbol, address and name (unknown contract addresses
+            resolve to themselves with a shortened symbol), or None
+        """
+        if not token:
+            return None
+        token = token.strip().lstrip("$")
+        if is_evm_address(token):
+            for entry in self._entries.values():
+                if entry["address"].lower() == token.lower():
+                    return entry
+            return {"symbol": shorten_address(token), "address": token, "name": ""}
+        if len(token) >= 32 and is_solana_address(token):
+            # Mints are case-sensitive
+            for entry in self._entries.values():
+                if entry["address"] == token:
+                    return entry
+            return {"symbol": shorten_address(token), "address": token, "name": ""}
+        return self._entries.get(token.lower())
+
+    def __len__(self) -> int:
+        return len({entry["symbol"] for entry in self._entries.values()})
+
+    def __contains__(self, token: str) -> bool:
+        return self.resolve(token) is not None
+
+
+# Global registry instance
+_token_registry: Optional[TokenRegistry] = None
+
+
+def get_token_registry() -> TokenRegistry:
+    """Get or create the global token registry, loaded from the bundled file."""
+    global _token_registry
+    if _token_registry is None:
+        _token_registry = TokenRegistry()
+        _token_registry.load(DEFAULT_TOKEN_FILE)
+    return _token_registry
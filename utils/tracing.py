@@ -0,0 +1,231 @@
+"""
+Lightweight per-query tracing exported to a JSON-lines file.
+Spans nest through a context variable, so concurrent queries keep separate traces.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+# Span kinds used in the per-query breakdown
+KIND_QUERY = "query"
+KIND_LLM = "llm"
+KIND_TOOL = "tool"
+KIND_MCP = "mcp"
+KIND_HTTP = "http"
+
+# Suggested MANAGLYNX_TRACE_PATH; spans hold query text and tool arguments,
+# so they are only recorded when a path is set, never by default
+SUGGESTED_TRACE_PATH = "~/.cache/managlynx/traces.jsonl"
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("managlynx_current_span", default=None)
+
+
+def payload_size(payload: Any) -> int:
+    """Approximate size of a payload in characters of JSON."""
+    if payload is None:
+        return 0
+    if isinstance(payload, (str, bytes)):
+        return len(payload)
+    try:
+        return len(json.dumps(payload, default=str))
+    except (TypeError, ValueError):
+        return len(str(payload))
+
+
+class Span:
+    """One timed operation inside a trace."""
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms = 0.0
+
+    def set(self, **attributes: Any) -> None:
+        """Add or update span attributes."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for export."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    """Create spans and append finished ones to a JSON-lines file."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Initialize tracer.
+
+        Args:
+            path: JSON-lines file spans are appended to; None (the default)
+                disables export
+        """
+        self.path = Path(path).expanduser() if path else None
+        self._lock = threading.Lock()
+        self._file = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes: Any) -> Iterator[Span]:
+        """
+        Time the enclosed block as a span, nested under the current one.
+
+        Args:
+            name: Span name (e.g. 'mcp:etherscan/getTransactions')
+            kind: One of the KIND_* constants
+            **attributes: Initial attributes (sizes, identifiers)
+
+        Yields:
+            The span, so callers can record attributes known only at the end
+        """
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        span = Span(name, kind, trace_id, parent.span_id if parent else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - span._start) * 1000
+            _current_span.reset(token)
+            self._export(span)
+
+    def current_trace_id(self) -> Optional[str]:
+        """Trace ID of the active span, if any."""
+        span = _current_span.get()
+        return span.trace_id if span else None
+
+    def _export(self, span: Span) -> None:
+        """Append a finished span to the trace file."""
+        if self.path is None:
+            return
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        """Close the trace file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_spans(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """
+    Load spans from a trace file, skipping lines that fail to parse.
+
+    Args:
+        path: JSON-lines trace file
+
+    Returns:
+        List of span dicts in file order
+    """
+    path = Path(path).expanduser()
+    if not path.exists():
+        return []
+
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return spans
+
+
+def summarize_traces(spans: List[Dict[str, Any]], limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Break down the most recent queries by where their time went.
+
+    Args:
+        spans: Spans as returned by read_spans()
+        limit: Number of most recent queries to include
+
+    Returns:
+        One dict per query (newest last) with query text, total time and
+        per-kind counts, durations (ms) and payload sizes
+    """
+    traces: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    children: Dict[str, List[Dict[str, Any]]] = {}
+
+    for span in spans:
+        if span.get("kind") == KIND_QUERY and span.get("parent_id") is None:
+            traces[span["trace_id"]] = span
+        else:
+            children.setdefault(span["trace_id"], []).append(span)
+
+    summaries = []
+    for trace_id, root in list(traces.items())[-limit:]:
+        breakdown: Dict[str, Dict[str, float]] = {}
+        for span in children.get(trace_id, []):
+            entry = breakdown.setdefault(span["kind"], {"count": 0, "ms": 0.0, "bytes": 0, "errors": 0})
+            attrs = span.get("attributes", {})
+            entry["count"] += 1
+            entry["ms"] += span["duration_ms"]
+            entry["bytes"] += attrs.get("request_bytes", 0) + attrs.get("response_bytes", 0)
+            entry["errors"] += span["status"] != "ok"
+
+        summaries.append({
+            "trace_id": trace_id,
+            "query": root.get("attributes", {}).get("query", ""),
+            "start": root["start"],
+            "total_ms": root["duration_ms"],
+            "status": root["status"],
+            "breakdown": breakdown,
+        })
+    return summaries
+
+
+# Global tracer instance
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """
+    Get global tracer instance.
+
+    Tracing is opt-in: spans are written only when MANAGLYNX_TRACE_PATH is
+    set (e.g. to SUGGESTED_TRACE_PATH), since they contain user queries.
+    """
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(os.getenv("MANAGLYNX_TRACE_PATH") or None)
+    return _tracer
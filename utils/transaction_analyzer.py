@@ -3,8 +3,21 @@ Transaction analysis and categorization utilities.
 Helps identify transaction types (Swap, Transfer, DeFi) and calculate net changes.
 """
 
-from typing import Dict, List, Optional
+from typing import AsyncIterable, Dict, Iterable, List, Optional
 from datetime import datetime
+from operator import itemgetter
+
+import numpy as np
+
+from .selectors import get_selector_registry
+
+# Histories at least this long go through the columnar (NumPy) path;
+# below it, building arrays costs more than it saves.
+COLUMNAR_THRESHOLD = 256
+
+# Summary buckets used by the columnar path
+_SWAP, _TRANSFER, _APPROVE, _OTHER, _UNKNOWN_METHOD = 0, 1, 2, 3, -1
+
 
 class TransactionAnalyzer:
     """Analyze transaction patterns and categorize activity."""
@@ -23,18 +36,9 @@ class TransactionAnalyzer:
         # 1. Check method ID if available
         method_id = tx.get("methodId", "").lower()
         if method_id:
-            # Common method IDs
-            if method_id.startswith("0xa9059cbb"): return "Transfer (ERC20)"
-            if method_id.startswith("0x095ea7b3"): return "Approve"
-            if method_id.startswith("0x23b872dd"): return "TransferFrom"
-            
-            # Uniswap / DEX patterns
-            if method_id in ["0x7ff36ab5", "0x38ed1739", "0x18cbafe5", "0xfb3bdb41"]:
-                return "Swap"
-                
-            # Deposit/Withdraw patterns (generic)
-            if method_id.startswith("0xd0e30db0"): return "Deposit"
-            if method_id.startswith("0x2e1a7d4d"): return "Withdraw"
+            category = TransactionAnalyzer.categorize_method(method_id)
+            if category:
+                return category
 
         # 2. Check value and input
         has_value = int(tx.get("value", "0")) > 0
@@ -48,6 +52,19 @@ class TransactionAnalyzer:
             
         return "Transaction"
 
+    @staticmethod
+    def categorize_method(method_id: str) -> Optional[str]:
+        """
+        Determine transaction type from its method ID alone.
+        
+        Args:
+            method_id: Lowercase method ID (0x + 4-byte selector)
+            
+        Returns:
+            Type string, or None if the method ID is not recognized
+        """
+        return get_selector_registry().categorize(method_id)
+
     @staticmethod
     def summarize_activity(transactions: List[Dict], address: str) -> Dict:
         """
@@ -60,19 +77,11 @@ class TransactionAnalyzer:
         Returns:
             Summary dict with counts and key stats
         """
-        addr_lower = address.lower()
-        summary = {
-            "total_count": len(transactions),
-            "swaps": 0,
-            "transfers_in": 0,
-            "transfers_out": 0,
-            "approvals": 0,
-            "interactions": 0,
-            "volume_eth_in": 0.0,
-            "volume_eth_out": 0.0,
-            "gas_spent": 0.0
-        }
-        
+        return TransactionSummary(address).add_page(transactions).to_dict()
+
+    @staticmethod
+    def _accumulate_rows(summary: Dict, transactions: List[Dict], addr_lower: str) -> None:
+        """Add transactions to a summary one dict at a time."""
         for tx in transactions:
             # Stats
             value_eth = float(tx.get("value", 0)) / 1e18
@@ -101,8 +110,192 @@ class TransactionAnalyzer:
                 summary["approvals"] += 1
             else:
                 summary["interactions"] += 1
-                
+
+    @staticmethod
+    def _accumulate_columnar(summary: Dict, transactions: List[Dict], addr_lower: str) -> None:
+        """
+        Add transactions to a summary using typed NumPy columns.
+        
+        Each field is extracted once into an array; values, gas and counts are
+        then computed with vectorized operations, and each distinct method ID
+        is categorized only once. Float totals are accumulated in the same
+        order as _accumulate_rows, so both paths give identical results.
+        """
+        n = len(transactions)
+        
+        # Extract typed columns; map() keeps the per-row work in C
+        values_eth = np.fromiter(map(float, _column(transactions, "value", 0)), np.float64, n) / 1e18
+        gas_used = np.fromiter(map(float, _column(transactions, "gasUsed", 0)), np.float64, n)
+        gas_price = np.fromiter(map(float, _column(transactions, "gasPrice", 0)), np.float64, n)
+        is_outgoing = np.fromiter(
+            map(addr_lower.__eq__, map(str.lower, _column(transactions, "from", ""))), bool, n
+        )
+        has_input = np.fromiter(map(len, _column(transactions, "input", "0x")), np.int64, n) > 2
+        method_ids = _column(transactions, "methodId", "")
+
+        # Stats
+        gas_eth = (gas_used * gas_price) / 1e18
+        summary["gas_spent"] = _sequential_sum(summary["gas_spent"], gas_eth)
+        summary["volume_eth_out"] = _sequential_sum(summary["volume_eth_out"], values_eth[is_outgoing])
+        summary["volume_eth_in"] = _sequential_sum(summary["volume_eth_in"], values_eth[~is_outgoing])
+
+        # Categorize each distinct method ID once, then broadcast
+        method_buckets = {
+            method_id: _bucket(TransactionAnalyzer.categorize_method(method_id.lower())) if method_id else _UNKNOWN_METHOD
+            for method_id in set(method_ids)
+        }
+        buckets = np.fromiter(map(method_buckets.__getitem__, method_ids), np.int8, n)
+
+        # Unknown methods fall back to value/input: plain ETH sends are
+        # transfers, everything else counts as an interaction
+        unknown = buckets == _UNKNOWN_METHOD
+        eth_transfer = unknown & (values_eth > 0) & ~has_input
+        buckets[unknown] = _OTHER
+        buckets[eth_transfer] = _TRANSFER
+
+        is_transfer = buckets == _TRANSFER
+        summary["swaps"] += int(np.count_nonzero(buckets == _SWAP))
+        summary["transfers_out"] += int(np.count_nonzero(is_transfer & is_outgoing))
+        summary["transfers_in"] += int(np.count_nonzero(is_transfer & ~is_outgoing))
+        summary["approvals"] += int(np.count_nonzero(buckets == _APPROVE))
+        summary["interactions"] += int(np.count_nonzero(buckets == _OTHER))
+
+
+class TransactionSummary:
+    """
+    Running, mergeable summary of a wallet's transactions.
+    
+    Feed Etherscan pages as they arrive with add_page() or consume(); only
+    the running totals are kept, so memory does not grow with history length.
+    Partial summaries (per page, time range or worker) combine with merge().
+    """
+    
+    def __init__(self, address: str):
+        """
+        Initialize an empty summary.
+        
+        Args:
+            address: The user's wallet address (case insensitive)
+        """
+        self.address = address
+        self._addr_lower = address.lower()
+        self._summary = {
+            "total_count": 0,
+            "swaps": 0,
+            "transfers_in": 0,
+            "transfers_out": 0,
+            "approvals": 0,
+            "interactions": 0,
+            "volume_eth_in": 0.0,
+            "volume_eth_out": 0.0,
+            "gas_spent": 0.0
+        }
+    
+    @classmethod
+    def from_dict(cls, address: str, data: Dict) -> "TransactionSummary":
+        """
+        Rebuild a summary from its ``data`` dict (e.g. returned by a worker).
+        
+        Args:
+            address: The wallet address the data belongs to
+            data: Summary data as produced by to_dict()["data"]
+        """
+        summary = cls(address)
+        for key in summary._summary:
+            summary._summary[key] = data.get(key, summary._summary[key])
+        return summary
+    
+    def add_page(self, transactions: List[Dict]) -> "TransactionSummary":
+        """
+        Add one page of transactions to the running totals.
+        
+        Args:
+            transactions: List of transaction objects
+            
+        Returns:
+            self, for chaining
+        """
+        self._summary["total_count"] += len(transactions)
+        
+        if len(transactions) >= COLUMNAR_THRESHOLD:
+            TransactionAnalyzer._accumulate_columnar(self._summary, transactions, self._addr_lower)
+        else:
+            TransactionAnalyzer._accumulate_rows(self._summary, transactions, self._addr_lower)
+        
+        return self
+    
+    def add_pages(self, pages: Iterable[List[Dict]]) -> "TransactionSummary":
+        """Add every page from an iterable of pages."""
+        for page in pages:
+            self.add_page(page)
+        return self
+    
+    async def consume(self, pages: AsyncIterable[List[Dict]]) -> "TransactionSummary":
+        """
+        Add pages from an async iterator as they are fetched.
+        
+        Args:
+            pages: Async iterable yielding lists of transactions
+            
+        Returns:
+            self, for chaining
+        """
+        async for page in pages:
+            self.add_page(page)
+        return self
+    
+    def merge(self, other: "TransactionSummary") -> "TransactionSummary":
+        """
+        Combine two partial summaries of the same wallet.
+        
+        Args:
+            other: Summary computed over a different set of transactions
+            
+        Returns:
+            New summary covering both inputs
+            
+        Raises:
+            ValueError: If the summaries are for different addresses
+        """
+        if other._addr_lower != self._addr_lower:
+            raise ValueError(f"Cannot merge summaries for {self.address} and {other.address}")
+        
+        merged = TransactionSummary(self.address)
+        for key in merged._summary:
+            merged._summary[key] = self._summary[key] + other._summary[key]
+        return merged
+    
+    def to_dict(self) -> Dict:
+        """Return the summary in the summarize_activity response format."""
         return {
             "status": "success",
-            "data": summary
+            "data": dict(self._summary)
         }
+
+
+def _column(transactions: List[Dict], key: str, default) -> List:
+    """Pull one field out of every transaction."""
+    try:
+        return list(map(itemgetter(key), transactions))
+    except KeyError:
+        return [tx.get(key, default) for tx in transactions]
+
+
+def _bucket(category: Optional[str]) -> int:
+    """Map a category string to its summary bucket."""
+    if category is None:
+        return _UNKNOWN_METHOD
+    if category == "Swap":
+        return _SWAP
+    if "Transfer" in category:
+        return _TRANSFER
+    if category == "Approve":
+        return _APPROVE
+    return _OTHER
+
+
+def _sequential_sum(start: float, values: np.ndarray) -> float:
+    """Sum left to right like a Python += loop (np.sum uses pairwise summation)."""
+    if values.size == 0:
+        return start
+    return float(np.cumsum(np.concatenate(([start], values)))[-1])